@@ -20,11 +20,12 @@ export enum STATUS {
 }
 
 export enum INTERVAL {
-  FIVE_MIN = '5m',
-  FIFTEEN_MIN = '15m',
-  THIRTY_MIN = '30m',
-  ONE_HOUR = '1h',
-  ONE_DAY = '1d',
+  MINUTE = 'MINUTE',
+  HOUR = 'HOUR',
+  DAY = 'DAY',
+  WEEK = 'WEEK',
+  MONTH = 'MONTH',
+  YEAR = 'YEAR',
 }
 
 export interface User {
@@ -0,0 +1,13 @@
+# @author: adibarra (Alec Ibarra)
+# @description: One-shot command to rebuild the holdings table from the transactions ledger.
+
+import sys
+
+from services.database import Database
+
+if __name__ == "__main__":
+    print("Rebuilding holdings from transactions...", flush=True)
+    count = Database().rebuild_holdings()
+    if count is None:
+        sys.exit(1)
+    print(f"Rebuilt {count} holdings.", flush=True)
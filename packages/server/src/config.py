@@ -32,5 +32,98 @@ API_HOST: str = os.environ.get("SERVER_API_HOST")
 API_PORT: int = int(os.environ.get("SERVER_API_PORT"))
 API_CORS_ORIGINS: List[str] = os.environ.get("SERVER_API_CORS_ORIGINS").split(",")
 POSTGRESQL_URI: str = os.environ.get("SERVER_POSTGRESQL_URI")
+POSTGRESQL_POOL_MIN_SIZE: int = int(
+    os.environ.get("SERVER_POSTGRESQL_POOL_MIN_SIZE", "1")
+)
+POSTGRESQL_POOL_MAX_SIZE: int = int(
+    os.environ.get("SERVER_POSTGRESQL_POOL_MAX_SIZE", "20")
+)
+POSTGRESQL_POOL_TIMEOUT: float = float(
+    os.environ.get("SERVER_POSTGRESQL_POOL_TIMEOUT", "10")
+)
+POSTGRESQL_POOL_MAX_LIFETIME: float = float(
+    os.environ.get("SERVER_POSTGRESQL_POOL_MAX_LIFETIME", "3600")
+)
+POSTGRESQL_STATEMENT_TIMEOUT: int = int(
+    os.environ.get("SERVER_POSTGRESQL_STATEMENT_TIMEOUT", "15000")
+)
+SESSION_CACHE_SIZE: int = int(os.environ.get("SERVER_SESSION_CACHE_SIZE", "10000"))
+SESSION_CACHE_TTL: float = float(os.environ.get("SERVER_SESSION_CACHE_TTL", "60"))
+SESSION_NEGATIVE_TTL: float = float(os.environ.get("SERVER_SESSION_NEGATIVE_TTL", "5"))
+SESSION_TOKEN_MODE: str = os.environ.get(
+    "SERVER_SESSION_TOKEN_MODE", "database"
+).lower()
+SESSION_TOKEN_KEY: str = os.environ.get("SERVER_SESSION_TOKEN_KEY", "")
+SESSION_TOKEN_TTL: float = float(os.environ.get("SERVER_SESSION_TOKEN_TTL", "86400"))
+SESSION_DENYLIST_REFRESH: float = float(
+    os.environ.get("SERVER_SESSION_DENYLIST_REFRESH", "10")
+)
+SESSION_LOGIN_CONCURRENCY_USER: int = int(
+    os.environ.get("SERVER_SESSION_LOGIN_CONCURRENCY_USER", "2")
+)
+SESSION_LOGIN_CONCURRENCY_IP: int = int(
+    os.environ.get("SERVER_SESSION_LOGIN_CONCURRENCY_IP", "8")
+)
+PASSWORD_HASH_TIME_COST: int = int(
+    os.environ.get("SERVER_PASSWORD_HASH_TIME_COST", "3")
+)
+PASSWORD_HASH_MEMORY_COST: int = int(
+    os.environ.get("SERVER_PASSWORD_HASH_MEMORY_COST", "65536")
+)
+PASSWORD_HASH_PARALLELISM: int = int(
+    os.environ.get("SERVER_PASSWORD_HASH_PARALLELISM", "4")
+)
+PASSWORD_HASH_WORKERS: int = int(os.environ.get("SERVER_PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_QUEUE_SIZE: int = int(
+    os.environ.get("SERVER_PASSWORD_HASH_QUEUE_SIZE", "32")
+)
+PASSWORD_HASH_TIMEOUT: float = float(
+    os.environ.get("SERVER_PASSWORD_HASH_TIMEOUT", "10")
+)
+LEADERBOARD_REBUILD_INTERVAL: float = float(
+    os.environ.get("SERVER_LEADERBOARD_REBUILD_INTERVAL", "300")
+)
+TOURNAMENT_FIRST_PRIZE: int = int(
+    os.environ.get("SERVER_TOURNAMENT_FIRST_PRIZE", "100")
+)
+TOURNAMENT_RESYNC_INTERVAL: float = float(
+    os.environ.get("SERVER_TOURNAMENT_RESYNC_INTERVAL", "60")
+)
+VALUATION_CACHE_TTL: float = float(os.environ.get("SERVER_VALUATION_CACHE_TTL", "5"))
 APCA_API_KEY: str = os.environ.get("SERVER_APCA_API_KEY")
 APCA_API_SECRET: str = os.environ.get("SERVER_APCA_API_SECRET_KEY")
+APCA_HTTP_POOL_SIZE: int = int(os.environ.get("SERVER_APCA_HTTP_POOL_SIZE", "10"))
+APCA_HTTP_CONNECT_TIMEOUT: float = float(
+    os.environ.get("SERVER_APCA_HTTP_CONNECT_TIMEOUT", "3.05")
+)
+APCA_HTTP_READ_TIMEOUT: float = float(
+    os.environ.get("SERVER_APCA_HTTP_READ_TIMEOUT", "10")
+)
+APCA_HTTP_RETRIES: int = int(os.environ.get("SERVER_APCA_HTTP_RETRIES", "2"))
+APCA_HTTP2: bool = os.environ.get("SERVER_APCA_HTTP2", "false").lower() == "true"
+APCA_STREAM: bool = os.environ.get("SERVER_APCA_STREAM", "false").lower() == "true"
+APCA_STREAM_URL: str = os.environ.get(
+    "SERVER_APCA_STREAM_URL", "wss://stream.data.alpaca.markets/v2/iex"
+)
+APCA_RATE_LIMIT: int = int(os.environ.get("SERVER_APCA_RATE_LIMIT", "200"))
+APCA_REFRESH_INTERVAL: float = float(
+    os.environ.get("SERVER_APCA_REFRESH_INTERVAL", "60")
+)
+
+# validate configuration
+if SESSION_TOKEN_MODE not in ["database", "signed"]:
+    print(
+        "Invalid SERVER_SESSION_TOKEN_MODE... Use 'database' or 'signed'.", flush=True
+    )
+    sys.exit(1)
+if SESSION_TOKEN_MODE == "signed" and not SESSION_TOKEN_KEY:
+    print(
+        "Signed session tokens require SERVER_SESSION_TOKEN_KEY to be set.", flush=True
+    )
+    sys.exit(1)
+if TOURNAMENT_RESYNC_INTERVAL <= 0:
+    print("SERVER_TOURNAMENT_RESYNC_INTERVAL must be greater than 0.", flush=True)
+    sys.exit(1)
+if VALUATION_CACHE_TTL <= 0:
+    print("SERVER_VALUATION_CACHE_TTL must be greater than 0.", flush=True)
+    sys.exit(1)
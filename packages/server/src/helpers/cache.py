@@ -0,0 +1,170 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Cache class for thread-safe, in-memory LRU caching with expiry
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class Cache:
+    """
+    A thread-safe LRU cache with per-entry time-to-live.
+
+    All operations are O(1). Reads refresh the recency of an entry, and the least recently
+    used entry is evicted once the cache is full. Expired entries are treated as missing,
+    but are kept until evicted or replaced so callers can fall back to them with `get_stale`.
+
+    Attributes:
+        MAX_SIZE (int): The default maximum number of entries.
+        TTL (float): The default time-to-live of an entry in seconds, None to never expire.
+    """
+
+    MAX_SIZE = 100
+    TTL = None
+
+    def __init__(self, MAX_SIZE: int = MAX_SIZE, TTL: float = TTL):
+        self.cache = OrderedDict()
+        self.MAX_SIZE = MAX_SIZE
+        self.TTL = TTL
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default: Any = None) -> Any:
+        """
+        Retrieves the value of a key and marks it as most recently used.
+
+        Args:
+            key: The key to retrieve.
+            default (Any, optional): The value to return if the key is missing or expired.
+
+        Returns:
+            Any: The cached value, or the default.
+        """
+
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_stale(self, key, default: Any = None) -> Any:
+        """
+        Retrieves the value of a key even if it has expired, without affecting recency or counters.
+
+        Args:
+            key: The key to retrieve.
+            default (Any, optional): The value to return if the key is missing.
+
+        Returns:
+            Any: The cached value, or the default.
+        """
+
+        with self.lock:
+            entry = self.cache.get(key)
+            return default if entry is None else entry[1]
+
+    def has(self, key) -> bool:
+        """
+        Checks if a key is cached and not expired, without affecting recency or counters.
+        """
+
+        with self.lock:
+            entry = self.cache.get(key)
+            return entry is not None and (
+                entry[0] is None or entry[0] > time.monotonic()
+            )
+
+    def ttl(self, key) -> float | None:
+        """
+        Retrieves the number of seconds until a key expires, without affecting recency or counters.
+
+        Args:
+            key: The key to check.
+
+        Returns:
+            float | None: The remaining time-to-live, 0 if the key is missing or expired,
+            or None if the key never expires.
+        """
+
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                return 0
+            if entry[0] is None:
+                return None
+            return max(entry[0] - time.monotonic(), 0)
+
+    def keys(self) -> list:
+        """
+        Retrieves the keys which are not expired, from least to most recently used.
+        """
+
+        now = time.monotonic()
+        with self.lock:
+            return [
+                key
+                for key, (expires_at, _) in self.cache.items()
+                if expires_at is None or expires_at > now
+            ]
+
+    def set(self, key, value, ttl: float = None) -> None:
+        """
+        Sets the value of a key, replacing any previous value and resetting its expiry.
+
+        Args:
+            key: The key to set.
+            value: The value to cache.
+            ttl (float, optional): The time-to-live of the entry in seconds. Defaults to the cache TTL.
+        """
+
+        ttl = self.TTL if ttl is None else ttl
+        expires_at = None if ttl is None else time.monotonic() + ttl
+
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+            self.cache[key] = (expires_at, value)
+
+            while len(self.cache) > self.MAX_SIZE:
+                self.cache.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key) -> None:
+        with self.lock:
+            self.cache.pop(key, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.cache.clear()
+
+    def stats(self) -> dict:
+        """
+        Retrieves the counters of the cache.
+
+        Returns:
+            dict: The size, hits, misses, evictions and expirations of the cache.
+        """
+
+        with self.lock:
+            return {
+                "size": len(self.cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
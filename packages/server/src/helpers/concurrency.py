@@ -0,0 +1,73 @@
+# @author: adibarra (Alec Ibarra)
+# @description: ConcurrencyLimiter class for capping in-flight work per key
+
+import threading
+
+
+class ConcurrencyLimiter:
+    """
+    A thread-safe, non-blocking cap on the number of in-flight operations per key.
+
+    Unlike `RateLimiter`, it does not limit how often work starts, only how much of it runs
+    at once, e.g. concurrent login attempts per username and per client address. Callers
+    which are over the cap are turned away immediately instead of queueing.
+    """
+
+    def __init__(self):
+        self.active = {}
+        self.lock = threading.Lock()
+
+        self.acquired = 0
+        self.rejected = 0
+
+    def acquire(self, limits: dict) -> bool:
+        """
+        Reserves a slot for every key, or none of them if any key is at its limit.
+
+        Args:
+            limits (dict): The maximum number of in-flight operations of each key.
+
+        Returns:
+            bool: True if the slots were reserved and must be released with `release`, False otherwise.
+        """
+
+        with self.lock:
+            if any(self.active.get(key, 0) >= limit for key, limit in limits.items()):
+                self.rejected += 1
+                return False
+
+            for key in limits:
+                self.active[key] = self.active.get(key, 0) + 1
+            self.acquired += 1
+            return True
+
+    def release(self, keys) -> None:
+        """
+        Releases slots reserved with `acquire`.
+
+        Args:
+            keys: The keys to release a slot of.
+        """
+
+        with self.lock:
+            for key in keys:
+                count = self.active.get(key, 0) - 1
+                if count > 0:
+                    self.active[key] = count
+                else:
+                    self.active.pop(key, None)
+
+    def stats(self) -> dict:
+        """
+        Retrieves the counters of the limiter.
+
+        Returns:
+            dict: The number of active keys, and acquired/rejected counts.
+        """
+
+        with self.lock:
+            return {
+                "keys": len(self.active),
+                "acquired": self.acquired,
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,187 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Leaderboard class for ranking entries by score with O(log n) updates
+
+import random
+
+
+class Leaderboard:
+    """
+    Ranks entries by score, highest first, in an order-statistic treap.
+
+    Updating a score, removing an entry and looking up the rank of an entry take O(log n)
+    expected time, and the top k entries take O(log n + k), so a board never needs to be
+    re-sorted. Entries with equal scores are ordered by key, so ranks are deterministic.
+    Ranks start at 1.
+    """
+
+    class Node:
+        __slots__ = ("item", "priority", "size", "left", "right")
+
+        def __init__(self, item: tuple):
+            self.item = item
+            self.priority = random.random()
+            self.size = 1
+            self.left = None
+            self.right = None
+
+    def __init__(self):
+        self.root = None
+        self.scores = {}
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def __contains__(self, key) -> bool:
+        return key in self.scores
+
+    def score(self, key):
+        """
+        Retrieves the score of an entry, or None if it is not on the board.
+        """
+
+        return self.scores.get(key)
+
+    def update(self, key, score) -> None:
+        """
+        Adds an entry or changes its score.
+
+        Args:
+            key: The key of the entry, e.g. a portfolio uuid.
+            score: The score of the entry, higher ranks first.
+        """
+
+        if key in self.scores:
+            if self.scores[key] == score:
+                return
+            self.remove(key)
+        self.scores[key] = score
+
+        left, right = self._split(self.root, (-score, key))
+        self.root = self._merge(
+            self._merge(left, Leaderboard.Node((-score, key))), right
+        )
+
+    def remove(self, key) -> None:
+        """
+        Removes an entry if it is on the board.
+        """
+
+        score = self.scores.pop(key, None)
+        if score is None:
+            return
+
+        item = (-score, key)
+        left, right = self._split(self.root, item)
+        # The entry is the smallest item of the right half
+        self.root = self._merge(left, self._pop_min(right))
+
+    def rank(self, key) -> int | None:
+        """
+        Retrieves the rank of an entry.
+
+        Args:
+            key: The key of the entry.
+
+        Returns:
+            int | None: The 1-based rank of the entry, or None if it is not on the board.
+        """
+
+        score = self.scores.get(key)
+        if score is None:
+            return None
+
+        item = (-score, key)
+        rank = 1
+        node = self.root
+        while node is not None:
+            if item < node.item:
+                node = node.left
+            else:
+                if item == node.item:
+                    return rank + self._size(node.left)
+                rank += self._size(node.left) + 1
+                node = node.right
+        return None
+
+    def top(self, limit: int, offset: int = 0) -> list[tuple]:
+        """
+        Retrieves a page of entries in rank order.
+
+        Args:
+            limit (int): The maximum number of entries.
+            offset (int, optional): The number of entries to skip.
+
+        Returns:
+            list[tuple]: The (rank, key, score) of each entry.
+        """
+
+        entries = []
+        stack = []
+        node = self.root
+        skip = max(offset, 0)
+
+        # Descend to the first entry of the page, keeping the ancestors still to be visited
+        while node is not None:
+            left = self._size(node.left)
+            if skip < left:
+                stack.append(node)
+                node = node.left
+            elif skip == left:
+                stack.append(node)
+                break
+            else:
+                skip -= left + 1
+                node = node.right
+
+        rank = max(offset, 0) + 1
+        while stack and len(entries) < limit:
+            node = stack.pop()
+            entries.append((rank, node.item[1], -node.item[0]))
+            rank += 1
+            node = node.right
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
+        return entries
+
+    def _size(self, node) -> int:
+        return node.size if node is not None else 0
+
+    def _update(self, node) -> None:
+        node.size = 1 + self._size(node.left) + self._size(node.right)
+
+    def _split(self, node, item: tuple) -> tuple:
+        # Splits into the items less than item, and the items greater than or equal to it
+        if node is None:
+            return None, None
+        if node.item < item:
+            node.right, right = self._split(node.right, item)
+            self._update(node)
+            return node, right
+        left, node.left = self._split(node.left, item)
+        self._update(node)
+        return left, node
+
+    def _merge(self, left, right):
+        # Merges two treaps where every item of left is less than every item of right
+        if left is None:
+            return right
+        if right is None:
+            return left
+        if left.priority > right.priority:
+            left.right = self._merge(left.right, right)
+            self._update(left)
+            return left
+        right.left = self._merge(left, right.left)
+        self._update(right)
+        return right
+
+    def _pop_min(self, node):
+        if node is None:
+            return None
+        if node.left is None:
+            return node.right
+        node.left = self._pop_min(node.left)
+        self._update(node)
+        return node
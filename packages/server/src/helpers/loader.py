@@ -0,0 +1,109 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Loader class for memoizing and batching async entity lookups
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+
+
+class Loader:
+    """
+    Memoizes and batches async lookups of one type of entity, dataloader style.
+
+    Every key is fetched at most once for the lifetime of the loader, so it is meant to be
+    created per request. Keys requested in the same iteration of the event loop, e.g. by
+    concurrent `load` calls or `load_many`, are fetched together with a single call to the
+    batch function.
+    """
+
+    def __init__(
+        self, batch_load: Callable[[list], Awaitable[dict]], max_batch_size: int = 100
+    ):
+        """
+        Creates a new loader.
+
+        Args:
+            batch_load (Callable[[list], Awaitable[dict]]): Fetches a list of keys, returning
+                a dict of the values found. Missing keys load as None.
+            max_batch_size (int, optional): The maximum number of keys fetched per call.
+        """
+
+        self.batch_load = batch_load
+        self.max_batch_size = max_batch_size
+        self.futures = {}
+        self.queue = []
+
+        self.batches = 0
+
+    async def load(self, key: Hashable) -> Any:
+        """
+        Loads the value of a key.
+
+        Args:
+            key (Hashable): The key to load.
+
+        Returns:
+            Any: The value, or None if it was not found.
+        """
+
+        future = self.futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self.futures[key] = future
+            if not self.queue:
+                loop.call_soon(self._dispatch)
+            self.queue.append(key)
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[Hashable]) -> list:
+        """
+        Loads the values of several keys in as few batches as possible.
+
+        Args:
+            keys (Iterable[Hashable]): The keys to load.
+
+        Returns:
+            list: The values in the order of the keys, None for keys which were not found.
+        """
+
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: Hashable, value: Any) -> None:
+        """
+        Sets the value of a key, e.g. after it was created or updated by the request.
+        """
+
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self.futures[key] = future
+
+    def clear(self, key: Hashable) -> None:
+        """
+        Forgets the value of a key, so the next `load` fetches it again.
+        """
+
+        self.futures.pop(key, None)
+
+    def _dispatch(self) -> None:
+        queue, self.queue = self.queue, []
+        for start in range(0, len(queue), self.max_batch_size):
+            batch = queue[start : start + self.max_batch_size]
+            asyncio.get_running_loop().create_task(self._load_batch(batch))
+
+    async def _load_batch(self, keys: list) -> None:
+        futures = [self.futures.get(key) for key in keys]
+        self.batches += 1
+        try:
+            values = await self.batch_load(keys)
+        except Exception as e:
+            for key, future in zip(keys, futures):
+                # Failures are not memoized, the next load retries
+                if self.futures.get(key) is future:
+                    self.futures.pop(key)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, future in zip(keys, futures):
+            if future is not None and not future.done():
+                future.set_result(values.get(key))
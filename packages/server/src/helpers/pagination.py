@@ -0,0 +1,79 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Pagination class for encoding and decoding keyset pagination cursors
+
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+
+
+class Pagination:
+    """
+    Encodes and decodes the opaque cursors of keyset paginated lists.
+
+    Lists are ordered by (created_at, uuid), which is unique, so a page can start right after
+    the last row of the previous one without scanning and skipping the rows before it, and
+    pages stay stable while rows are added. A cursor is that position as base64url JSON.
+    """
+
+    def encode_cursor(created_at: datetime, uuid: str) -> str:
+        """
+        Encodes the position of a row as a cursor.
+
+        Args:
+            created_at (datetime): The creation time of the row.
+            uuid (str): The uuid of the row.
+
+        Returns:
+            str: The cursor.
+        """
+
+        position = json.dumps(
+            {"created_at": created_at.isoformat(), "uuid": str(uuid)},
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(position.encode()).rstrip(b"=").decode()
+
+    def decode_cursor(cursor: str) -> tuple[datetime, str] | None:
+        """
+        Decodes a cursor into the position of a row.
+
+        Args:
+            cursor (str): The cursor.
+
+        Returns:
+            tuple[datetime, str] | None: The created_at and uuid of the row, or None if the
+            cursor is invalid.
+        """
+
+        try:
+            padding = "=" * (-len(cursor) % 4)
+            position = json.loads(base64.urlsafe_b64decode(cursor + padding))
+            return (
+                datetime.fromisoformat(position["created_at"]),
+                str(UUID(position["uuid"])),
+            )
+        except (ValueError, TypeError, KeyError):
+            return None
+
+    def page(rows: list[dict], limit: int) -> tuple[list[dict], str | None]:
+        """
+        Trims the rows fetched for a page and builds the cursor of the next page.
+
+        Fetching one row more than the limit tells whether there is a next page without an
+        extra query.
+
+        Args:
+            rows (list[dict]): The rows fetched with a limit of one more than the page size.
+            limit (int): The page size.
+
+        Returns:
+            tuple[list[dict], str | None]: The rows of the page, and the cursor of the next
+            page or None if this is the last page.
+        """
+
+        if limit <= 0 or len(rows) <= limit:
+            return rows[: max(limit, 0)], None
+
+        rows = rows[:limit]
+        return rows, Pagination.encode_cursor(rows[-1]["created_at"], rows[-1]["uuid"])
@@ -1,6 +1,7 @@
 # @author: mariptime (Akshay)
 # @description: Quote class
 
+import re
 from datetime import datetime, timedelta
 
 
@@ -11,6 +12,22 @@ class Quote:
 
     INTERVALS = ["MINUTE", "HOUR", "DAY", "WEEK", "MONTH", "YEAR"]
 
+    # Uppercase tickers, optionally with a share class suffix such as BRK.B
+    SYMBOL_PATTERN = re.compile(r"[A-Z][A-Z.]{0,9}")
+
+    def is_valid_symbol(symbol: str) -> bool:
+        """
+        Checks if a symbol is a well-formed ticker, so it can be sent upstream and cached.
+
+        Args:
+            symbol (str): The symbol to check, already uppercased.
+
+        Returns:
+            bool: True if the symbol is valid, False otherwise.
+        """
+
+        return Quote.SYMBOL_PATTERN.fullmatch(symbol) is not None
+
     def get_quote(symbol: str, price: int, timestamp: datetime):
         """
         Returns the quote information.
@@ -70,6 +87,37 @@ class Quote:
 
         return historical_data
 
+    def get_missing_ranges(
+        covered: list[tuple[datetime, datetime]],
+        start_time: datetime,
+        end_time: datetime,
+    ) -> list[tuple[datetime, datetime]]:
+        """
+        Gets the sub-ranges of a time range which are not covered by any of the given ranges.
+
+        Args:
+            covered (list[tuple[datetime, datetime]]): The covered (start, end) ranges, in any order.
+            start_time (datetime): The start of the time range.
+            end_time (datetime): The end of the time range.
+
+        Returns:
+            list[tuple[datetime, datetime]]: The uncovered (start, end) ranges, in order.
+        """
+        missing = []
+        cursor = start_time
+        for range_start, range_end in sorted(covered):
+            if range_end <= cursor:
+                continue
+            if range_start >= end_time:
+                break
+            if range_start > cursor:
+                missing.append((cursor, range_start))
+            cursor = range_end
+
+        if cursor < end_time:
+            missing.append((cursor, end_time))
+        return missing
+
     def review_historical_prices(start_date, end_date):
         """
         Review historical prices based on start and end dates.
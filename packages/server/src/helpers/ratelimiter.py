@@ -0,0 +1,133 @@
+# @author: adibarra (Alec Ibarra)
+# @description: RateLimiter class for client-side rate limiting of outbound requests
+
+import heapq
+import itertools
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket rate limiter with prioritized waiting.
+
+    Callers queue for tokens with a priority and a deadline. Waiting callers are served
+    strictly by priority (then arrival), so low priority work never takes a token while
+    higher priority work is waiting. Callers which cannot get a token before their deadline
+    give up instead of waiting forever.
+
+    Attributes:
+        PRIORITY_HIGH (int): Priority for user-facing requests.
+        PRIORITY_LOW (int): Priority for background requests.
+    """
+
+    PRIORITY_HIGH = 0
+    PRIORITY_LOW = 1
+
+    def __init__(self, rate: int, per: float = 60, burst: int = None):
+        """
+        Creates a new rate limiter.
+
+        Args:
+            rate (int): The number of requests allowed per period.
+            per (float, optional): The length of the period in seconds. Defaults to 60.
+            burst (int, optional): The size of the bucket. Defaults to the rate.
+        """
+
+        self.rate = rate / per
+        self.capacity = burst if burst is not None else rate
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+
+        self.condition = threading.Condition(threading.Lock())
+        self.waiters = []
+        self.counter = itertools.count()
+
+        self.acquired = 0
+        self.rejected = 0
+
+    def _refill(self, now: float) -> None:
+        # No tokens accumulate while blocked by a penalty
+        start = max(self.updated_at, self.blocked_until)
+        if now > start:
+            self.tokens = min(self.capacity, self.tokens + (now - start) * self.rate)
+        self.updated_at = now
+
+    def acquire(self, priority: int = PRIORITY_HIGH, timeout: float = None) -> bool:
+        """
+        Waits for a token.
+
+        Args:
+            priority (int, optional): The priority of the request, lower is served first.
+            timeout (float, optional): The maximum number of seconds to wait, None to wait forever.
+
+        Returns:
+            bool: True if a token was acquired, False if the deadline passed first.
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waiter = (priority, next(self.counter))
+
+        with self.condition:
+            heapq.heappush(self.waiters, waiter)
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+
+                # Only the first waiter in line may take a token
+                if self.waiters[0] == waiter:
+                    if now >= self.blocked_until and self.tokens >= 1:
+                        heapq.heappop(self.waiters)
+                        self.tokens -= 1
+                        self.acquired += 1
+                        self.condition.notify_all()
+                        return True
+                    wait = max(
+                        self.blocked_until - now, (1 - self.tokens) / self.rate, 0
+                    )
+                else:
+                    wait = None
+
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self.waiters.remove(waiter)
+                        heapq.heapify(self.waiters)
+                        self.rejected += 1
+                        self.condition.notify_all()
+                        return False
+                    wait = remaining if wait is None else min(wait, remaining)
+
+                self.condition.wait(wait)
+
+    def penalize(self, seconds: float) -> None:
+        """
+        Stops handing out tokens for a number of seconds, e.g. after the upstream returned
+        a 429 response with a Retry-After header.
+
+        Args:
+            seconds (float): The number of seconds to stop handing out tokens for.
+        """
+
+        with self.condition:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0
+            self.condition.notify_all()
+
+    def stats(self) -> dict:
+        """
+        Retrieves the counters of the rate limiter.
+
+        Returns:
+            dict: The available tokens, number of waiters, and acquired/rejected request counts.
+        """
+
+        with self.condition:
+            self._refill(time.monotonic())
+            return {
+                "tokens": self.tokens,
+                "waiting": len(self.waiters),
+                "acquired": self.acquired,
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,247 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Resampler class for aggregating trades and bars into OHLCV bars
+
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+NS_PER_MINUTE = 60 * 10**9
+NS_PER_HOUR = 60 * NS_PER_MINUTE
+NS_PER_DAY = 24 * NS_PER_HOUR
+
+
+class Resampler:
+    """
+    Aggregates trade ticks or bars into OHLCV bars with NumPy, without per-row Python loops.
+
+    Bars are aligned to the market session: days, weeks (starting on Monday), months and
+    years follow the exchange's local calendar rather than UTC. When restricted to regular
+    trading hours, ticks outside of the session are dropped and hourly bars start at the
+    session open (09:30, 10:30, ...). Bar timestamps are the UTC start of each bar.
+
+    Attributes:
+        INTERVALS (list[str]): The supported bar intervals.
+        TIMEZONE (ZoneInfo): The timezone of the exchange.
+        SESSION_OPEN (int): The start of regular trading hours, in minutes after midnight.
+        SESSION_CLOSE (int): The end of regular trading hours, in minutes after midnight.
+    """
+
+    INTERVALS = ["MINUTE", "HOUR", "DAY", "WEEK", "MONTH", "YEAR"]
+    TIMEZONE = ZoneInfo("America/New_York")
+    SESSION_OPEN = 9 * 60 + 30
+    SESSION_CLOSE = 16 * 60
+
+    def resample_trades(
+        timestamps: np.ndarray,
+        prices: np.ndarray,
+        sizes: np.ndarray,
+        interval: str,
+        regular_hours: bool = False,
+    ) -> dict[str, np.ndarray]:
+        """
+        Aggregates trade ticks into OHLCV bars.
+
+        Args:
+            timestamps (np.ndarray): The UTC timestamps of the trades, as datetime64 or int64 nanoseconds.
+            prices (np.ndarray): The prices of the trades.
+            sizes (np.ndarray): The sizes of the trades.
+            interval (str): The interval of the bars, one of INTERVALS.
+            regular_hours (bool, optional): Whether to drop trades outside of regular trading hours.
+
+        Returns:
+            dict[str, np.ndarray]: The 'timestamp', 'open', 'high', 'low', 'close' and 'volume'
+            columns of the bars, oldest first.
+
+        Raises:
+            ValueError: If the interval is invalid or the arrays differ in length.
+        """
+
+        prices = np.asarray(prices)
+        return Resampler._resample(
+            timestamps,
+            prices,
+            prices,
+            prices,
+            prices,
+            sizes,
+            interval,
+            regular_hours,
+        )
+
+    def resample_bars(
+        timestamps: np.ndarray,
+        opens: np.ndarray,
+        highs: np.ndarray,
+        lows: np.ndarray,
+        closes: np.ndarray,
+        volumes: np.ndarray,
+        interval: str,
+        regular_hours: bool = False,
+    ) -> dict[str, np.ndarray]:
+        """
+        Aggregates bars into bars of a coarser interval.
+
+        Args:
+            timestamps (np.ndarray): The UTC start timestamps of the bars, as datetime64 or int64 nanoseconds.
+            opens (np.ndarray): The open prices of the bars.
+            highs (np.ndarray): The high prices of the bars.
+            lows (np.ndarray): The low prices of the bars.
+            closes (np.ndarray): The close prices of the bars.
+            volumes (np.ndarray): The volumes of the bars.
+            interval (str): The interval of the resulting bars, one of INTERVALS.
+            regular_hours (bool, optional): Whether to drop bars starting outside of regular trading hours.
+
+        Returns:
+            dict[str, np.ndarray]: The 'timestamp', 'open', 'high', 'low', 'close' and 'volume'
+            columns of the bars, oldest first.
+
+        Raises:
+            ValueError: If the interval is invalid or the arrays differ in length.
+        """
+
+        return Resampler._resample(
+            timestamps, opens, highs, lows, closes, volumes, interval, regular_hours
+        )
+
+    def align(time: datetime, interval: str) -> datetime:
+        """
+        Gets the start of the bar containing a point in time.
+
+        Args:
+            time (datetime): The point in time. Naive datetimes are treated as UTC.
+            interval (str): The interval of the bars, one of INTERVALS.
+
+        Returns:
+            datetime: The UTC start of the bar.
+        """
+
+        if time.tzinfo is None:
+            time = time.replace(tzinfo=timezone.utc)
+        ns = np.array([int(time.timestamp()) * 10**9], dtype=np.int64)
+        offsets = Resampler._utc_offsets(ns)
+        keys = Resampler._bucket_keys(ns + offsets, interval, False)
+        start = Resampler._to_utc(Resampler._bucket_starts(keys, interval, False))[0]
+        return datetime.fromtimestamp(start / 10**9, timezone.utc)
+
+    def _resample(
+        timestamps, opens, highs, lows, closes, volumes, interval, regular_hours
+    ) -> dict[str, np.ndarray]:
+        if interval not in Resampler.INTERVALS:
+            raise ValueError("Invalid interval specified.")
+
+        ns = np.asarray(timestamps)
+        if np.issubdtype(ns.dtype, np.datetime64):
+            ns = ns.astype("datetime64[ns]").astype(np.int64)
+        columns = [np.asarray(column) for column in (opens, highs, lows, closes)]
+        volumes = np.asarray(volumes)
+        if any(len(column) != len(ns) for column in (*columns, volumes)):
+            raise ValueError("Arrays must have the same length.")
+
+        # Sort by time, keeping the original order of equal timestamps
+        if len(ns) > 1 and np.any(ns[1:] < ns[:-1]):
+            order = np.argsort(ns, kind="stable")
+            ns, volumes = ns[order], volumes[order]
+            columns = [column[order] for column in columns]
+
+        local = ns + Resampler._utc_offsets(ns)
+
+        if regular_hours:
+            minutes = (local % NS_PER_DAY) // NS_PER_MINUTE
+            weekdays = (local // NS_PER_DAY + 3) % 7
+            mask = (
+                (minutes >= Resampler.SESSION_OPEN)
+                & (minutes < Resampler.SESSION_CLOSE)
+                & (weekdays < 5)
+            )
+            ns, local, volumes = ns[mask], local[mask], volumes[mask]
+            columns = [column[mask] for column in columns]
+
+        if len(ns) == 0:
+            return {
+                "timestamp": np.array([], dtype="datetime64[ns]"),
+                "open": columns[0][:0],
+                "high": columns[1][:0],
+                "low": columns[2][:0],
+                "close": columns[3][:0],
+                "volume": volumes[:0],
+            }
+
+        # Bars start wherever the bucket key changes
+        keys = Resampler._bucket_keys(local, interval, regular_hours)
+        starts = np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1))
+        ends = np.concatenate((starts[1:], [len(keys)])) - 1
+
+        opens, highs, lows, closes = columns
+        bucket_starts = Resampler._bucket_starts(keys[starts], interval, regular_hours)
+        return {
+            "timestamp": Resampler._to_utc(bucket_starts).astype("datetime64[ns]"),
+            "open": opens[starts],
+            "high": np.maximum.reduceat(highs, starts),
+            "low": np.minimum.reduceat(lows, starts),
+            "close": closes[ends],
+            "volume": np.add.reduceat(volumes, starts),
+        }
+
+    def _utc_offsets(ns: np.ndarray) -> np.ndarray:
+        # Offsets only change on the hour, so look them up once per distinct hour
+        hours, inverse = np.unique(ns // NS_PER_HOUR, return_inverse=True)
+        offsets = np.array(
+            [
+                datetime.fromtimestamp(int(hour) * 3600, Resampler.TIMEZONE)
+                .utcoffset()
+                .total_seconds()
+                * 10**9
+                for hour in hours
+            ],
+            dtype=np.int64,
+        )
+        return offsets[inverse.reshape(-1)]
+
+    def _to_utc(local: np.ndarray) -> np.ndarray:
+        # The offset at a local time is the offset at the UTC time it maps to, which is
+        # found from the offset of the first guess (exact except within a DST transition)
+        return local - Resampler._utc_offsets(local - Resampler._utc_offsets(local))
+
+    def _bucket_keys(
+        local: np.ndarray, interval: str, regular_hours: bool
+    ) -> np.ndarray:
+        if interval == "MINUTE":
+            return local // NS_PER_MINUTE
+        if interval == "HOUR":
+            if regular_hours:
+                # Align hours to the session open, e.g. 09:30, 10:30, ...
+                shift = (Resampler.SESSION_OPEN % 60) * NS_PER_MINUTE
+                return (local - shift) // NS_PER_HOUR
+            return local // NS_PER_HOUR
+        if interval == "DAY":
+            return local // NS_PER_DAY
+        if interval == "WEEK":
+            # The epoch is a Thursday, shift so that weeks start on Monday
+            return (local // NS_PER_DAY + 3) // 7
+        unit = "M" if interval == "MONTH" else "Y"
+        return (
+            local.astype("datetime64[ns]")
+            .astype(f"datetime64[{unit}]")
+            .astype(np.int64)
+        )
+
+    def _bucket_starts(
+        keys: np.ndarray, interval: str, regular_hours: bool
+    ) -> np.ndarray:
+        if interval == "MINUTE":
+            return keys * NS_PER_MINUTE
+        if interval == "HOUR":
+            if regular_hours:
+                return (
+                    keys * NS_PER_HOUR + (Resampler.SESSION_OPEN % 60) * NS_PER_MINUTE
+                )
+            return keys * NS_PER_HOUR
+        if interval == "DAY":
+            return keys * NS_PER_DAY
+        if interval == "WEEK":
+            return (keys * 7 - 3) * NS_PER_DAY
+        unit = "M" if interval == "MONTH" else "Y"
+        return (
+            keys.astype(f"datetime64[{unit}]").astype("datetime64[ns]").astype(np.int64)
+        )
@@ -66,6 +66,22 @@ class Tournament:
             )
         return True
 
+    def get_prize(place: int, first_prize: float) -> float:
+        """
+        Calculates the prize for a placement, halving with each place down to fourth.
+
+        Args:
+            place (int): The 1-based placement.
+            first_prize (float): The prize for first place.
+
+        Returns:
+            float: The prize, 0 below fourth place.
+        """
+
+        if 1 <= place <= 4:
+            return first_prize / 2 ** (place - 1)
+        return 0
+
     def __init__(self, name, duration, trading_rules, prizes):
         self.name = name
         self.duration = duration
@@ -175,19 +191,7 @@ class Tournament:
         print("Tournament is over. Calculating winners...")
 
     def distribute_prizes(self, participant):
-        first_place = self.prizes
-        second_place = self.prizes / 2
-        third_place = self.prizes / 4
-        fourth_place = self.prizes / 8
-
-        if participant.place == 1:
-            participant.user.balance += first_place
-        elif participant.place == 2:
-            participant.user.balance += second_place
-        elif participant.place == 3:
-            participant.user.balance += third_place
-        elif participant.place == 4:
-            participant.user.balance += fourth_place
+        participant.user.balance += Tournament.get_prize(participant.place, self.prizes)
 
     """
     Inner class used to keep track of participants in a tournament.
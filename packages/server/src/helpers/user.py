@@ -110,6 +110,38 @@ class User:
 
         return True
 
+    def configure_hasher(time_cost: int, memory_cost: int, parallelism: int) -> None:
+        """
+        Sets the Argon2 cost parameters used for new password hashes.
+        Existing hashes still verify, and are reported by `needs_rehash` until rehashed.
+
+        Args:
+            time_cost (int): The number of iterations.
+            memory_cost (int): The amount of memory to use in KiB.
+            parallelism (int): The number of parallel threads.
+        """
+
+        global ph
+        ph = PasswordHasher(
+            time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+        )
+
+    def needs_rehash(password_hash: str) -> bool:
+        """
+        Checks if a password hash was created with different cost parameters than the current ones.
+
+        Args:
+            password_hash (str): The password hash to check.
+
+        Returns:
+            bool: True if the password should be rehashed, False otherwise.
+        """
+
+        try:
+            return ph.check_needs_rehash(password_hash)
+        except:  # noqa: E722
+            return False
+
     def hash_password(password: str) -> str:
         """
         Hashes the given password.
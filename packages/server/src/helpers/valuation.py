@@ -0,0 +1,76 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Valuation class for computing the market value and P/L of portfolio positions
+
+import numpy as np
+
+
+class Valuation:
+    """
+    Computes the market value and profit and loss of the positions of a portfolio with NumPy.
+
+    All amounts are in cents. Daily P/L is measured from the previous close of each symbol and
+    total P/L from the cost basis of each position. A position without a known price is valued
+    at its cost basis, and a position without a known previous close has no daily P/L.
+    """
+
+    def value(
+        balance_cents: int,
+        holdings: list[dict],
+        prices: dict[str, int],
+        closes: dict[str, int],
+    ) -> dict:
+        """
+        Values the positions of a portfolio.
+
+        Args:
+            balance_cents (int): The cash balance of the portfolio.
+            holdings (list[dict]): The positions, each with a symbol, quantity and cost_basis_cents.
+            prices (dict[str, int]): The latest prices keyed by symbol.
+            closes (dict[str, int]): The previous closing prices keyed by symbol.
+
+        Returns:
+            dict: The 'balance_cents', 'market_value_cents', 'total_value_cents',
+            'cost_basis_cents', 'daily_pl_cents' and 'total_pl_cents' of the portfolio, and
+            its 'positions' with the quantity, price_cents, market_value_cents,
+            cost_basis_cents, daily_pl_cents and total_pl_cents of each symbol.
+        """
+
+        symbols = [holding["symbol"] for holding in holdings]
+        quantity = np.array(
+            [holding["quantity"] for holding in holdings], dtype=np.int64
+        )
+        cost_basis = np.array(
+            [holding["cost_basis_cents"] for holding in holdings], dtype=np.int64
+        )
+        priced = np.array([symbol in prices for symbol in symbols], dtype=bool)
+        price = np.array([prices.get(symbol, 0) for symbol in symbols], dtype=np.int64)
+        closed = priced & np.array([symbol in closes for symbol in symbols], dtype=bool)
+        close = np.array([closes.get(symbol, 0) for symbol in symbols], dtype=np.int64)
+
+        market_value = np.where(priced, quantity * price, cost_basis)
+        daily_pl = np.where(closed, quantity * (price - close), 0)
+        total_pl = market_value - cost_basis
+
+        positions = [
+            {
+                "symbol": symbol,
+                "quantity": int(quantity[i]),
+                "price_cents": int(price[i]) if priced[i] else None,
+                "market_value_cents": int(market_value[i]),
+                "cost_basis_cents": int(cost_basis[i]),
+                "daily_pl_cents": int(daily_pl[i]),
+                "total_pl_cents": int(total_pl[i]),
+            }
+            for i, symbol in enumerate(symbols)
+        ]
+
+        market_value_cents = int(market_value.sum())
+        return {
+            "balance_cents": int(balance_cents),
+            "market_value_cents": market_value_cents,
+            "total_value_cents": int(balance_cents) + market_value_cents,
+            "cost_basis_cents": int(cost_basis.sum()),
+            "daily_pl_cents": int(daily_pl.sum()),
+            "total_pl_cents": int(total_pl.sum()),
+            "positions": positions,
+        }
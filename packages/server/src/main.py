@@ -1,8 +1,11 @@
 # @author: adibarra (Alec Ibarra)
 # @description: The main entry point for the server.
 
+import asyncio
+from contextlib import asynccontextmanager
+
 import uvicorn
-from config import API_CORS_ORIGINS, API_HOST, API_PORT
+from config import APCA_STREAM, API_CORS_ORIGINS, API_HOST, API_PORT
 from fastapi import FastAPI, HTTPException, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
@@ -14,8 +17,28 @@ from routes.api.v1.sessions import router as sessions_router
 from routes.api.v1.tournaments import router as tournaments_router
 from routes.api.v1.transactions import router as transactions_router
 from routes.api.v1.users import router as users_router
+from services.alpaca.alpaca import STREAM
+from services.alpaca.refresher import REFRESHER
+from services.database import AsyncDatabase
+from services.tournaments.scheduler import SCHEDULER
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    adb = AsyncDatabase()
+    await adb.open()
+    if APCA_STREAM:
+        STREAM.start()
+    REFRESHER.start()
+    SCHEDULER.start()
+    yield
+    await SCHEDULER.stop()
+    await asyncio.to_thread(REFRESHER.stop)
+    await asyncio.to_thread(STREAM.stop)
+    await adb.close()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,104 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Local stand-in for the Alpaca trades websocket which replays recorded trade files.
+
+import argparse
+import asyncio
+import json
+from datetime import datetime
+
+import websockets
+
+
+def load_trades(paths: list[str]) -> list[dict]:
+    """
+    Loads trades from files with one trade message per line, sorted by time.
+
+    Each line holds a trade as sent by the Alpaca feed, e.g.
+    {"T": "t", "S": "AAPL", "p": 189.98, "s": 100, "t": "2024-04-01T13:30:00.000000000Z"}
+    """
+
+    trades = []
+    for path in paths:
+        with open(path) as file:
+            trades.extend(json.loads(line) for line in file if line.strip())
+    return sorted(trades, key=lambda trade: trade["t"])
+
+
+def parse_time(timestamp: str) -> float:
+    return datetime.strptime(timestamp[:-4], "%Y-%m-%dT%H:%M:%S.%f").timestamp()
+
+
+async def replay(websocket, trades: list[dict], speed: float, loop: bool) -> None:
+    """
+    Serves a single client, following the connect/auth/subscribe flow of the Alpaca feed.
+    """
+
+    subscribed = set()
+
+    async def receive():
+        async for message in websocket:
+            request = json.loads(message)
+            symbols = set(request.get("trades", []))
+            if request.get("action") == "subscribe":
+                subscribed.update(symbols)
+            elif request.get("action") == "unsubscribe":
+                subscribed.difference_update(symbols)
+            await websocket.send(
+                json.dumps([{"T": "subscription", "trades": sorted(subscribed)}])
+            )
+
+    await websocket.send(json.dumps([{"T": "success", "msg": "connected"}]))
+    await websocket.recv()
+    await websocket.send(json.dumps([{"T": "success", "msg": "authenticated"}]))
+
+    receiver = asyncio.create_task(receive())
+    try:
+        while True:
+            previous = None
+            for trade in trades:
+                current = parse_time(trade["t"])
+                if previous is not None and speed > 0:
+                    await asyncio.sleep(max(current - previous, 0) / speed)
+                previous = current
+
+                if "*" in subscribed or trade["S"] in subscribed:
+                    await websocket.send(json.dumps([trade]))
+            if not loop:
+                break
+        await receiver
+    except websockets.ConnectionClosed:
+        pass
+    finally:
+        receiver.cancel()
+
+
+async def main(args: argparse.Namespace) -> None:
+    trades = load_trades(args.files)
+    print(
+        f"Replaying {len(trades)} trades on ws://{args.host}:{args.port}...", flush=True
+    )
+
+    async def handler(websocket):
+        await replay(websocket, trades, args.speed, args.loop)
+
+    async with websockets.serve(handler, args.host, args.port):
+        await asyncio.Future()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Replays recorded trade files over a local Alpaca-style websocket."
+    )
+    parser.add_argument("files", nargs="+", help="recorded trade files to replay")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="playback speed multiplier, 0 to replay as fast as possible",
+    )
+    parser.add_argument(
+        "--loop", action="store_true", help="restart from the beginning when done"
+    )
+    asyncio.run(main(parser.parse_args()))
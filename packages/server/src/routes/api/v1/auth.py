@@ -0,0 +1,46 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Authentication dependency shared by the API routes
+
+from config import SESSION_TOKEN_KEY, SESSION_TOKEN_MODE
+from fastapi import Header, HTTPException, status
+from helpers.token import Token
+from services.database import AsyncDatabase
+
+adb = AsyncDatabase()
+
+
+async def authenticateToken(
+    authorization: str = Header(...),
+) -> tuple[str, str]:
+    """
+    Authenticates a request by the session token in its Authorization header.
+    Session lookups are cached in-process, so most requests do not hit the database.
+    With signed session tokens, the token is verified without a lookup and only checked
+    against the in-process snapshot of the denylist.
+
+    Returns:
+        tuple[str, str]: The uuid of the token owner and the token.
+    """
+
+    if not len(authorization.split(" ")) == 2:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bad Request",
+        )
+
+    token = authorization.split(" ")[1]
+    if SESSION_TOKEN_MODE == "signed":
+        claims = Token.verify(token, SESSION_TOKEN_KEY)
+        revoked = claims is None or await adb.is_token_revoked(claims["jti"])
+        token_owner = None if revoked else claims["sub"]
+    else:
+        token_owner = await adb.get_session(token)
+
+    # Validate the token exists
+    if token_owner is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Unauthorized",
+        )
+
+    return token_owner, token
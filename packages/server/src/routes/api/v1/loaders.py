@@ -0,0 +1,49 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Request-scoped entity loaders shared by the API routes
+
+from fastapi import Request
+from helpers.loader import Loader
+from services.database import AsyncDatabase
+
+adb = AsyncDatabase()
+
+
+def batch(fetch):
+    """
+    Wraps a database method which fetches rows by a list of uuids into a loader batch function.
+    """
+
+    async def batch_load(uuids: list[str]) -> dict:
+        rows = await fetch(uuids)
+        if rows is None:
+            # Raised instead of loading as not found, the loader does not memoize failures
+            raise RuntimeError(f"Failed to load {fetch.__name__}")
+        return {str(row["uuid"]): row for row in rows}
+
+    return batch_load
+
+
+class Loaders:
+    """
+    The entity loaders of a single request.
+
+    Authentication dependencies and route handlers load entities through the same loaders,
+    so each entity is fetched at most once per request. Keys are uuid strings.
+    """
+
+    def __init__(self):
+        self.portfolios = Loader(batch(adb.get_portfolios_by_uuids))
+        self.tournaments = Loader(batch(adb.get_tournaments_by_uuids))
+        self.transactions = Loader(batch(adb.get_transactions_by_uuids))
+        self.users = Loader(batch(adb.get_users_by_uuids))
+
+
+def getLoaders(request: Request) -> Loaders:
+    """
+    Retrieves the loaders of the current request, creating them on first use.
+    """
+
+    loaders = getattr(request.state, "loaders", None)
+    if loaders is None:
+        loaders = request.state.loaders = Loaders()
+    return loaders
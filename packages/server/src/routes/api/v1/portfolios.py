@@ -1,17 +1,26 @@
 # @author: adibarra (Alec Ibarra), caleb-j-kim (Caleb Kim)
 # @description: Portfolio routes for the API
 
+import asyncio
 from datetime import datetime
 from typing import List, Optional
 
 from fastapi import APIRouter, Body, Depends, Header, HTTPException, Path, status
+from helpers.pagination import Pagination
 from helpers.portfolio import Portfolio
 from pydantic import UUID4, BaseModel
-from services.database import Database
+from routes.api.v1.auth import authenticateToken
+from routes.api.v1.loaders import Loaders, getLoaders
+from services.database import AsyncDatabase
+from services.leaderboard.leaderboard import LEADERBOARDS
+from services.valuation import ValuationService
 
-db = Database()
+adb = AsyncDatabase()
 router = APIRouter(prefix="/api/v1")
 
+# Maximum number of portfolios which can be valued at once
+MAX_VALUATION_PORTFOLIOS = 50
+
 
 class PortfolioData(BaseModel):
     uuid: UUID4
@@ -52,6 +61,31 @@ class GetPortfoliosRequest(BaseModel):
         exclude_none = True
 
 
+class PositionData(BaseModel):
+    symbol: str
+    quantity: int
+    price_cents: Optional[int] = None
+    market_value_cents: int
+    cost_basis_cents: int
+    daily_pl_cents: int
+    total_pl_cents: int
+
+
+class ValuationData(BaseModel):
+    portfolio: UUID4
+    balance_cents: int
+    market_value_cents: int
+    total_value_cents: int
+    cost_basis_cents: int
+    daily_pl_cents: int
+    total_pl_cents: int
+    positions: List[PositionData]
+
+
+class ValuationsRequest(BaseModel):
+    portfolios: List[UUID4]
+
+
 class PortfolioResponse(BaseModel):
     code: int
     message: str
@@ -62,38 +96,36 @@ class PortfoliosResponse(BaseModel):
     code: int
     message: str
     data: List[PortfolioData]
+    next_cursor: Optional[str] = None
 
 
-async def authenticateToken(
-    authorization: str = Header(...),
-) -> tuple[str, str]:
-    if not len(authorization.split(" ")) == 2:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Bad Request",
-        )
+class ValuationResponse(BaseModel):
+    code: int
+    message: str
+    data: ValuationData
 
-    token = authorization.split(" ")[1]
-    token_owner = db.get_session(token)
 
-    # Validate the token exists
-    if token_owner is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Unauthorized",
-        )
-
-    return token_owner, token
+class ValuationsResponse(BaseModel):
+    code: int
+    message: str
+    data: List[ValuationData]
 
 
 async def authenticate(
     authorization: str = Header(...),
     portfolio_uuid: UUID4 = Path(...),
+    loaders: Loaders = Depends(getLoaders),
 ) -> tuple[str, str]:
     token_owner, token = await authenticateToken(authorization)
 
+    portfolio = await loaders.portfolios.load(str(portfolio_uuid))
+    if portfolio is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found",
+        )
+
     # Validate the token has permission for this portfolio
-    portfolio = db.get_portfolio(str(portfolio_uuid))
     if token_owner != str(portfolio["owner"]):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -106,7 +138,7 @@ async def authenticate(
 @router.post(
     "/portfolios", response_model=PortfolioResponse, status_code=status.HTTP_200_OK
 )
-def create_portfolio(
+async def create_portfolio(
     data: CreatePortfolioRequest = Body(...),
     auth: tuple[str, str] = Depends(authenticateToken),
 ):
@@ -120,7 +152,7 @@ def create_portfolio(
             detail="Bad Request",
         )
 
-    portfolio = db.create_portfolio(
+    portfolio = await adb.create_portfolio(
         token_owner,
         data.name,
         str(data.tournament) if data.tournament is not None else None,
@@ -130,6 +162,7 @@ def create_portfolio(
             status_code=status.HTTP_409_CONFLICT,
             detail="Conflict",
         )
+    LEADERBOARDS.on_portfolio_created(portfolio)
 
     return PortfolioResponse(
         code=200,
@@ -141,12 +174,13 @@ def create_portfolio(
 @router.get(
     "/portfolios", response_model=PortfoliosResponse, status_code=status.HTTP_200_OK
 )
-def get_portfolios(
+async def get_portfolios(
     owner: Optional[UUID4] = None,
     tournament: Optional[UUID4] = None,
     name: Optional[str] = None,
     offset: Optional[int] = None,
     limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     auth: tuple[str, str] = Depends(authenticateToken),
 ):
     token_owner = auth[0]
@@ -158,18 +192,81 @@ def get_portfolios(
             detail="Forbidden",
         )
 
-    portfolios = db.get_portfolios(
+    after = None
+    if cursor is not None:
+        after = Pagination.decode_cursor(cursor)
+        if after is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Bad Request",
+            )
+
+    limit = 10 if limit is None else limit
+    portfolios = await adb.get_portfolios(
         owner=str(owner) if owner is not None else None,
         tournament=str(tournament) if tournament is not None else None,
         name=name,
         offset=offset,
-        limit=limit,
+        limit=limit + 1,
+        after=after,
     )
+    if portfolios is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal Server Error",
+        )
 
+    portfolios, next_cursor = Pagination.page(portfolios, limit)
     return PortfoliosResponse(
         code=200,
         message="Ok",
         data=portfolios,
+        next_cursor=next_cursor,
+    )
+
+
+@router.post(
+    "/portfolios/valuations",
+    response_model=ValuationsResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_portfolio_valuations(
+    data: ValuationsRequest = Body(...),
+    auth: tuple[str, str] = Depends(authenticateToken),
+    loaders: Loaders = Depends(getLoaders),
+):
+    uuids = list(dict.fromkeys(str(uuid) for uuid in data.portfolios))
+    if not 0 < len(uuids) <= MAX_VALUATION_PORTFOLIOS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bad Request",
+        )
+
+    portfolios = await loaders.portfolios.load_many(uuids)
+    if any(portfolio is None for portfolio in portfolios):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found",
+        )
+
+    # Validate the token has permission for every portfolio
+    if any(auth[0] != str(portfolio["owner"]) for portfolio in portfolios):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Forbidden",
+        )
+
+    valuations = await asyncio.to_thread(ValuationService.get_valuations, portfolios)
+    if valuations is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal Server Error",
+        )
+
+    return ValuationsResponse(
+        code=200,
+        message="Ok",
+        data=[{"portfolio": uuid, **valuations[uuid]} for uuid in uuids],
     )
 
 
@@ -178,11 +275,12 @@ def get_portfolios(
     response_model=PortfolioResponse,
     status_code=status.HTTP_200_OK,
 )
-def get_portfolio_by_uuid(
+async def get_portfolio_by_uuid(
     portfolio_uuid: UUID4 = Path(...),
     auth: tuple[str, str] = Depends(authenticate),
+    loaders: Loaders = Depends(getLoaders),
 ):
-    portfolio = db.get_portfolio(str(portfolio_uuid))
+    portfolio = await loaders.portfolios.load(str(portfolio_uuid))
     if portfolio is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -196,17 +294,49 @@ def get_portfolio_by_uuid(
     )
 
 
+@router.get(
+    "/portfolios/{portfolio_uuid}/valuation",
+    response_model=ValuationResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_portfolio_valuation(
+    portfolio_uuid: UUID4 = Path(...),
+    auth: tuple[str, str] = Depends(authenticate),
+    loaders: Loaders = Depends(getLoaders),
+):
+    portfolio = await loaders.portfolios.load(str(portfolio_uuid))
+    if portfolio is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found",
+        )
+
+    valuation = await asyncio.to_thread(ValuationService.get_valuation, portfolio)
+    if valuation is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal Server Error",
+        )
+
+    return ValuationResponse(
+        code=200,
+        message="Ok",
+        data={"portfolio": portfolio["uuid"], **valuation},
+    )
+
+
 @router.patch(
     "/portfolios/{portfolio_uuid}",
     response_model=PortfolioResponse,
     status_code=status.HTTP_200_OK,
 )
-def update_portfolio(
+async def update_portfolio(
     portfolio_uuid: UUID4 = Path(...),
     data: UpdatePortfolioRequest = Body(...),
     auth: tuple[str, str] = Depends(authenticate),
+    loaders: Loaders = Depends(getLoaders),
 ):
-    portfolio = db.get_portfolio(str(portfolio_uuid))
+    portfolio = await loaders.portfolios.load(str(portfolio_uuid))
     if portfolio is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -222,7 +352,7 @@ def update_portfolio(
                 detail="Bad Request",
             )
 
-    if not db.update_portfolio(str(portfolio_uuid), data.name):
+    if not await adb.update_portfolio(str(portfolio_uuid), data.name):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal Server Error",
@@ -239,22 +369,24 @@ def update_portfolio(
     response_model=PortfolioResponse,
     status_code=status.HTTP_200_OK,
 )
-def remove_portfolio(
+async def remove_portfolio(
     portfolio_uuid: UUID4 = Path(...),
     auth: tuple[str, str] = Depends(authenticate),
+    loaders: Loaders = Depends(getLoaders),
 ):
-    portfolio = db.get_portfolio(str(portfolio_uuid))
+    portfolio = await loaders.portfolios.load(str(portfolio_uuid))
     if portfolio is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Not Found",
         )
 
-    if not db.delete_portfolio(str(portfolio_uuid)):
+    if not await adb.delete_portfolio(str(portfolio_uuid)):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal Server Error",
         )
+    LEADERBOARDS.on_portfolio_deleted(str(portfolio_uuid))
 
     return PortfolioResponse(
         code=200,
@@ -1,19 +1,34 @@
 # @author: adibarra (Alec Ibarra), caleb-j-kim (Caleb Kim)
 # @description: Quote routes for the API
 
-from datetime import datetime
+import json
+from dataclasses import asdict
+from datetime import datetime, timezone
+from itertools import chain, islice
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Path, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi.responses import StreamingResponse
+from helpers.quote import Quote
 from pydantic import BaseModel
+from routes.api.v1.auth import authenticateToken
 from services.alpaca import AlpacaService
-from services.database import Database
+from services.alpaca.alpaca import AlpacaError
+from services.alpaca.bars import BarStore
 
-db = Database()
 router = APIRouter(
     prefix="/api/v1",
 )
 
+# Maximum number of symbols which can be requested at once
+MAX_QUOTE_SYMBOLS = 100
+
+# Maximum number of historical bars which can be requested at once
+MAX_HISTORICAL_LIMIT = 1000
+
+# Maximum number of historical trades which can be streamed at once
+MAX_HISTORICAL_TRADES_LIMIT = 10000
+
 
 class QuoteData(BaseModel):
     symbol: str
@@ -30,7 +45,7 @@ class QuoteResponse(BaseModel):
         exclude_none = True
 
 
-class QuoteHistoricalResponse(BaseModel):
+class QuotesResponse(BaseModel):
     code: int
     message: str
     data: Optional[list[QuoteData]] = None
@@ -39,26 +54,47 @@ class QuoteHistoricalResponse(BaseModel):
         exclude_none = True
 
 
-async def authenticate(
-    authorization: str = Header(...),
-) -> tuple[str, str]:
-    if not len(authorization.split(" ")) == 2:
+class QuoteBarData(QuoteData):
+    open_cents: int
+    high_cents: int
+    low_cents: int
+    close_cents: int
+    volume: int
+
+
+class QuoteHistoricalResponse(BaseModel):
+    code: int
+    message: str
+    data: Optional[list[QuoteBarData]] = None
+
+    class Config:
+        exclude_none = True
+
+
+@router.get("/quotes", response_model=QuotesResponse, status_code=status.HTTP_200_OK)
+def get_quotes(
+    symbols: str = Query(...),
+    auth: tuple[str, str] = Depends(authenticateToken),
+):
+    symbols = [symbol.strip().upper() for symbol in symbols.split(",")]
+    symbols = [symbol for symbol in dict.fromkeys(symbols) if symbol]
+    if (
+        not symbols
+        or len(symbols) > MAX_QUOTE_SYMBOLS
+        or not all(Quote.is_valid_symbol(symbol) for symbol in symbols)
+    ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Bad Request",
         )
 
-    token = authorization.split(" ")[1]
-    token_owner = db.get_session(token)
-
-    # Validate the token exists
-    if token_owner is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Unauthorized",
-        )
+    quotes = AlpacaService.get_quotes(symbols)
 
-    return token_owner, token
+    return QuotesResponse(
+        code=200,
+        message="Ok",
+        data=[quotes[symbol] for symbol in symbols if symbol in quotes],
+    )
 
 
 @router.get(
@@ -66,9 +102,15 @@ async def authenticate(
 )
 def get_quote(
     symbol: str = Path(...),
-    auth: tuple[str, str] = Depends(authenticate),
+    auth: tuple[str, str] = Depends(authenticateToken),
 ):
     symbol = symbol.upper()[:4]
+    if not Quote.is_valid_symbol(symbol):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bad Request",
+        )
+
     quote = AlpacaService.get_quote(symbol)
 
     if quote is None:
@@ -91,24 +133,96 @@ def get_quote(
 )
 def get_historical_quote(
     symbol: str = Path(...),
-    start_date: datetime = None,
-    end_date: datetime = None,
-    interval: str = None,
+    start_date: datetime = Query(...),
+    end_date: datetime = Query(...),
+    interval: str = Query(...),
     limit: int = 10,
     offset: int = 0,
-    auth: tuple[str, str] = Depends(authenticate),
+    auth: tuple[str, str] = Depends(authenticateToken),
 ):
-    # TODO: implement get_quote_historical in quotes helper class
-    # it should access the external api to get the quote historical data
-    quote_data = [{}]
-    if quote_data is None:
+    symbol = symbol.upper()
+    interval = interval.upper()
+
+    # Treat dates without a timezone as UTC
+    if start_date.tzinfo is None:
+        start_date = start_date.replace(tzinfo=timezone.utc)
+    if end_date.tzinfo is None:
+        end_date = end_date.replace(tzinfo=timezone.utc)
+
+    if (
+        not Quote.is_valid_symbol(symbol)
+        or interval not in Quote.INTERVALS
+        or start_date >= end_date
+        or end_date - start_date > BarStore.get_max_span(interval)
+        or not 0 < limit <= MAX_HISTORICAL_LIMIT
+        or offset < 0
+    ):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Not Found",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bad Request",
+        )
+
+    bars = BarStore.get_bars(symbol, interval, start_date, end_date, offset, limit)
+    if bars is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal Server Error",
         )
 
     return QuoteHistoricalResponse(
         code=200,
         message="Ok",
-        data=quote_data,
+        data=[
+            {**bar, "symbol": symbol, "price_cents": bar["close_cents"]} for bar in bars
+        ],
     )
+
+
+@router.get("/quotes/{symbol}/historical/trades", status_code=status.HTTP_200_OK)
+def get_historical_trades(
+    symbol: str = Path(...),
+    start_date: datetime = Query(...),
+    end_date: datetime = Query(...),
+    limit: Optional[int] = Query(
+        MAX_HISTORICAL_TRADES_LIMIT, le=MAX_HISTORICAL_TRADES_LIMIT
+    ),
+    auth: tuple[str, str] = Depends(authenticateToken),
+):
+    symbol = symbol.upper()
+
+    # Treat dates without a timezone as UTC
+    if start_date.tzinfo is None:
+        start_date = start_date.replace(tzinfo=timezone.utc)
+    if end_date.tzinfo is None:
+        end_date = end_date.replace(tzinfo=timezone.utc)
+
+    if not Quote.is_valid_symbol(symbol) or start_date >= end_date or limit <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bad Request",
+        )
+
+    trades = islice(AlpacaService.iter_trades(symbol, start_date, end_date), limit)
+
+    # Fetch the first page up front, so upstream errors can still change the status code
+    try:
+        first = list(islice(trades, 1))
+    except AlpacaError as e:
+        print("Failed to get historical trades:", e, flush=True)
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Bad Gateway",
+        )
+
+    def stream():
+        try:
+            for trade in chain(first, trades):
+                data = asdict(trade)
+                data["timestamp"] = trade.timestamp.isoformat()
+                yield json.dumps(data) + "\n"
+        except AlpacaError as e:
+            # The status code has already been sent, so flag the truncation in the body
+            print("Failed to get historical trades:", e, flush=True)
+            yield json.dumps({"code": 502, "message": "Bad Gateway"}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
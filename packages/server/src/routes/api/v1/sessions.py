@@ -3,20 +3,35 @@
 
 from typing import Optional
 
-from fastapi import APIRouter, Body, Depends, Header, HTTPException, status
+from config import (
+    SESSION_LOGIN_CONCURRENCY_IP,
+    SESSION_LOGIN_CONCURRENCY_USER,
+    SESSION_TOKEN_KEY,
+    SESSION_TOKEN_MODE,
+    SESSION_TOKEN_TTL,
+)
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, status
+from helpers.concurrency import ConcurrencyLimiter
+from helpers.token import Token
 from helpers.user import User
 from pydantic import UUID4, BaseModel
-from services.database import Database
+from routes.api.v1.auth import authenticateToken
+from services.database import AsyncDatabase
+from services.passwords import PasswordService
+from services.passwords.passwords import PasswordServiceBusy
 
-db = Database()
+adb = AsyncDatabase()
 router = APIRouter(
     prefix="/api/v1",
 )
 
+# Concurrent login attempts per username and per client address
+LOGINS = ConcurrencyLimiter()
+
 
 class SessionData(BaseModel):
     owner: UUID4
-    token: UUID4
+    token: str
 
 
 class SessionRequest(BaseModel):
@@ -33,35 +48,40 @@ class SessionResponse(BaseModel):
         exclude_none = True
 
 
-async def authenticate(
-    authorization: str = Header(...),
-) -> tuple[str, str]:
-    if not len(authorization.split(" ")) == 2:
+@router.post(
+    "/sessions", response_model=SessionResponse, status_code=status.HTTP_200_OK
+)
+async def create_session(
+    request: Request,
+    data: SessionRequest = Body(...),
+):
+    # Limit concurrent attempts, so a burst of logins cannot monopolize password hashing
+    limits = {
+        ("username", data.username.lower()): SESSION_LOGIN_CONCURRENCY_USER,
+        ("ip", request.client.host if request.client else None): (
+            SESSION_LOGIN_CONCURRENCY_IP
+        ),
+    }
+    if not LOGINS.acquire(limits):
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Bad Request",
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too Many Requests",
         )
 
-    token = authorization.split(" ")[1]
-    token_owner = db.get_session(token)
-
-    # Validate the token exists
-    if token_owner is None:
+    try:
+        return await login(data)
+    except PasswordServiceBusy:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Unauthorized",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service Unavailable",
         )
-    return token_owner, token
+    finally:
+        LOGINS.release(limits)
 
 
-@router.post(
-    "/sessions", response_model=SessionResponse, status_code=status.HTTP_200_OK
-)
-def create_session(
-    data: SessionRequest = Body(...),
-):
+async def login(data: SessionRequest) -> SessionResponse:
     # Check if user exists
-    user = db.get_user_by_username(data.username)
+    user = await adb.get_user_by_username(data.username)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -69,14 +89,25 @@ def create_session(
         )
 
     # Verify password
-    if not User.verify_password(data.password, user["password_hash"]):
+    if not await PasswordService.verify_password(data.password, user["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Forbidden",
         )
 
+    # Upgrade the hash if the cost parameters changed since it was created
+    if User.needs_rehash(user["password_hash"]):
+        password_hash = await PasswordService.hash_password(data.password)
+        await adb.update_user(user["uuid"], password_hash=password_hash)
+
     # User has been authenticated, create a session
-    session = db.create_session(str(user["uuid"]))
+    if SESSION_TOKEN_MODE == "signed":
+        token = Token.sign(user["uuid"], SESSION_TOKEN_KEY, SESSION_TOKEN_TTL)
+        return SessionResponse(
+            code=200, message="Ok", data={"owner": user["uuid"], "token": token}
+        )
+
+    session = await adb.create_session(user["uuid"])
     if session is None:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -89,10 +120,18 @@ def create_session(
 @router.delete(
     "/sessions", response_model=SessionResponse, status_code=status.HTTP_200_OK
 )
-def delete_session(
-    auth: tuple[str, str] = Depends(authenticate),
+async def delete_session(
+    auth: tuple[str, str] = Depends(authenticateToken),
 ):
-    if not db.delete_session(auth[1]):
+    if SESSION_TOKEN_MODE == "signed":
+        claims = Token.verify(auth[1], SESSION_TOKEN_KEY)
+        deleted = claims is not None and await adb.revoke_token(
+            claims["jti"], claims["exp"]
+        )
+    else:
+        deleted = await adb.delete_session(auth[1])
+
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Not Found",
@@ -1,18 +1,36 @@
 # @author: adibarra (Alec Ibarra), caleb-j-kim (Caleb Kim)
-# @description: Portfolio routes for the API
+# @description: Tournament routes for the API
 
+import asyncio
 from datetime import datetime
 from enum import Enum
 from typing import List, Optional
 
-from fastapi import APIRouter, Body, Depends, Header, HTTPException, Path, status
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    status,
+)
+from helpers.pagination import Pagination
 from helpers.tournament import Tournament
 from pydantic import UUID4, BaseModel
-from services.database import Database
+from routes.api.v1.auth import authenticateToken
+from routes.api.v1.loaders import Loaders, getLoaders
+from services.database import AsyncDatabase
+from services.leaderboard.leaderboard import LEADERBOARDS
+from services.tournaments.scheduler import SCHEDULER
 
-db = Database()
+adb = AsyncDatabase()
 router = APIRouter(prefix="/api/v1")
 
+# Maximum number of leaderboard entries which can be requested at once
+MAX_LEADERBOARD_LIMIT = 100
+
 
 class TournamentStatus(Enum):
     SCHEDULED = "SCHEDULED"
@@ -59,40 +77,44 @@ class TournamentsResponse(BaseModel):
     code: int
     message: str
     data: Optional[List[TournamentData]] = None
+    next_cursor: Optional[str] = None
 
     class Config:
         exclude_none = True
 
 
-async def authenticateToken(
-    authorization: str = Header(...),
-) -> tuple[str, str]:
-    if not len(authorization.split(" ")) == 2:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Bad Request",
-        )
+class LeaderboardEntry(BaseModel):
+    rank: int
+    portfolio: UUID4
+    owner: UUID4
+    name: str
+    value_cents: int
+    prize_coins: Optional[int] = None
 
-    token = authorization.split(" ")[1]
-    token_owner = db.get_session(token)
 
-    # Validate the token exists
-    if token_owner is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Unauthorized",
-        )
+class LeaderboardData(BaseModel):
+    total: int
+    entries: List[LeaderboardEntry]
+    me: Optional[LeaderboardEntry] = None
 
-    return token_owner, token
+
+class LeaderboardResponse(BaseModel):
+    code: int
+    message: str
+    data: Optional[LeaderboardData] = None
+
+    class Config:
+        exclude_none = True
 
 
 async def authenticate(
     authorization: str = Header(...),
     tournament_uuid: UUID4 = Path(...),
+    loaders: Loaders = Depends(getLoaders),
 ) -> tuple[str, str]:
     token_owner, token = await authenticateToken(authorization)
 
-    tournament = db.get_tournament(str(tournament_uuid))
+    tournament = await loaders.tournaments.load(str(tournament_uuid))
     if tournament is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -114,7 +136,7 @@ async def authenticate(
     response_model=TournamentResponse,
     status_code=status.HTTP_200_OK,
 )
-def create_tournament(
+async def create_tournament(
     data: CreateTournamentRequest = Body(...),
     auth: tuple[str, str] = Depends(authenticateToken),
 ):
@@ -127,9 +149,11 @@ def create_tournament(
             detail="Bad Request",
         )
 
-    tournaments = db.create_tournament(
+    tournaments = await adb.create_tournament(
         auth[0], data.name, data.start_date, data.end_date
     )
+    if tournaments is not None:
+        SCHEDULER.schedule(data.start_date, data.end_date)
     return TournamentResponse(
         code=200,
         message="Ok",
@@ -142,29 +166,48 @@ def create_tournament(
     response_model=TournamentsResponse,
     status_code=status.HTTP_200_OK,
 )
-def get_tournaments(
+async def get_tournaments(
     name: str = None,
     owner: UUID4 = None,
-    status: str = None,
+    tournament_status: str = Query(None, alias="status"),
     start_date: datetime = None,
     end_date: datetime = None,
     offset: int = 0,
     limit: int = 10,
+    cursor: Optional[str] = None,
     auth: tuple[str, str] = Depends(authenticateToken),
 ):
-    tournaments = db.get_tournaments(
+    after = None
+    if cursor is not None:
+        after = Pagination.decode_cursor(cursor)
+        if after is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Bad Request",
+            )
+
+    tournaments = await adb.get_tournaments(
         owner=str(owner) if owner is not None else None,
         name=name,
-        status=status,
+        status=tournament_status,
         start_date=start_date,
         end_date=end_date,
         offset=offset,
-        limit=limit,
+        limit=limit + 1,
+        after=after,
     )
+    if tournaments is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal Server Error",
+        )
+
+    tournaments, next_cursor = Pagination.page(tournaments, limit)
     return TournamentsResponse(
         code=200,
         message="Ok",
         data=tournaments,
+        next_cursor=next_cursor,
     )
 
 
@@ -173,11 +216,12 @@ def get_tournaments(
     response_model=TournamentResponse,
     status_code=status.HTTP_200_OK,
 )
-def get_tournament(
+async def get_tournament(
     tournament_uuid: UUID4 = Path(...),
     auth: tuple[str, str] = Depends(authenticateToken),
+    loaders: Loaders = Depends(getLoaders),
 ):
-    tournament = db.get_tournament(str(tournament_uuid))
+    tournament = await loaders.tournaments.load(str(tournament_uuid))
     if tournament is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -190,15 +234,79 @@ def get_tournament(
     )
 
 
+@router.get(
+    "/tournaments/{tournament_uuid}/leaderboard",
+    response_model=LeaderboardResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_leaderboard(
+    tournament_uuid: UUID4 = Path(...),
+    offset: int = 0,
+    limit: int = 10,
+    auth: tuple[str, str] = Depends(authenticateToken),
+    loaders: Loaders = Depends(getLoaders),
+):
+    if not 0 < limit <= MAX_LEADERBOARD_LIMIT or offset < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bad Request",
+        )
+
+    tournament = await loaders.tournaments.load(str(tournament_uuid))
+    if tournament is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found",
+        )
+
+    # The standings of finished tournaments were frozen when they ended
+    if tournament["status"] == TournamentStatus.FINISHED.value:
+        standings = await adb.get_tournament_standings(str(tournament_uuid))
+        if standings is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Internal Server Error",
+            )
+        return LeaderboardResponse(
+            code=200,
+            message="Ok",
+            data={
+                "total": len(standings),
+                "entries": standings[offset : offset + limit],
+                "me": next(
+                    (entry for entry in standings if str(entry["owner"]) == auth[0]),
+                    None,
+                ),
+            },
+        )
+
+    # Only the first read of a tournament touches the database and quotes
+    standings = await asyncio.to_thread(
+        LEADERBOARDS.get_standings, str(tournament_uuid), auth[0], limit, offset
+    )
+    if standings is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal Server Error",
+        )
+
+    return LeaderboardResponse(
+        code=200,
+        message="Ok",
+        data=standings,
+    )
+
+
 @router.patch(
     "/tournaments/{tournament_uuid}",
     response_model=TournamentResponse,
     status_code=status.HTTP_200_OK,
 )
-def update_tournament(
+async def update_tournament(
     tournament_uuid: UUID4 = Path(...),
     data: UpdateTournamentRequest = Body(...),
     auth: tuple[str, str] = Depends(authenticate),
+    loaders: Loaders = Depends(getLoaders),
 ):
     try:
         Tournament.validate_name(data.name)
@@ -209,20 +317,24 @@ def update_tournament(
             detail="Bad Request",
         )
 
-    tournament = db.get_tournament(str(tournament_uuid))
+    tournament = await loaders.tournaments.load(str(tournament_uuid))
     if tournament is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Not Found",
         )
 
-    if not db.update_tournament(
+    if not await adb.update_tournament(
         str(tournament_uuid), data.name, data.start_date, data.end_date
     ):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal Server Error",
         )
+    SCHEDULER.schedule(
+        data.start_date or tournament["start_date"],
+        data.end_date or tournament["end_date"],
+    )
 
     return TournamentResponse(
         code=200,
@@ -235,18 +347,19 @@ def update_tournament(
     response_model=TournamentResponse,
     status_code=status.HTTP_200_OK,
 )
-def delete_tournament(
+async def delete_tournament(
     tournament_uuid: UUID4 = Path(...),
     auth: tuple[str, str] = Depends(authenticate),
+    loaders: Loaders = Depends(getLoaders),
 ):
-    tournaments = db.get_tournament(str(tournament_uuid))
-    if tournaments is None:
+    tournament = await loaders.tournaments.load(str(tournament_uuid))
+    if tournament is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Not Found",
         )
 
-    if not db.delete_tournament(str(tournament_uuid)):
+    if not await adb.delete_tournament(str(tournament_uuid)):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal Server Error",
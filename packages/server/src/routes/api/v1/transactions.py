@@ -1,15 +1,21 @@
 # @author: adibarra (Alec Ibarra)
 # @description: Transaction routes for the API
 
+import asyncio
 from datetime import datetime
 from typing import List, Literal, Optional
 
 from fastapi import APIRouter, Body, Depends, Header, HTTPException, Path, status
+from helpers.pagination import Pagination
+from helpers.quote import Quote
 from pydantic import UUID4, BaseModel
+from routes.api.v1.auth import authenticateToken
+from routes.api.v1.loaders import Loaders, getLoaders
 from services.alpaca import AlpacaService
-from services.database import Database
+from services.database import AsyncDatabase
+from services.leaderboard.leaderboard import LEADERBOARDS
 
-db = Database()
+adb = AsyncDatabase()
 router = APIRouter(prefix="/api/v1")
 
 
@@ -43,43 +49,29 @@ class TransactionsResponse(BaseModel):
     code: int
     message: str
     data: Optional[List[TransactionData]] = None
+    next_cursor: Optional[str] = None
 
     class Config:
         exclude_none = True
 
 
-async def authenticateToken(
-    authorization: str = Header(...),
-) -> tuple[str, str]:
-    if not len(authorization.split(" ")) == 2:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Bad Request",
-        )
-
-    token = authorization.split(" ")[1]
-    token_owner = db.get_session(token)
-
-    # Validate the token exists
-    if token_owner is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Unauthorized",
-        )
-
-    return token_owner, token
-
-
 async def authenticate(
     authorization: str = Header(...),
     transaction_uuid: UUID4 = Path(...),
+    loaders: Loaders = Depends(getLoaders),
 ) -> tuple[str, str]:
     token_owner, token = await authenticateToken(authorization)
 
+    transaction = await loaders.transactions.load(str(transaction_uuid))
+    if transaction is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found",
+        )
+
     # Validate the token has permission for this user's transactions
-    transaction = db.get_transaction_by_uuid(str(transaction_uuid))
-    portfolio = db.get_portfolio(str(transaction["portfolio"]))
-    if token_owner != str(portfolio["owner"]):
+    portfolio = await loaders.portfolios.load(str(transaction["portfolio"]))
+    if portfolio is None or token_owner != str(portfolio["owner"]):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Forbidden",
@@ -91,116 +83,65 @@ async def authenticate(
 @router.post(
     "/transactions", response_model=TransactionResponse, status_code=status.HTTP_200_OK
 )
-def create_transaction(
+async def create_transaction(
     data: CreateTransactionRequest = Body(...),
     auth: tuple[str, str] = Depends(authenticateToken),
 ):
     token_owner = auth[0]
 
-    # check if the portfolio exists
-    portfolio = db.get_portfolio(str(data.portfolio))
-    if portfolio is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Not Found",
-        )
-
-    # check if the user owns the portfolio
-    if portfolio["owner"] != token_owner:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Forbidden",
-        )
-
-    # check if quantity is valid
-    if data.quantity <= 0:
+    # check if quantity and symbol are valid
+    if data.quantity <= 0 or not Quote.is_valid_symbol(data.symbol):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Bad Request",
         )
 
     # get the stock quote
-    quote = AlpacaService.get_quote(data.symbol)
+    quote = await asyncio.to_thread(AlpacaService.get_quote, data.symbol)
     if quote is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Bad Request",
         )
 
-    # check if the user can do the transaction
-    if data.action == "BUY":
-        # check if the user has enough funds to buy the stock
-        new_balance = portfolio["balance_cents"] - (
-            quote["price_cents"] * data.quantity
+    # attempt executing the trade, this checks ownership and funds or holdings
+    try:
+        trade = await adb.execute_trade(
+            owner=token_owner,
+            uuid_portfolio=str(data.portfolio),
+            symbol=data.symbol,
+            action=data.action,
+            quantity=data.quantity,
+            unit_price_cents=int(quote["price_cents"]),
         )
-        if new_balance < 0:
+    except ValueError as e:
+        if e.args[0] == adb.TRADE_ERRORS.PORTFOLIO_NOT_FOUND:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Bad Request",
-            )
-
-        # update the portfolio balance
-        if not db.update_portfolio_balance(portfolio["uuid"], new_balance):
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Internal Server Error",
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Not Found",
             )
-
-    else:
-        # check if the user has enough stocks to sell
-        transactions = db.get_transactions(portfolio["uuid"], 0, 9999)
-        if transactions is None:
+        if e.args[0] == adb.TRADE_ERRORS.PORTFOLIO_FORBIDDEN:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Internal Server Error",
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Forbidden",
             )
-
-        # calculate the user's stock quantity
-        stock_quantity = 0
-        for transaction in transactions:
-            if transaction["symbol"] == data.symbol:
-                if transaction["action"] == "BUY":
-                    stock_quantity += transaction["quantity"]
-                else:
-                    stock_quantity -= transaction["quantity"]
-
-        # check if the user has enough stocks to sell
-        if stock_quantity < data.quantity:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Bad Request",
-            )
-
-        # calculate the new balance
-        new_balance = portfolio["balance_cents"] + (
-            quote["price_cents"] * data.quantity
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bad Request",
         )
 
-        # update the portfolio balance
-        if not db.update_portfolio_balance(portfolio["uuid"], new_balance):
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Internal Server Error",
-            )
-
-    # attempt creating transaction
-    transaction = db.create_transaction(
-        uuid_portfolio=str(data.portfolio),
-        symbol=data.symbol,
-        action=data.action,
-        quantity=data.quantity,
-        price_cents=int(quote["price_cents"]) * data.quantity,
-    )
-    if transaction is None:
+    if trade is None:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal Server Error",
         )
 
+    LEADERBOARDS.on_trade(trade["portfolio"], trade["holding"])
+
     return TransactionResponse(
         code=200,
         message="Ok",
-        data=transaction,
+        data=trade["transaction"],
     )
 
 
@@ -209,35 +150,48 @@ def create_transaction(
     response_model=TransactionsResponse,
     status_code=status.HTTP_200_OK,
 )
-def get_transactions(
+async def get_transactions(
     portfolio: UUID4,
     offset: int = 0,
     limit: int = 10,
+    cursor: Optional[str] = None,
     auth: tuple[str, str] = Depends(authenticateToken),
+    loaders: Loaders = Depends(getLoaders),
 ):
     token_owner = auth[0]
 
+    after = None
+    if cursor is not None:
+        after = Pagination.decode_cursor(cursor)
+        if after is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Bad Request",
+            )
+
     # Keep the user from accessing another user's transactions
     # Fix by adding a more granular permission system later
-    portfolio_obj = db.get_portfolio(str(portfolio))
-    if token_owner != str(portfolio_obj["owner"]):
+    portfolio_obj = await loaders.portfolios.load(str(portfolio))
+    if portfolio_obj is None or token_owner != str(portfolio_obj["owner"]):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Forbidden",
         )
 
     # Attempt getting transactions
-    transactions = db.get_transactions(str(portfolio), offset, limit)
+    transactions = await adb.get_transactions(str(portfolio), offset, limit + 1, after)
     if transactions is None:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Not Found",
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal Server Error",
         )
 
+    transactions, next_cursor = Pagination.page(transactions, limit)
     return TransactionsResponse(
         code=200,
         message="Ok",
         data=transactions,
+        next_cursor=next_cursor,
     )
 
 
@@ -246,12 +200,13 @@ def get_transactions(
     response_model=TransactionResponse,
     status_code=status.HTTP_200_OK,
 )
-def get_transaction_by_id(
+async def get_transaction_by_id(
     transaction_uuid: UUID4 = Path(...),
     auth: tuple[str, str] = Depends(authenticate),
+    loaders: Loaders = Depends(getLoaders),
 ):
     # Attempt getting transaction
-    transaction = db.get_transaction_by_uuid(str(transaction_uuid))
+    transaction = await loaders.transactions.load(str(transaction_uuid))
     if transaction is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
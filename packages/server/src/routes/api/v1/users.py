@@ -7,9 +7,13 @@ from typing import Optional
 from fastapi import APIRouter, Body, Depends, Header, HTTPException, Path, status
 from helpers.user import User
 from pydantic import UUID4, BaseModel
-from services.database import Database
+from routes.api.v1.auth import authenticateToken
+from routes.api.v1.loaders import Loaders, getLoaders
+from services.database import AsyncDatabase
+from services.passwords import PasswordService
+from services.passwords.passwords import PasswordServiceBusy
 
-db = Database()
+adb = AsyncDatabase()
 router = APIRouter(prefix="/api/v1")
 
 
@@ -46,28 +50,6 @@ class UserResponse(BaseModel):
         exclude_none = True
 
 
-async def authenticateToken(
-    authorization: str = Header(...),
-) -> tuple[str, str]:
-    if not len(authorization.split(" ")) == 2:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Bad Request",
-        )
-
-    token = authorization.split(" ")[1]
-    token_owner = db.get_session(token)
-
-    # Validate the token exists
-    if token_owner is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Unauthorized",
-        )
-
-    return token_owner, token
-
-
 async def authenticate(
     authorization: str = Header(...),
     uuid: str = Path(...),
@@ -84,8 +66,18 @@ async def authenticate(
     return token_owner, token
 
 
+async def hash_password(password: str) -> str:
+    try:
+        return await PasswordService.hash_password(password)
+    except PasswordServiceBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service Unavailable",
+        )
+
+
 @router.post("/users", response_model=UserResponse, status_code=status.HTTP_200_OK)
-def create_user(
+async def create_user(
     data: CreateUserRequest = Body(...),
 ):
     try:
@@ -99,7 +91,8 @@ def create_user(
         )
 
     # Attempt creating user
-    user = db.create_user(data.username, data.email, User.hash_password(data.password))
+    password_hash = await hash_password(data.password)
+    user = await adb.create_user(data.username, data.email, password_hash)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -116,12 +109,13 @@ def create_user(
 @router.get(
     "/users/{uuid}", response_model=UserResponse, status_code=status.HTTP_200_OK
 )
-def get_user(
+async def get_user(
     uuid: UUID4 = Path(...),
     auth: tuple[str, str] = Depends(authenticate),
+    loaders: Loaders = Depends(getLoaders),
 ):
     # Attempt fetching user
-    user_data = db.get_user(str(uuid))
+    user_data = await loaders.users.load(str(uuid))
     if user_data is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -139,13 +133,14 @@ def get_user(
 @router.patch(
     "/users/{uuid}", response_model=UserResponse, status_code=status.HTTP_200_OK
 )
-def patch_user(
+async def patch_user(
     uuid: UUID4 = Path(...),
     data: UpdateUserRequest = Body(...),
     auth: tuple[str, str] = Depends(authenticate),
+    loaders: Loaders = Depends(getLoaders),
 ):
     # Attempt fetching user
-    user = db.get_user(str(uuid))
+    user = await loaders.users.load(str(uuid))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -167,11 +162,11 @@ def patch_user(
         )
 
     # Attempt updating user
-    if not db.update_user(
+    if not await adb.update_user(
         str(uuid),
         data.email,
         data.username,
-        User.hash_password(data.password) if data.password else None,
+        await hash_password(data.password) if data.password else None,
     ):
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -188,12 +183,13 @@ def patch_user(
 @router.delete(
     "/users/{uuid}", response_model=UserResponse, status_code=status.HTTP_200_OK
 )
-def delete_user(
+async def delete_user(
     uuid: UUID4 = Path(...),
     auth: tuple[str, str] = Depends(authenticate),
+    loaders: Loaders = Depends(getLoaders),
 ):
     # Check if the user exists
-    user = db.get_user(str(uuid))
+    user = await loaders.users.load(str(uuid))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -201,7 +197,7 @@ def delete_user(
         )
 
     # Attempt deleting user
-    if not db.delete_user(str(uuid)):
+    if not await adb.delete_user(str(uuid)):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal Server Error",
@@ -2,20 +2,41 @@
 # @description: Helper function to retrieve stock info from Alpaca Markets API
 
 import math
-from collections import deque
+import threading
+import time
+from concurrent.futures import Future
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterator
+from urllib.parse import urlencode
 
 import requests
-from config import APCA_API_KEY, APCA_API_SECRET
+from config import (
+    APCA_API_KEY,
+    APCA_API_SECRET,
+    APCA_HTTP_CONNECT_TIMEOUT,
+    APCA_HTTP_READ_TIMEOUT,
+    APCA_RATE_LIMIT,
+)
+from helpers.cache import Cache
+from helpers.ratelimiter import RateLimiter
+from services.alpaca.session import create_session, get_session_stats
+from services.alpaca.stream import TradeStream
 
 api_host = "https://data.alpaca.markets/v2/stocks/trades"
+bars_host = "https://data.alpaca.markets/v2/stocks/bars"
+snapshots_host = "https://data.alpaca.markets/v2/stocks/snapshots"
 headers = {
     "APCA-API-KEY-ID": APCA_API_KEY,
     "APCA-API-SECRET-KEY": APCA_API_SECRET,
     "accept": "application/json",
 }
 
+# Connections to the API are kept alive and shared between requests
+SESSION = create_session(headers)
+TIMEOUT = (APCA_HTTP_CONNECT_TIMEOUT, APCA_HTTP_READ_TIMEOUT)
+
 
 @dataclass
 class Quote:
@@ -24,107 +45,527 @@ class Quote:
     timestamp: datetime
 
 
-class Cache:
-    MAX_SIZE = 100
+@dataclass
+class Trade:
+    symbol: str
+    price_cents: int
+    size: int
+    timestamp: datetime
+
+
+class AlpacaError(Exception):
+    """
+    Raised by the historical iterators when a page cannot be fetched from the Alpaca API.
+    """
+
+
+# Quotes are considered fresh for 15 minutes
+CACHE = Cache(500, timedelta(minutes=15).total_seconds())
+
+# Previous closes only change once a day, so they are kept for an hour
+CLOSES = Cache(500, timedelta(hours=1).total_seconds())
+
+# Last trades streamed from the websocket feed, if streaming is enabled
+STREAM = TradeStream()
+
+# Symbols read by users within the last 30 minutes, kept fresh by the QuoteRefresher
+RECENT_READS = Cache(500, timedelta(minutes=30).total_seconds())
 
-    def __init__(self, MAX_SIZE: int = MAX_SIZE):
-        self.cache = {}
-        self.MAX_SIZE = MAX_SIZE
-        self.key_queue = deque()
+# Outbound requests are capped at APCA_RATE_LIMIT requests per minute
+LIMITER = RateLimiter(APCA_RATE_LIMIT, 60)
 
-    def get(self, key):
-        return self.cache.get(key)
+# Callbacks notified of every new quote, see AlpacaService.add_quote_listener
+QUOTE_LISTENERS = []
 
-    def has(self, key):
-        return key in self.cache
 
-    def set(self, key, value):
-        if self.has(key):
-            self.key_queue.remove(key)
-        else:
-            if len(self.cache) >= self.MAX_SIZE:
-                oldest_key = self.key_queue.popleft()
-                del self.cache[oldest_key]
-            self.cache[key] = (datetime.now(), value)
-        self.key_queue.append(key)
+class SingleFlight:
+    """
+    Coalesces concurrent fetches of the same key into a single upstream call.
 
-    def delete(self, key):
-        if key in self.cache:
-            self.key_queue.remove(key)
-            del self.cache[key]
+    The first caller to claim a key becomes responsible for fetching it, and every
+    concurrent caller for that key waits on the same in-flight result instead.
+    """
 
-    def clear(self):
-        self.cache.clear()
-        self.key_queue.clear()
+    # Maximum number of seconds a waiter waits for the in-flight result
+    WAIT_TIMEOUT = 30
 
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.coalesced = 0
 
-CACHE = Cache(500)
+    def claim(self, keys: list) -> tuple[list, dict]:
+        """
+        Claims the keys which are not already being fetched.
+
+        Returns:
+            tuple[list, dict]: The keys the caller must fetch and then resolve,
+            and the in-flight futures of the keys already being fetched by other callers.
+        """
+
+        owned = []
+        waiting = {}
+        with self.lock:
+            for key in keys:
+                if key in self.calls:
+                    waiting[key] = self.calls[key]
+                    self.coalesced += 1
+                else:
+                    self.calls[key] = Future()
+                    owned.append(key)
+        return owned, waiting
+
+    def resolve(self, key, value) -> None:
+        """
+        Publishes the result of a claimed key to its waiters.
+        """
+
+        with self.lock:
+            future = self.calls.pop(key, None)
+        if future is not None:
+            future.set_result(value)
+
+    def wait(self, future: Future):
+        """
+        Waits for the result of a key claimed by another caller.
+        """
+
+        try:
+            return future.result(timeout=SingleFlight.WAIT_TIMEOUT)
+        except TimeoutError:
+            return None
+
+
+IN_FLIGHT = SingleFlight()
 
 
-# TODO: add mechanism for rate limiting requests in addition to the cache
-# limit to 200 requests per minute
 class AlpacaService:
+    # Maximum number of symbols sent in a single latest trades request
+    QUOTE_BATCH_SIZE = 100
+
+    # Timeframe of the bars endpoint for each Quote interval
+    BAR_TIMEFRAMES = {
+        "MINUTE": "1Min",
+        "HOUR": "1Hour",
+        "DAY": "1Day",
+        "WEEK": "1Week",
+        "MONTH": "1Month",
+        "YEAR": "12Month",
+    }
+
+    # Maximum number of records returned per historical request
+    PAGE_SIZE = 10000
+
+    # Maximum number of seconds a request waits for the rate limiter, by priority
+    DEADLINES = {RateLimiter.PRIORITY_HIGH: 5, RateLimiter.PRIORITY_LOW: 30}
+
+    # Number of seconds to back off after a 429 response without a usable hint
+    RETRY_AFTER_DEFAULT = 1
+
+    # Number of quotes served stale because they could not be refreshed
+    stale_served = 0
+
     def get_quote(symbol: str) -> dict | None:
         """Sends a GET Request to Alpaca API to retrieve latest quote"""
-        # Check if the symbol is in the cache
-        if CACHE.has(symbol):
-            time, quote = CACHE.get(symbol)
-            time_diff = datetime.now() - time
+        return AlpacaService.get_quotes([symbol]).get(symbol)
 
-            if time_diff < timedelta(minutes=15):
-                return quote
+    def get_quotes(
+        symbols: list[str], priority: int = RateLimiter.PRIORITY_HIGH
+    ) -> dict[str, dict]:
+        """
+        Retrieves the latest quotes for multiple symbols.
 
-        # Construct request url
-        latest_url = f"{api_host}/latest?symbols={symbol}&feed=iex"
-        response = requests.get(latest_url, headers=headers)
+        Quotes are served from the trade stream if it is running, or else from the cache
+        when possible. Only the misses are
+        fetched from the Alpaca API, in batches of up to QUOTE_BATCH_SIZE symbols per request.
+        If a batch cannot be fetched, e.g. because the rate limit budget is exhausted,
+        expired cached quotes are served for it instead.
 
-        # Check if the request was successful
-        if response.status_code == 200:
-            response_data = response.json()
+        Args:
+            symbols (list[str]): The symbols to retrieve quotes for.
+            priority (int, optional): The rate limiter priority of the upstream requests.
 
-            price_cents = math.floor(response_data["trades"][symbol]["p"] * 100)
-            timestamp_str = response_data["trades"][symbol]["t"]
-            timestamp = datetime.strptime(timestamp_str[:-4], "%Y-%m-%dT%H:%M:%S.%f")
-            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        Returns:
+            dict[str, dict]: The quotes keyed by symbol. Symbols without a quote are omitted.
+        """
 
-            quote = Quote(symbol, price_cents, timestamp)
+        quotes = {}
+        misses = []
 
-            # Add the quote to the cache
-            CACHE.set(symbol, asdict(quote))
-            return asdict(quote)
+        # Check which symbols are in the cache
+        for symbol in dict.fromkeys(symbols):
+            if priority == RateLimiter.PRIORITY_HIGH:
+                RECENT_READS.set(symbol, True)
 
-        return None
+            trade = STREAM.get_trade(symbol)
+            if trade is not None:
+                quotes[symbol] = AlpacaService._to_quote(symbol, trade)
+                continue
 
-    def get_historical_quote(symbol: str, start_time, end_time, quote_limit: int):
-        """Sends GET request to Alpaca API to get the latest historical quotes"""
+            quote = CACHE.get(symbol)
+            if quote is not None:
+                quotes[symbol] = quote
+            else:
+                misses.append(symbol)
 
-        # Convert start and end time string to appropriate format for request
-        start_time = start_time.replace(":", "%3A")
-        print(start_time)
-        end_time = end_time.replace(":", "%3A")
-        print(end_time)
-        # Construct request url
-        historical_url = f"{api_host}?symbols={symbol}&start={start_time}&end={end_time}&limit={quote_limit}&feed=iex&currency=USD"
-        # Create response object
-        response = requests.get(historical_url, headers=headers)
+        # Stream the misses from now on
+        if misses and STREAM.running:
+            STREAM.subscribe(misses)
 
-        # Check if the request was successful
-        if response.status_code == 200:
-            response_data = response.json()
-            # print(response_data)
-
-            data = []
-            for quote in response_data["trades"][symbol]:
-                quote_data = {
-                    "symbol": symbol,
-                    "price_cents": quote["p"],
-                    "timestamp": quote["t"],
+        # Only fetch the misses no other request is already fetching
+        owned, waiting = IN_FLIGHT.claim(misses)
+        try:
+            AlpacaService._fetch_quotes(owned, quotes, priority)
+        finally:
+            for symbol in owned:
+                IN_FLIGHT.resolve(symbol, quotes.get(symbol))
+
+        for symbol, future in waiting.items():
+            quote = IN_FLIGHT.wait(future)
+            if quote is not None:
+                quotes[symbol] = quote
+
+        return quotes
+
+    def refresh_quotes(symbols: list[str]) -> int:
+        """
+        Fetches the latest quotes for symbols at low priority, even if they are still cached.
+        Symbols which are already being fetched by another request are skipped.
+
+        Args:
+            symbols (list[str]): The symbols to refresh.
+
+        Returns:
+            int: The number of symbols refreshed.
+        """
+
+        quotes = {}
+        owned, _ = IN_FLIGHT.claim(list(dict.fromkeys(symbols)))
+        try:
+            AlpacaService._fetch_quotes(
+                owned, quotes, RateLimiter.PRIORITY_LOW, fallback=False
+            )
+        finally:
+            for symbol in owned:
+                IN_FLIGHT.resolve(symbol, quotes.get(symbol))
+        return len(quotes)
+
+    def _fetch_quotes(
+        symbols: list[str], quotes: dict[str, dict], priority: int, fallback=True
+    ) -> None:
+        """
+        Fetches the latest quotes from Alpaca API in batches, filling the cache and quotes.
+        If fallback is set, stale cached quotes are used for batches which could not be fetched.
+        """
+
+        for i in range(0, len(symbols), AlpacaService.QUOTE_BATCH_SIZE):
+            batch = symbols[i : i + AlpacaService.QUOTE_BATCH_SIZE]
+
+            # Construct request url
+            params = {"symbols": ",".join(batch), "feed": "iex"}
+            latest_url = f"{api_host}/latest?{urlencode(params, safe=',')}"
+            response = AlpacaService._request(latest_url, priority)
+
+            # Fall back to stale quotes if the request failed
+            if response is None or response.status_code != 200:
+                if response is not None:
+                    print(
+                        f"Error: {response.status_code} - {response.text}", flush=True
+                    )
+                if not fallback:
+                    continue
+                for symbol in batch:
+                    quote = CACHE.get_stale(symbol)
+                    if quote is not None:
+                        quotes[symbol] = quote
+                        AlpacaService.stale_served += 1
+                continue
+
+            trades = response.json().get("trades") or {}
+            for symbol in batch:
+                if symbol not in trades:
+                    continue
+
+                quote = AlpacaService._to_quote(symbol, trades[symbol])
+
+                # Add the quote to the cache
+                CACHE.set(symbol, quote)
+                quotes[symbol] = quote
+                AlpacaService._notify(symbol, quote)
+
+    def get_previous_closes(symbols: list[str]) -> dict[str, int]:
+        """
+        Retrieves the previous daily closing prices of multiple symbols.
+
+        Closes are served from the cache when possible. Only the misses are fetched from the
+        snapshots endpoint of the Alpaca API, in batches of up to QUOTE_BATCH_SIZE symbols per
+        request. If a batch cannot be fetched, expired cached closes are served for it instead.
+
+        Args:
+            symbols (list[str]): The symbols to retrieve closes for.
+
+        Returns:
+            dict[str, int]: The closes in cents keyed by symbol. Symbols without a close are omitted.
+        """
+
+        closes = {}
+        misses = []
+        for symbol in dict.fromkeys(symbols):
+            close = CLOSES.get(symbol)
+            if close is not None:
+                closes[symbol] = close
+            else:
+                misses.append(symbol)
+
+        for i in range(0, len(misses), AlpacaService.QUOTE_BATCH_SIZE):
+            batch = misses[i : i + AlpacaService.QUOTE_BATCH_SIZE]
+
+            params = {"symbols": ",".join(batch), "feed": "iex"}
+            url = f"{snapshots_host}?{urlencode(params, safe=',')}"
+            response = AlpacaService._request(url, RateLimiter.PRIORITY_HIGH)
+
+            # Fall back to stale closes if the request failed
+            if response is None or response.status_code != 200:
+                if response is not None:
+                    print(
+                        f"Error: {response.status_code} - {response.text}", flush=True
+                    )
+                for symbol in batch:
+                    close = CLOSES.get_stale(symbol)
+                    if close is not None:
+                        closes[symbol] = close
+                continue
+
+            snapshots = response.json() or {}
+            for symbol in batch:
+                bar = (snapshots.get(symbol) or {}).get("prevDailyBar")
+                if not bar:
+                    continue
+
+                close = round(bar["c"] * 100)
+                CLOSES.set(symbol, close)
+                closes[symbol] = close
+
+        return closes
+
+    def get_bars(
+        symbol: str, interval: str, start_time: datetime, end_time: datetime
+    ) -> list[dict] | None:
+        """
+        Retrieves the OHLCV bars of a symbol within a time range from the Alpaca API.
+
+        Args:
+            symbol (str): The symbol of the stock.
+            interval (str): The interval of the bars, one of BAR_TIMEFRAMES.
+            start_time (datetime): The start of the range (inclusive).
+            end_time (datetime): The end of the range (exclusive).
+
+        Returns:
+            list[dict] | None: The bars, oldest first, or None if a request failed.
+        """
+
+        params = {
+            "timeframe": AlpacaService.BAR_TIMEFRAMES[interval],
+            "adjustment": "all",
+        }
+        try:
+            return [
+                {
+                    "timestamp": AlpacaService._parse_time(bar["t"]),
+                    "open_cents": round(bar["o"] * 100),
+                    "high_cents": round(bar["h"] * 100),
+                    "low_cents": round(bar["l"] * 100),
+                    "close_cents": round(bar["c"] * 100),
+                    "volume": bar["v"],
                 }
-                data.append(quote_data)
+                for bar in AlpacaService._iter_pages(
+                    bars_host, "bars", symbol, start_time, end_time, params
+                )
+            ]
+        except AlpacaError as e:
+            print("Failed to get bars:", e, flush=True)
+            return None
+
+    def iter_trades(
+        symbol: str, start_time: datetime, end_time: datetime
+    ) -> Iterator[Trade]:
+        """
+        Iterates over the trades of a symbol within a time range from the Alpaca API.
+
+        Pages are fetched lazily as the iterator is consumed, so arbitrarily long ranges
+        can be streamed without holding them in memory.
+
+        Args:
+            symbol (str): The symbol of the stock.
+            start_time (datetime): The start of the range (inclusive).
+            end_time (datetime): The end of the range (exclusive).
+
+        Yields:
+            Trade: The trades, oldest first.
+
+        Raises:
+            AlpacaError: If a page cannot be fetched.
+        """
+
+        for trade in AlpacaService._iter_pages(
+            api_host, "trades", symbol, start_time, end_time
+        ):
+            yield Trade(
+                symbol,
+                round(trade["p"] * 100),
+                trade["s"],
+                AlpacaService._parse_time(trade["t"]),
+            )
+
+    def _iter_pages(
+        url: str,
+        key: str,
+        symbol: str,
+        start_time: datetime,
+        end_time: datetime,
+        params: dict = None,
+    ) -> Iterator[dict]:
+        """
+        Iterates over the records of a historical endpoint, following the page tokens.
+        Records at the end of the range are skipped, since the range is inclusive upstream.
+        """
+
+        params = {
+            **(params or {}),
+            "symbols": symbol,
+            "start": start_time.isoformat(),
+            "end": end_time.isoformat(),
+            "limit": AlpacaService.PAGE_SIZE,
+            "feed": "iex",
+        }
+
+        while True:
+            response = AlpacaService._request(
+                f"{url}?{urlencode(params)}", RateLimiter.PRIORITY_LOW
+            )
+            if response is None:
+                raise AlpacaError("request failed")
+            if response.status_code != 200:
+                raise AlpacaError(f"{response.status_code} - {response.text}")
 
-            return data
+            response_data = response.json()
+            for record in (response_data.get(key) or {}).get(symbol, []):
+                if AlpacaService._parse_time(record["t"]) >= end_time:
+                    return
+                yield record
+
+            if not response_data.get("next_page_token"):
+                return
+            params["page_token"] = response_data["next_page_token"]
+
+    def _parse_time(value: str) -> datetime:
+        """Parses an RFC 3339 timestamp from the Alpaca API, which may have nanosecond precision"""
+
+        value, _, fraction = value.rstrip("Z").partition(".")
+        if fraction:
+            value += "." + fraction[:6]
+        return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
+    def add_quote_listener(callback) -> None:
+        """
+        Registers a callback which is called with the symbol and quote of every new quote,
+        whether it was fetched from the Alpaca API or streamed. Callbacks run on the thread
+        which received the quote, so they must be quick and thread-safe.
+        """
+
+        if not QUOTE_LISTENERS:
+            STREAM.add_listener(
+                lambda symbol, trade: AlpacaService._notify(
+                    symbol, AlpacaService._to_quote(symbol, trade)
+                )
+            )
+        QUOTE_LISTENERS.append(callback)
+
+    def _notify(symbol: str, quote: dict) -> None:
+        for callback in QUOTE_LISTENERS:
+            try:
+                callback(symbol, quote)
+            except Exception as e:
+                print("Quote listener failed:", e, flush=True)
+
+    def _to_quote(symbol: str, trade: dict) -> dict:
+        """Converts a trade from the Alpaca API or trade stream into a quote"""
+
+        price_cents = math.floor(trade["p"] * 100)
+        timestamp = AlpacaService._parse_time(trade["t"])
+        return asdict(Quote(symbol, price_cents, timestamp))
+
+    def _request(url: str, priority: int) -> requests.Response | None:
+        """
+        Sends a rate limited GET request to the Alpaca API.
+
+        The request waits for the rate limiter for at most the deadline of its priority.
+        A 429 response pauses the rate limiter for as long as the API asks.
 
-        # Otherwise print error message
-        else:
-            print(f"Error: {response.status_code} - {response.text}")
+        Args:
+            url (str): The url to request.
+            priority (int): The rate limiter priority of the request.
+
+        Returns:
+            requests.Response | None: The response, or None if the deadline passed first
+            or the request failed.
+        """
+
+        if not LIMITER.acquire(priority, AlpacaService.DEADLINES[priority]):
+            print("Error: Alpaca API rate limit budget exhausted", flush=True)
+            return None
+
+        try:
+            response = SESSION.get(url, timeout=TIMEOUT)
+        except requests.RequestException as e:
+            print("Error: Alpaca API request failed:", e, flush=True)
             return None
+        if response.status_code == 429:
+            LIMITER.penalize(AlpacaService._retry_after(response))
+        return response
+
+    def _retry_after(response: requests.Response) -> float:
+        """Retrieves the number of seconds to wait from the headers of a 429 response"""
+
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                return max(float(retry_after), 0)
+            except ValueError:
+                pass
+            try:
+                retry_at = parsedate_to_datetime(retry_after)
+                return max(retry_at.timestamp() - time.time(), 0)
+            except (TypeError, ValueError):
+                pass
+
+        reset = response.headers.get("X-RateLimit-Reset")
+        if reset is not None:
+            try:
+                return max(float(reset) - time.time(), 0)
+            except ValueError:
+                pass
+
+        return AlpacaService.RETRY_AFTER_DEFAULT
+
+    def get_stats() -> dict:
+        """
+        Retrieves counters of the quote fetching machinery.
+
+        Returns:
+            dict: The counters, where 'coalesced' is the number of requests for a symbol
+            which waited on an in-flight fetch instead of sending their own, 'stale_served'
+            is the number of expired quotes served because they could not be refreshed,
+            and 'cache', 'closes', 'limiter', 'http' and 'stream' hold the quote cache,
+            previous close cache, rate limiter, connection reuse and trade stream counters.
+        """
+
+        return {
+            "coalesced": IN_FLIGHT.coalesced,
+            "stale_served": AlpacaService.stale_served,
+            "cache": CACHE.stats(),
+            "closes": CLOSES.stats(),
+            "limiter": LIMITER.stats(),
+            "http": get_session_stats(SESSION),
+            "stream": STREAM.get_stats(),
+        }
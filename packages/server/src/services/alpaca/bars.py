@@ -0,0 +1,149 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Local store of historical bars, backed by the database and the Alpaca Markets API
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from helpers.quote import Quote
+from helpers.resample import Resampler
+from services.alpaca.alpaca import AlpacaService
+from services.database import Database
+
+
+class BarStore:
+    """
+    Serves historical OHLCV bars from the database, fetching only the parts of a range
+    which have not been fetched before from the Alpaca API.
+
+    Bars which may still change, i.e. those less than one interval old, are stored but
+    their range is not marked as fetched, so they are fetched again on the next request.
+
+    Weekly, monthly and yearly bars are not stored, they are resampled from the daily bars
+    so that they always agree with them.
+    """
+
+    # Intervals which are resampled from the stored bars of a finer interval
+    RESAMPLED = {"WEEK": "DAY", "MONTH": "DAY", "YEAR": "DAY"}
+
+    # Approximate length of each interval in seconds
+    INTERVAL_SECONDS = {
+        "MINUTE": 60,
+        "HOUR": 3600,
+        "DAY": 86400,
+        "WEEK": 604800,
+        "MONTH": 2678400,
+        "YEAR": 31622400,
+    }
+
+    # Maximum number of stored bars a single request may span, one upstream page at most
+    MAX_SPAN_BARS = 10000
+
+    def get_max_span(interval: str) -> timedelta:
+        """
+        Retrieves the widest time range which can be requested at once for an interval.
+
+        The range is bounded by the number of stored bars it spans, so filling it takes at
+        most one upstream page per missing sub-range, whatever the offset and limit are.
+        Resampled intervals are bounded by the bars they are resampled from.
+
+        Args:
+            interval (str): The interval of the bars, one of Quote.INTERVALS.
+
+        Returns:
+            timedelta: The maximum length of the range.
+        """
+
+        source = BarStore.RESAMPLED.get(interval, interval)
+        return timedelta(
+            seconds=BarStore.MAX_SPAN_BARS * BarStore.INTERVAL_SECONDS[source]
+        )
+
+    def get_bars(
+        symbol: str,
+        interval: str,
+        start_time: datetime,
+        end_time: datetime,
+        offset: int = 0,
+        limit: int = None,
+    ) -> list[dict] | None:
+        """
+        Retrieves the bars of a symbol within a time range, fetching missing sub-ranges first.
+
+        If a missing sub-range cannot be fetched, the bars which are stored are served anyway.
+        The whole range is filled before the page is cut, so callers must bound it, see
+        `get_max_span`.
+
+        Args:
+            symbol (str): The symbol of the stock.
+            interval (str): The interval of the bars, one of Quote.INTERVALS.
+            start_time (datetime): The start of the range (inclusive).
+            end_time (datetime): The end of the range (exclusive).
+            offset (int, optional): The number of bars to skip. Defaults to 0.
+            limit (int, optional): The maximum number of bars to return. Defaults to all.
+
+        Returns:
+            list[dict] | None: The bars, oldest first, or None if the database is unavailable.
+        """
+
+        db = Database()
+        source = BarStore.RESAMPLED.get(interval)
+        if source is None:
+            if not BarStore._fill(symbol, interval, start_time, end_time):
+                return None
+            return db.get_bars(symbol, interval, start_time, end_time, offset, limit)
+
+        # Widen the range to whole bars, so the first bar is complete
+        start_time = Resampler.align(start_time, interval)
+        if not BarStore._fill(symbol, source, start_time, end_time):
+            return None
+        bars = db.get_bars(symbol, source, start_time, end_time)
+        if bars is None:
+            return None
+
+        columns = ["open_cents", "high_cents", "low_cents", "close_cents", "volume"]
+        resampled = Resampler.resample_bars(
+            np.array([bar["timestamp"].timestamp() for bar in bars], dtype=np.int64)
+            * 10**9,
+            *(
+                np.array([bar[column] for bar in bars], dtype=np.int64)
+                for column in columns
+            ),
+            interval,
+        )
+        timestamps = resampled["timestamp"].astype("datetime64[us]").tolist()
+        values = zip(
+            *(
+                resampled[key].tolist()
+                for key in ["open", "high", "low", "close", "volume"]
+            )
+        )
+        bars = [
+            {
+                "timestamp": timestamp.replace(tzinfo=timezone.utc),
+                **dict(zip(columns, row)),
+            }
+            for timestamp, row in zip(timestamps, values)
+        ]
+        return bars[offset:] if limit is None else bars[offset : offset + limit]
+
+    def _fill(
+        symbol: str, interval: str, start_time: datetime, end_time: datetime
+    ) -> bool:
+        """Fetches the sub-ranges of a time range which have not been fetched before"""
+
+        db = Database()
+        now = datetime.now(timezone.utc)
+        settled = now - timedelta(seconds=BarStore.INTERVAL_SECONDS[interval])
+        fetch_end = min(end_time, now)
+
+        covered = db.get_bar_coverage(symbol, interval, start_time, fetch_end)
+        if covered is None:
+            return False
+
+        for gap_start, gap_end in Quote.get_missing_ranges(
+            covered, start_time, fetch_end
+        ):
+            bars = AlpacaService.get_bars(symbol, interval, gap_start, gap_end)
+            if bars is not None:
+                db.save_bars(symbol, interval, bars, gap_start, min(gap_end, settled))
+        return True
@@ -0,0 +1,123 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Background refresher which keeps the quotes of hot symbols cached
+
+import threading
+
+from config import APCA_RATE_LIMIT, APCA_REFRESH_INTERVAL
+from services.alpaca.alpaca import CACHE, RECENT_READS, STREAM, AlpacaService
+from services.database import Database
+
+
+class QuoteRefresher:
+    """
+    Refreshes the cached quotes of hot symbols before they expire, so users rarely pay
+    for a cache miss.
+
+    A symbol is hot if a user read its quote recently, or if it is held by a portfolio
+    which is not part of a finished tournament. Every interval, the hot symbols whose cached
+    quote expires within two intervals are refreshed in batches at low priority, so a quote
+    is still covered if the next run is late or cut short by the budget. The refresher always
+    yields to user requests and only uses a share of the rate limit budget.
+    """
+
+    # Share of the rate limit budget the refresher may use
+    BUDGET_SHARE = 0.5
+
+    def __init__(self, interval: float = APCA_REFRESH_INTERVAL):
+        """
+        Creates a new refresher.
+
+        Args:
+            interval (float, optional): The number of seconds between runs.
+        """
+
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        self.runs = 0
+        self.refreshed = 0
+
+    def start(self) -> None:
+        """
+        Starts refreshing in a background thread.
+        """
+
+        if self.thread is not None or self.interval <= 0:
+            return
+
+        self.stop_event.clear()
+        self.thread = threading.Thread(
+            target=self._run, name="quote-refresher", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops refreshing and waits for the current run to finish.
+        """
+
+        if self.thread is None:
+            return
+
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+
+    def _run(self) -> None:
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print("Failed to refresh quotes:", e, flush=True)
+
+    def get_hot_symbols(self) -> list[str]:
+        """
+        Retrieves the hot symbols, most recently read first.
+        """
+
+        symbols = list(reversed(RECENT_READS.keys()))
+        symbols.extend(Database().get_active_symbols() or [])
+        return list(dict.fromkeys(symbols))
+
+    def refresh(self) -> int:
+        """
+        Refreshes the hot symbols whose cached quote expires before the next run.
+
+        Returns:
+            int: The number of symbols refreshed.
+        """
+
+        # Refresh anything which would expire before the run after next
+        horizon = 2 * self.interval
+        due = []
+        for symbol in self.get_hot_symbols():
+            # Streamed symbols are always up to date
+            if STREAM.get_trade(symbol) is not None:
+                continue
+            ttl = CACHE.ttl(symbol)
+            if ttl is not None and ttl < horizon:
+                due.append(symbol)
+
+        # Stay within the refresher's share of the requests allowed per interval
+        max_requests = int(APCA_RATE_LIMIT * self.interval / 60 * self.BUDGET_SHARE)
+        refreshed = AlpacaService.refresh_quotes(
+            due[: max(max_requests, 1) * AlpacaService.QUOTE_BATCH_SIZE]
+        )
+
+        self.runs += 1
+        self.refreshed += refreshed
+        return refreshed
+
+    def get_stats(self) -> dict:
+        """
+        Retrieves the counters of the refresher.
+
+        Returns:
+            dict: The number of runs and the number of symbols refreshed.
+        """
+
+        return {"runs": self.runs, "refreshed": self.refreshed}
+
+
+REFRESHER = QuoteRefresher()
@@ -0,0 +1,83 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Pooled HTTP session for requests to the Alpaca Markets API
+
+import requests
+from config import APCA_HTTP2, APCA_HTTP_POOL_SIZE, APCA_HTTP_RETRIES
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def create_session(headers: dict) -> requests.Session:
+    """
+    Creates a session which keeps connections to the Alpaca API alive between requests.
+
+    Connections are pooled per host, up to APCA_HTTP_POOL_SIZE connections, and callers
+    block for a free connection instead of opening extra ones. Idempotent requests which
+    fail to connect or get a 5xx response are retried with jittered exponential backoff.
+    429 responses are not retried here, they are left to the rate limiter.
+
+    If APCA_HTTP2 is set, HTTP/2 is negotiated where the server supports it. This requires
+    the optional `h2` package, and applies to every urllib3 connection in the process.
+
+    Args:
+        headers (dict): The headers to send with every request.
+
+    Returns:
+        requests.Session: The session.
+    """
+
+    if APCA_HTTP2:
+        try:
+            from urllib3.http2 import inject_into_urllib3
+
+            inject_into_urllib3()
+        except ImportError as e:
+            print("HTTP/2 unavailable, falling back to HTTP/1.1:", e, flush=True)
+
+    retry = Retry(
+        total=APCA_HTTP_RETRIES,
+        backoff_factor=0.25,
+        backoff_jitter=0.25,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=("GET",),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=APCA_HTTP_POOL_SIZE,
+        pool_block=True,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.headers.update(headers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session_stats(session: requests.Session) -> dict:
+    """
+    Retrieves the connection reuse counters of a session.
+
+    Returns:
+        dict: The number of connections opened, the number of requests sent over them,
+        and the reuse rate, i.e. the share of requests which did not open a new connection.
+    """
+
+    connections = 0
+    requests_sent = 0
+    for adapter in dict.fromkeys(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        # The pool container does not support iteration, only keys()
+        for key in pools.keys():  # noqa: SIM118
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+                requests_sent += pool.num_requests
+
+    return {
+        "connections": connections,
+        "requests": requests_sent,
+        "reuse_rate": 1 - connections / requests_sent if requests_sent else 0.0,
+    }
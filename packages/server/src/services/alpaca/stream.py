@@ -0,0 +1,237 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Websocket client which streams the latest trades from Alpaca Markets
+
+import asyncio
+import json
+import random
+import threading
+
+import websockets
+from config import APCA_API_KEY, APCA_API_SECRET, APCA_STREAM_URL
+
+
+class TradeStream:
+    """
+    Keeps an in-memory table of the last trade of every subscribed symbol, fed by the
+    Alpaca market data websocket (or the local replay server in `replay_trades.py`).
+
+    The stream runs its own event loop in a background thread. When the connection drops,
+    it reconnects with jittered exponential backoff and resubscribes to every symbol.
+    The table is only served while connected, so callers fall back to polling otherwise.
+    """
+
+    # Minimum and maximum number of seconds to wait before reconnecting
+    RECONNECT_MIN = 1
+    RECONNECT_MAX = 60
+
+    def __init__(self, url: str = APCA_STREAM_URL):
+        """
+        Creates a new trade stream.
+
+        Args:
+            url (str, optional): The url of the websocket feed.
+        """
+
+        self.url = url
+        self.lock = threading.Lock()
+        self.trades = {}
+        self.symbols = set()
+        self.connected = False
+        self.listeners = []
+
+        self.thread = None
+        self.loop = None
+        self.task = None
+        self.websocket = None
+        self.ready = threading.Event()
+
+        self.messages = 0
+        self.malformed = 0
+        self.reconnects = 0
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None
+
+    def start(self) -> None:
+        """
+        Starts streaming in a background thread.
+        """
+
+        if self.thread is not None:
+            return
+
+        self.ready.clear()
+        self.thread = threading.Thread(
+            target=self._thread, name="trade-stream", daemon=True
+        )
+        self.thread.start()
+        self.ready.wait()
+
+    def stop(self) -> None:
+        """
+        Stops streaming and closes the connection.
+        """
+
+        if self.thread is None:
+            return
+
+        self.loop.call_soon_threadsafe(self.task.cancel)
+        self.thread.join()
+        self.thread = None
+
+    def get_trade(self, symbol: str) -> dict | None:
+        """
+        Retrieves the last trade of a symbol, without any network I/O.
+
+        Args:
+            symbol (str): The symbol of the stock.
+
+        Returns:
+            dict | None: The last trade as sent by the feed, None if it is unknown or the stream is down.
+        """
+
+        with self.lock:
+            if not self.connected:
+                return None
+            return self.trades.get(symbol)
+
+    def add_listener(self, callback) -> None:
+        """
+        Registers a callback which is called with the symbol and trade of every streamed trade.
+        Callbacks run on the stream thread, so they must be quick and thread-safe.
+        """
+
+        self.listeners.append(callback)
+
+    def subscribe(self, symbols: list[str]) -> None:
+        """
+        Subscribes to the trades of symbols, now if connected and otherwise on the next connect.
+
+        Args:
+            symbols (list[str]): The symbols to subscribe to.
+        """
+
+        with self.lock:
+            new = [symbol for symbol in symbols if symbol not in self.symbols]
+            self.symbols.update(new)
+            connected = self.connected
+
+        if new and connected:
+            asyncio.run_coroutine_threadsafe(self._subscribe(new), self.loop)
+
+    def get_stats(self) -> dict:
+        """
+        Retrieves the counters of the stream.
+
+        Returns:
+            dict: Whether the stream is connected, the number of subscribed symbols and
+            known trades, and the number of messages received, malformed messages skipped and
+            reconnects.
+        """
+
+        with self.lock:
+            return {
+                "connected": self.connected,
+                "symbols": len(self.symbols),
+                "trades": len(self.trades),
+                "messages": self.messages,
+                "malformed": self.malformed,
+                "reconnects": self.reconnects,
+            }
+
+    def _thread(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.task = self.loop.create_task(self._run())
+        self.ready.set()
+        try:
+            self.loop.run_until_complete(self.task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.loop.close()
+
+    async def _run(self) -> None:
+        delay = TradeStream.RECONNECT_MIN
+        while True:
+            try:
+                async with websockets.connect(self.url) as websocket:
+                    await self._authenticate(websocket)
+                    self.websocket = websocket
+                    with self.lock:
+                        symbols = list(self.symbols)
+                        self.connected = True
+                    if symbols:
+                        await self._subscribe(symbols)
+
+                    delay = TradeStream.RECONNECT_MIN
+                    async for message in websocket:
+                        self._handle(message)
+            except (OSError, websockets.WebSocketException, ValueError) as e:
+                print("Trade stream disconnected:", e, flush=True)
+            except Exception as e:
+                # Anything unexpected must not end the task, cancellation still does
+                print("Trade stream failed:", repr(e), flush=True)
+            finally:
+                self.websocket = None
+                with self.lock:
+                    self.connected = False
+
+            self.reconnects += 1
+            await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+            delay = min(delay * 2, TradeStream.RECONNECT_MAX)
+
+    async def _authenticate(self, websocket) -> None:
+        await websocket.recv()
+        await websocket.send(
+            json.dumps(
+                {"action": "auth", "key": APCA_API_KEY, "secret": APCA_API_SECRET}
+            )
+        )
+        for message in json.loads(await websocket.recv()):
+            if message.get("T") == "error":
+                raise ValueError(f"{message.get('code')} - {message.get('msg')}")
+
+    async def _subscribe(self, symbols: list[str]) -> None:
+        if self.websocket is not None:
+            await self.websocket.send(
+                json.dumps({"action": "subscribe", "trades": symbols})
+            )
+
+    def _handle(self, message: str) -> None:
+        try:
+            records = json.loads(message)
+        except ValueError:
+            records = None
+        if not isinstance(records, list):
+            self._skip(message)
+            return
+
+        for data in records:
+            if not isinstance(data, dict):
+                self._skip(data)
+                continue
+            kind = data.get("T")
+            if kind == "t":
+                symbol = data.get("S")
+                if not isinstance(symbol, str):
+                    self._skip(data)
+                    continue
+                with self.lock:
+                    self.trades[symbol] = data
+                    self.messages += 1
+                for callback in self.listeners:
+                    try:
+                        callback(symbol, data)
+                    except Exception as e:
+                        print("Trade listener failed:", e, flush=True)
+            elif kind == "error":
+                print(
+                    f"Trade stream error: {data.get('code')} - {data.get('msg')}",
+                    flush=True,
+                )
+
+    def _skip(self, message) -> None:
+        with self.lock:
+            self.malformed += 1
+        print(f"Skipped malformed trade stream message: {message!r:.200}", flush=True)
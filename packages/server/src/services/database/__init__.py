@@ -1,4 +1,5 @@
 # @author: adibarra (Alec Ibarra)
-# @description: Exports the Database class for use in other modules
+# @description: Exports the Database and AsyncDatabase classes for use in other modules
 
+from .async_database import AsyncDatabase  # noqa: F401
 from .database import Database  # noqa: F401
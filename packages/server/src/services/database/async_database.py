@@ -0,0 +1,87 @@
+# @author: adibarra (Alec Ibarra)
+# @description: AsyncDatabase class for handling database interactions from async code
+
+from config import (
+    POSTGRESQL_POOL_MAX_LIFETIME,
+    POSTGRESQL_POOL_MAX_SIZE,
+    POSTGRESQL_POOL_MIN_SIZE,
+    POSTGRESQL_POOL_TIMEOUT,
+    POSTGRESQL_STATEMENT_TIMEOUT,
+    POSTGRESQL_URI,
+)
+from psycopg_pool import AsyncConnectionPool
+
+# import all async mixins here
+from services.database.mixins.bars import AsyncBarsMixin
+from services.database.mixins.holdings import AsyncHoldingsMixin
+from services.database.mixins.meta import AsyncMetaMixin
+from services.database.mixins.portfolios import AsyncPortfolioMixin
+from services.database.mixins.sessions import AsyncSessionsMixin
+from services.database.mixins.tournaments import AsyncTournamentsMixin
+from services.database.mixins.transactions import AsyncTransactionsMixin
+from services.database.mixins.users import AsyncUsersMixin
+
+
+# add all imported async mixins here
+class AsyncDatabase(
+    AsyncBarsMixin,
+    AsyncHoldingsMixin,
+    AsyncMetaMixin,
+    AsyncPortfolioMixin,
+    AsyncSessionsMixin,
+    AsyncTournamentsMixin,
+    AsyncTransactionsMixin,
+    AsyncUsersMixin,
+    object,
+):
+    """
+    A class representing the database, for use from async code.
+
+    It exposes the same methods as the `Database` class as coroutines, backed by its own
+    bounded connection pool. Schema initialization is left to the `Database` class.
+    """
+
+    connectionPool: AsyncConnectionPool = None
+
+    def __new__(cls):
+        """
+        Creates a new instance of the AsyncDatabase class if it doesn't already exist.
+        If an instance already exists, returns the existing instance.
+
+        The connection pool is created closed. It must be opened with `open` from a running
+        event loop before use, which the app lifespan in `main.py` takes care of.
+
+        Returns:
+            AsyncDatabase: The AsyncDatabase instance.
+        """
+
+        if not hasattr(cls, "instance"):
+            cls.instance = super(AsyncDatabase, cls).__new__(cls)
+            cls.instance.connectionPool = AsyncConnectionPool(
+                POSTGRESQL_URI,
+                min_size=POSTGRESQL_POOL_MIN_SIZE,
+                max_size=POSTGRESQL_POOL_MAX_SIZE,
+                timeout=POSTGRESQL_POOL_TIMEOUT,
+                max_lifetime=POSTGRESQL_POOL_MAX_LIFETIME,
+                kwargs={
+                    "options": f"-c statement_timeout={POSTGRESQL_STATEMENT_TIMEOUT}"
+                },
+                open=False,
+            )
+
+        return cls.instance
+
+    async def open(self) -> None:
+        """
+        Opens the connection pool.
+        """
+
+        print("Opening async PostgreSQL connection pool...", flush=True)
+        await self.connectionPool.open()
+
+    async def close(self) -> None:
+        """
+        Closes the connection pool, waiting for checked out connections to be returned.
+        """
+
+        await self.connectionPool.close()
@@ -2,20 +2,32 @@
 # @description: Database class for handling database interactions
 
 import psycopg2
-from config import POSTGRESQL_URI
-from psycopg2 import pool
+from config import (
+    POSTGRESQL_POOL_MAX_LIFETIME,
+    POSTGRESQL_POOL_MAX_SIZE,
+    POSTGRESQL_POOL_MIN_SIZE,
+    POSTGRESQL_POOL_TIMEOUT,
+    POSTGRESQL_STATEMENT_TIMEOUT,
+    POSTGRESQL_URI,
+)
+from services.database.migrations import MigrationError, Migrator
 
 # import all mixins here
+from services.database.mixins.bars import BarsMixin
+from services.database.mixins.holdings import HoldingsMixin
 from services.database.mixins.meta import MetaMixin
 from services.database.mixins.portfolios import PortfolioMixin
 from services.database.mixins.sessions import SessionsMixin
 from services.database.mixins.tournaments import TournamentsMixin
 from services.database.mixins.transactions import TransactionsMixin
 from services.database.mixins.users import UsersMixin
+from services.database.pool import BlockingConnectionPool
 
 
 # add all imported mixins here
 class Database(
+    BarsMixin,
+    HoldingsMixin,
     MetaMixin,
     PortfolioMixin,
     SessionsMixin,
@@ -28,12 +40,15 @@ class Database(
     A class representing the database.
     """
 
-    connectionPool: pool.SimpleConnectionPool = None
+    connectionPool: BlockingConnectionPool = None
 
     def __new__(cls):
         """
         Creates a new instance of the Database class if it doesn't already exist.
         If an instance already exists, returns the existing instance.
+        On first creation, the schema is migrated to the latest version, see `Migrator`.
+        If a migration fails, the error is raised so the server does not start on a partially
+        migrated schema.
 
         To see the available methods, refer to the mixin classes in the `services.database.mixins` package.
 
@@ -42,156 +57,33 @@ class Database(
         """
 
         if not hasattr(cls, "instance"):
-            conn = None
             cls.instance = super(Database, cls).__new__(cls)
 
             try:
                 print("Connecting to PostgreSQL database...", flush=True)
-                cls.instance.connectionPool = pool.SimpleConnectionPool(
-                    1, 20, POSTGRESQL_URI
+                cls.instance.connectionPool = BlockingConnectionPool(
+                    POSTGRESQL_POOL_MIN_SIZE,
+                    POSTGRESQL_POOL_MAX_SIZE,
+                    POSTGRESQL_URI,
+                    timeout=POSTGRESQL_POOL_TIMEOUT,
+                    max_lifetime=POSTGRESQL_POOL_MAX_LIFETIME,
+                    options=f"-c statement_timeout={POSTGRESQL_STATEMENT_TIMEOUT}",
                 )
-                print("Connected. Initializing...", flush=True)
-
-                conn = cls.instance.connectionPool.getconn()
-                with conn.cursor() as cursor:
-                    # Create pgcrypto extension if it doesn't exist
-                    cursor.execute("CREATE EXTENSION IF NOT EXISTS pgcrypto;")
-
-                    # Create ACTION enum if it doesn't exist
-                    cursor.execute("""
-                        DO $$
-                        BEGIN
-                            CREATE TYPE ACTION AS ENUM ('BUY', 'SELL');
-                        EXCEPTION
-                            WHEN duplicate_object THEN NULL; -- Do nothing if the type already exists
-                        END $$;
-                    """)
-
-                    # Create STATUS enum if it doesn't exist
-                    cursor.execute("""
-                        DO $$
-                        BEGIN
-                            CREATE TYPE STATUS AS ENUM ('SCHEDULED', 'ONGOING', 'FINISHED');
-                        EXCEPTION
-                            WHEN duplicate_object THEN NULL; -- Do nothing if the type already exists
-                        END $$;
-                    """)
-
-                    # Initialize necessary tables if they don't exist
-                    cursor.execute("""
-                        CREATE TABLE IF NOT EXISTS users (
-                            uuid UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                            email TEXT UNIQUE NOT NULL,
-                            username TEXT UNIQUE NOT NULL,
-                            password_hash TEXT NOT NULL,
-                            coins INT NOT NULL DEFAULT 10,
-                            created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                            updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
-                        );
-                    """)
-
-                    cursor.execute("""
-                        CREATE TABLE IF NOT EXISTS tournaments (
-                            uuid UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                            owner UUID NOT NULL REFERENCES users(uuid) ON DELETE CASCADE,
-                            name TEXT NOT NULL,
-                            status STATUS NOT NULL,
-                            start_date TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                            end_date TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                            created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                            updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
-                        );
-                    """)
-
-                    cursor.execute("""
-                        CREATE TABLE IF NOT EXISTS portfolios (
-                            uuid UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                            owner UUID NOT NULL REFERENCES users(uuid) ON DELETE CASCADE,
-                            tournament UUID REFERENCES tournaments(uuid) ON DELETE CASCADE,
-                            name TEXT NOT NULL,
-                            balance_cents BIGINT NOT NULL DEFAULT 1000000,
-                            created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                            updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
-                        );
-                    """)
-
-                    cursor.execute("""
-                        CREATE TABLE IF NOT EXISTS transactions (
-                            uuid UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                            portfolio UUID NOT NULL REFERENCES portfolios(uuid) ON DELETE CASCADE,
-                            symbol TEXT NOT NULL,
-                            action ACTION NOT NULL,
-                            quantity INT NOT NULL,
-                            price_cents BIGINT NOT NULL,
-                            created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
-                        );
-                    """)
-
-                    cursor.execute("""
-                        CREATE TABLE IF NOT EXISTS sessions (
-                            owner UUID UNIQUE NOT NULL REFERENCES users(uuid) ON DELETE CASCADE,
-                            token TEXT NOT NULL DEFAULT gen_random_uuid(),
-                            created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                            updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
-                        );
-                    """)
-
-                    cursor.execute("""
-                        CREATE TABLE IF NOT EXISTS attributes (
-                            owner UUID NOT NULL REFERENCES users(uuid) ON DELETE CASCADE,
-                            key TEXT NOT NULL,
-                            value TEXT NOT NULL,
-                            created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                            updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
-                        );
-                    """)
-
-                    cursor.execute("""
-                        CREATE TABLE IF NOT EXISTS settings (
-                            key TEXT NOT NULL,
-                            value TEXT NOT NULL
-                        );
-                    """)
-
-                    cursor.execute("""
-                        CREATE TABLE IF NOT EXISTS friends (
-                            owner UUID NOT NULL REFERENCES users(uuid) ON DELETE CASCADE,
-                            friend UUID NOT NULL REFERENCES users(uuid) ON DELETE CASCADE
-                        );
-                    """)
-
-                    # Create a function to update the updated_at column
-                    cursor.execute("""
-                        CREATE OR REPLACE FUNCTION update_updated_at()
-                            RETURNS TRIGGER AS $$
-                            BEGIN
-                                NEW.updated_at = CURRENT_TIMESTAMP;
-                                RETURN NEW;
-                            END;
-                            $$ LANGUAGE plpgsql;
-                    """)
-
-                    # Create a trigger to update the updated_at columns
-                    for table in [
-                        "users",
-                        "tournaments",
-                        "portfolios",
-                        "sessions",
-                        "attributes",
-                    ]:
-                        cursor.execute(f"""
-                            CREATE OR REPLACE TRIGGER update_{table}_updated_at
-                                BEFORE UPDATE ON {table}
-                                FOR EACH ROW
-                                EXECUTE FUNCTION update_updated_at();
-                        """)
-
-                    conn.commit()
-                    print("Initialized. Database ready.", flush=True)
+                print("Connected. Migrating...", flush=True)
+
+                applied = Migrator.migrate(POSTGRESQL_URI)
+                print(
+                    f"Applied {applied} migrations. Database ready."
+                    if applied
+                    else "Schema is current. Database ready.",
+                    flush=True,
+                )
+            except MigrationError as e:
+                print("Failed to migrate database:\n", e, flush=True)
+                cls.instance.connectionPool.closeall()
+                del cls.instance
+                raise
             except psycopg2.Error as e:
                 print("Failed to initialize database:\n", e, flush=True)
-            finally:
-                if conn:
-                    cls.instance.connectionPool.putconn(conn)
 
         return cls.instance
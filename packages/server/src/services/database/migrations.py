@@ -0,0 +1,483 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Versioned schema migrations and the runner which applies them
+
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable
+
+import psycopg2
+from services.database.mixins.holdings import write_holdings
+
+if TYPE_CHECKING:
+    from psycopg2.extensions import cursor as Cursor
+
+# Key of the advisory lock held while migrating, so only one process migrates at a time
+LOCK_KEY = 727_001
+
+# Seconds between attempts to take the advisory lock while another process migrates
+LOCK_POLL_INTERVAL = 0.5
+
+
+@dataclass
+class Migration:
+    version: int
+    description: str
+    apply: Callable[["Cursor"], None]
+    # Migrations which cannot run in a transaction, e.g. concurrent index builds, must be
+    # safe to re-run, since a crash can leave them partially applied
+    transactional: bool = True
+
+
+def initial_schema(cursor: "Cursor") -> None:
+    """
+    Creates the extensions, types, tables and triggers of the schema which was created on
+    import before migrations were introduced.
+
+    Every statement is idempotent, so databases created before migrations were introduced
+    adopt it in place. Tables added since then each have their own migration.
+    """
+
+    # Create pgcrypto extension if it doesn't exist
+    cursor.execute("CREATE EXTENSION IF NOT EXISTS pgcrypto;")
+
+    # Create ACTION enum if it doesn't exist
+    cursor.execute("""
+        DO $$
+        BEGIN
+            CREATE TYPE ACTION AS ENUM ('BUY', 'SELL');
+        EXCEPTION
+            WHEN duplicate_object THEN NULL; -- Do nothing if the type already exists
+        END $$;
+    """)
+
+    # Create STATUS enum if it doesn't exist
+    cursor.execute("""
+        DO $$
+        BEGIN
+            CREATE TYPE STATUS AS ENUM ('SCHEDULED', 'ONGOING', 'FINISHED');
+        EXCEPTION
+            WHEN duplicate_object THEN NULL; -- Do nothing if the type already exists
+        END $$;
+    """)
+
+    # Initialize necessary tables if they don't exist
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            uuid UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            email TEXT UNIQUE NOT NULL,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            coins INT NOT NULL DEFAULT 10,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS tournaments (
+            uuid UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            owner UUID NOT NULL REFERENCES users(uuid) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            status STATUS NOT NULL,
+            start_date TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            end_date TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS portfolios (
+            uuid UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            owner UUID NOT NULL REFERENCES users(uuid) ON DELETE CASCADE,
+            tournament UUID REFERENCES tournaments(uuid) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            balance_cents BIGINT NOT NULL DEFAULT 1000000,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS transactions (
+            uuid UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            portfolio UUID NOT NULL REFERENCES portfolios(uuid) ON DELETE CASCADE,
+            symbol TEXT NOT NULL,
+            action ACTION NOT NULL,
+            quantity INT NOT NULL,
+            price_cents BIGINT NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sessions (
+            owner UUID UNIQUE NOT NULL REFERENCES users(uuid) ON DELETE CASCADE,
+            token TEXT NOT NULL DEFAULT gen_random_uuid(),
+            created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS attributes (
+            owner UUID NOT NULL REFERENCES users(uuid) ON DELETE CASCADE,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT NOT NULL,
+            value TEXT NOT NULL
+        );
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS friends (
+            owner UUID NOT NULL REFERENCES users(uuid) ON DELETE CASCADE,
+            friend UUID NOT NULL REFERENCES users(uuid) ON DELETE CASCADE
+        );
+    """)
+
+    # Create a function to update the updated_at column
+    cursor.execute("""
+        CREATE OR REPLACE FUNCTION update_updated_at()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                NEW.updated_at = CURRENT_TIMESTAMP;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+    """)
+
+    # Create a trigger to update the updated_at columns
+    for table in [
+        "users",
+        "tournaments",
+        "portfolios",
+        "sessions",
+        "attributes",
+    ]:
+        cursor.execute(f"""
+            CREATE OR REPLACE TRIGGER update_{table}_updated_at
+                BEFORE UPDATE ON {table}
+                FOR EACH ROW
+                EXECUTE FUNCTION update_updated_at();
+        """)
+
+
+def secondary_indexes(cursor: "Cursor") -> None:
+    """
+    Creates the indexes of the foreign keys, filters and sort orders used by the queries.
+
+    Indexes are built concurrently, so tables stay writable while they build.
+    """
+
+    # Lookups of transactions by portfolio and portfolios by owner alone use the leading
+    # column of the keyset pagination indexes
+    create_index_concurrently(
+        cursor,
+        "transactions_portfolio_created_at_uuid_idx",
+        "transactions (portfolio, created_at, uuid)",
+    )
+    create_index_concurrently(
+        cursor,
+        "portfolios_owner_created_at_uuid_idx",
+        "portfolios (owner, created_at, uuid)",
+    )
+    create_index_concurrently(
+        cursor, "portfolios_tournament_idx", "portfolios (tournament)"
+    )
+    create_index_concurrently(
+        cursor, "tournaments_created_at_uuid_idx", "tournaments (created_at, uuid)"
+    )
+    create_index_concurrently(
+        cursor,
+        "tournaments_status_start_date_idx",
+        "tournaments (status, start_date)",
+    )
+    create_index_concurrently(cursor, "sessions_token_idx", "sessions (token)")
+    create_index_concurrently(
+        cursor, "attributes_owner_key_idx", "attributes (owner, key)"
+    )
+
+
+def create_index_concurrently(cursor: "Cursor", name: str, definition: str) -> None:
+    """
+    Creates an index without blocking writes, unless a valid index of that name exists.
+
+    A concurrent build which fails leaves an invalid index behind, which is dropped and
+    rebuilt.
+
+    Args:
+        cursor (Cursor): A cursor of a connection in autocommit mode.
+        name (str): The name of the index.
+        definition (str): The table and columns to index, e.g. "portfolios (owner)".
+    """
+
+    cursor.execute(
+        "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", (name,)
+    )
+    index = cursor.fetchone()
+    if index is not None and index[0]:
+        return
+    if index is not None:
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+
+
+def holdings_table(cursor: "Cursor") -> None:
+    """
+    Creates the holdings table, the materialized positions of the transactions ledger, and
+    fills it from the ledger so sells of positions bought before it existed are accepted.
+    """
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS holdings (
+            portfolio UUID NOT NULL REFERENCES portfolios(uuid) ON DELETE CASCADE,
+            symbol TEXT NOT NULL,
+            quantity INT NOT NULL,
+            cost_basis_cents BIGINT NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (portfolio, symbol)
+        );
+    """)
+
+    cursor.execute("""
+        CREATE OR REPLACE TRIGGER update_holdings_updated_at
+            BEFORE UPDATE ON holdings
+            FOR EACH ROW
+            EXECUTE FUNCTION update_updated_at();
+    """)
+
+    count = write_holdings(cursor)
+    print(f"Backfilled {count} holdings from the transactions ledger.", flush=True)
+
+
+def bars_table(cursor: "Cursor") -> None:
+    """
+    Creates the bars table, the local store of historical OHLCV bars.
+    """
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS bars (
+            symbol TEXT NOT NULL,
+            timeframe TEXT NOT NULL,
+            timestamp TIMESTAMPTZ NOT NULL,
+            open_cents BIGINT NOT NULL,
+            high_cents BIGINT NOT NULL,
+            low_cents BIGINT NOT NULL,
+            close_cents BIGINT NOT NULL,
+            volume BIGINT NOT NULL,
+            PRIMARY KEY (symbol, timeframe, timestamp)
+        );
+    """)
+
+
+def bar_coverage_table(cursor: "Cursor") -> None:
+    """
+    Creates the bar_coverage table, the time ranges of bars fetched for each symbol.
+    """
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS bar_coverage (
+            symbol TEXT NOT NULL,
+            timeframe TEXT NOT NULL,
+            start_date TIMESTAMPTZ NOT NULL,
+            end_date TIMESTAMPTZ NOT NULL,
+            PRIMARY KEY (symbol, timeframe, start_date)
+        );
+    """)
+
+
+def revoked_tokens_table(cursor: "Cursor") -> None:
+    """
+    Creates the revoked_tokens table, the denylist of signed session tokens.
+    """
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS revoked_tokens (
+            jti TEXT PRIMARY KEY,
+            expires_at TIMESTAMPTZ NOT NULL
+        );
+    """)
+
+
+def standings_table(cursor: "Cursor") -> None:
+    """
+    Creates the standings table, the final standings frozen when a tournament finishes.
+    """
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS standings (
+            tournament UUID NOT NULL REFERENCES tournaments(uuid) ON DELETE CASCADE,
+            rank INT NOT NULL,
+            portfolio UUID NOT NULL,
+            owner UUID NOT NULL REFERENCES users(uuid) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            value_cents BIGINT NOT NULL,
+            prize_coins INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (tournament, rank)
+        );
+    """)
+
+
+def scheduled_tournaments(cursor: "Cursor") -> None:
+    """
+    Creates new tournaments as scheduled, the scheduler advances their status.
+    """
+
+    cursor.execute("""
+        ALTER TABLE tournaments ALTER COLUMN status SET DEFAULT 'SCHEDULED';
+    """)
+
+
+# add new migrations at the end, never change or reorder applied ones
+MIGRATIONS = [
+    Migration(1, "Initial schema", initial_schema),
+    Migration(2, "Secondary indexes", secondary_indexes, transactional=False),
+    Migration(3, "Holdings table", holdings_table),
+    Migration(4, "Bars table", bars_table),
+    Migration(5, "Bar coverage table", bar_coverage_table),
+    Migration(6, "Revoked tokens table", revoked_tokens_table),
+    Migration(7, "Standings table", standings_table),
+    Migration(8, "Scheduled tournaments", scheduled_tournaments),
+]
+
+
+class MigrationError(Exception):
+    """
+    Raised when a migration fails to apply. The server must not start on a schema which is
+    not fully migrated.
+    """
+
+
+class Migrator:
+    """
+    Brings the database schema up to the latest migration.
+
+    The applied version is recorded in the schema_version table. When it is current, as on
+    every start after the first, migrating is a single query and no DDL runs. Otherwise the
+    pending migrations are applied in order while holding an advisory lock, so when several
+    workers start at once only one migrates and the others wait for it and then find the
+    schema current.
+
+    Waiting workers poll for the lock instead of blocking on it. A blocked lock request is a
+    statement in progress which holds a snapshot, and concurrent index builds wait for every
+    older snapshot, so the migrating worker would wait on the workers which wait on it.
+    """
+
+    def migrate(*args, **kwargs) -> int:
+        """
+        Applies the pending migrations on a dedicated connection.
+
+        Args:
+            *args: Positional arguments passed to `psycopg2.connect`.
+            **kwargs: Keyword arguments passed to `psycopg2.connect`.
+
+        Returns:
+            int: The number of migrations applied.
+
+        Raises:
+            MigrationError: If a migration fails. The migrations applied before it are kept.
+            psycopg2.Error: If the database cannot be reached.
+        """
+
+        latest = MIGRATIONS[-1].version
+        conn = psycopg2.connect(*args, **kwargs)
+        try:
+            # Concurrent index builds cannot run in a transaction, and in autocommit mode
+            # no snapshot is held between statements
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                if Migrator.get_version(cursor) >= latest:
+                    return 0
+
+                # Index builds may take longer than any request should
+                cursor.execute("SET statement_timeout = 0")
+                Migrator._lock(cursor)
+                try:
+                    return Migrator._apply_pending(conn, cursor)
+                finally:
+                    # A lost connection releases the lock by itself
+                    if not conn.closed:
+                        cursor.execute("SELECT pg_advisory_unlock(%s)", (LOCK_KEY,))
+        finally:
+            conn.close()
+
+    def get_version(cursor: "Cursor") -> int:
+        """
+        Retrieves the version of the schema, 0 if no migration was applied yet.
+        """
+
+        cursor.execute("SELECT to_regclass('schema_version') IS NOT NULL")
+        if not cursor.fetchone()[0]:
+            return 0
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        return cursor.fetchone()[0]
+
+    def _lock(cursor: "Cursor") -> None:
+        waiting = False
+        while True:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", (LOCK_KEY,))
+            if cursor.fetchone()[0]:
+                return
+            if not waiting:
+                print("Waiting for another process to migrate...", flush=True)
+                waiting = True
+            time.sleep(LOCK_POLL_INTERVAL)
+
+    def _apply_pending(conn, cursor: "Cursor") -> int:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INT PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+
+        # Another process may have migrated while this one waited for the lock
+        version = Migrator.get_version(cursor)
+        applied = 0
+        for migration in MIGRATIONS:
+            if migration.version <= version:
+                continue
+
+            print(
+                f"Applying migration {migration.version}: {migration.description}...",
+                flush=True,
+            )
+            try:
+                if migration.transactional:
+                    conn.autocommit = False
+                    try:
+                        migration.apply(cursor)
+                        Migrator._record(cursor, migration)
+                        conn.commit()
+                    except Exception:
+                        conn.rollback()
+                        raise
+                    finally:
+                        conn.autocommit = True
+                else:
+                    # Not recorded unless every step succeeds, so it is re-run in full
+                    migration.apply(cursor)
+                    Migrator._record(cursor, migration)
+            except Exception as e:
+                raise MigrationError(
+                    f"Migration {migration.version} ({migration.description}) failed: {e}"
+                ) from e
+            applied += 1
+
+        return applied
+
+    def _record(cursor: "Cursor", migration: Migration) -> None:
+        cursor.execute(
+            "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+            (migration.version, migration.description),
+        )
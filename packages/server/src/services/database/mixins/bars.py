@@ -0,0 +1,336 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Database class mixin for handling historical bar database operations
+
+from datetime import datetime
+from typing import TYPE_CHECKING, List
+
+from psycopg.rows import dict_row
+from psycopg2.extras import RealDictCursor
+from services.database.statements import STATEMENTS, columns
+
+if TYPE_CHECKING:
+    from psycopg_pool import AsyncConnectionPool
+    from services.database.pool import BlockingConnectionPool
+
+# Statements of both mixins, see `StatementRegistry`
+GET_BARS = STATEMENTS.register(
+    "get_bars",
+    """
+    SELECT * FROM bars
+    WHERE symbol = %s AND timeframe = %s AND timestamp >= %s AND timestamp < %s
+    ORDER BY timestamp OFFSET %s LIMIT %s
+    """,
+)
+GET_BAR_COVERAGE = STATEMENTS.register(
+    "get_bar_coverage",
+    """
+    SELECT start_date, end_date FROM bar_coverage
+    WHERE symbol = %s AND timeframe = %s AND start_date < %s AND end_date > %s
+    ORDER BY start_date
+    """,
+)
+SAVE_BARS = STATEMENTS.register(
+    "save_bars",
+    """
+    INSERT INTO bars (symbol, timeframe, timestamp, open_cents, high_cents, low_cents, close_cents, volume)
+    SELECT %s::text, %s::text, * FROM unnest(
+        %s::timestamptz[], %s::bigint[], %s::bigint[], %s::bigint[], %s::bigint[], %s::bigint[]
+    )
+    ON CONFLICT (symbol, timeframe, timestamp) DO UPDATE SET
+        open_cents = EXCLUDED.open_cents,
+        high_cents = EXCLUDED.high_cents,
+        low_cents = EXCLUDED.low_cents,
+        close_cents = EXCLUDED.close_cents,
+        volume = EXCLUDED.volume
+    """,
+)
+TAKE_BAR_COVERAGE = STATEMENTS.register(
+    "take_bar_coverage",
+    """
+    DELETE FROM bar_coverage
+    WHERE symbol = %s AND timeframe = %s AND start_date <= %s AND end_date >= %s
+    RETURNING start_date, end_date
+    """,
+)
+ADD_BAR_COVERAGE = STATEMENTS.register(
+    "add_bar_coverage",
+    """
+    INSERT INTO bar_coverage (symbol, timeframe, start_date, end_date) VALUES (%s, %s, %s, %s)
+    ON CONFLICT (symbol, timeframe, start_date) DO UPDATE SET
+        end_date = GREATEST(bar_coverage.end_date, EXCLUDED.end_date)
+    """,
+)
+
+# The columns of a bar, after its symbol and timeframe
+BAR_COLUMNS = [
+    "timestamp",
+    "open_cents",
+    "high_cents",
+    "low_cents",
+    "close_cents",
+    "volume",
+]
+
+
+def _save_bars_params(symbol: str, timeframe: str, bars: List[dict]) -> tuple:
+    """
+    Maps bars to the parameters of the statement which stores them all at once.
+    """
+
+    rows = [tuple(bar[column] for column in BAR_COLUMNS) for bar in bars]
+    return (symbol, timeframe, *columns(rows, len(BAR_COLUMNS)))
+
+
+def _merge_coverage(
+    start_date: datetime, end_date: datetime, ranges: List[tuple]
+) -> tuple[datetime, datetime]:
+    """
+    Merges a fetched range with the adjacent and overlapping ranges taken out of the table.
+    """
+
+    for merged_start, merged_end in ranges:
+        start_date = min(start_date, merged_start)
+        end_date = max(end_date, merged_end)
+    return start_date, end_date
+
+
+class BarsMixin:
+    """
+    A collection of methods for handling historical bar database operations.
+
+    The bars table is a local store of OHLCV bars fetched from the market data API.
+    The bar_coverage table records which time ranges have been fetched for each symbol
+    and timeframe, so ranges without any bars (e.g. weekends) are not fetched again.
+    """
+
+    connectionPool: "BlockingConnectionPool"
+
+    def get_bars(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_date: datetime,
+        end_date: datetime,
+        offset: int = 0,
+        limit: int = None,
+    ) -> List[dict]:
+        """
+        Retrieves the stored bars of a symbol within a time range, oldest first.
+
+        Args:
+            symbol (str): The symbol of the stock.
+            timeframe (str): The timeframe of the bars.
+            start_date (datetime): The start of the range (inclusive).
+            end_date (datetime): The end of the range (exclusive).
+            offset (int, optional): The number of bars to skip. Defaults to 0.
+            limit (int, optional): The maximum number of bars to retrieve. Defaults to all.
+
+        Returns:
+            List[dict]: A list of bars if successful, None otherwise.
+        """
+
+        conn = None
+        try:
+            conn = self.connectionPool.getconn()
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(
+                    cursor,
+                    GET_BARS,
+                    (symbol, timeframe, start_date, end_date, offset, limit),
+                )
+                bars = cursor.fetchall()
+                conn.commit()
+                return bars
+        except Exception as e:
+            print("Failed to get bars:", e, flush=True)
+            return None
+        finally:
+            if conn:
+                self.connectionPool.putconn(conn)
+
+    def get_bar_coverage(
+        self, symbol: str, timeframe: str, start_date: datetime, end_date: datetime
+    ) -> List[tuple[datetime, datetime]]:
+        """
+        Retrieves the fetched time ranges of a symbol which overlap a time range.
+
+        Args:
+            symbol (str): The symbol of the stock.
+            timeframe (str): The timeframe of the bars.
+            start_date (datetime): The start of the range.
+            end_date (datetime): The end of the range.
+
+        Returns:
+            List[tuple[datetime, datetime]]: A list of (start, end) ranges if successful, None otherwise.
+        """
+
+        conn = None
+        try:
+            conn = self.connectionPool.getconn()
+            with conn.cursor() as cursor:
+                STATEMENTS.execute(
+                    cursor,
+                    GET_BAR_COVERAGE,
+                    (symbol, timeframe, end_date, start_date),
+                )
+                ranges = cursor.fetchall()
+                conn.commit()
+                return ranges
+        except Exception as e:
+            print("Failed to get bar coverage:", e, flush=True)
+            return None
+        finally:
+            if conn:
+                self.connectionPool.putconn(conn)
+
+    def save_bars(
+        self,
+        symbol: str,
+        timeframe: str,
+        bars: List[dict],
+        start_date: datetime,
+        end_date: datetime,
+    ) -> bool:
+        """
+        Stores fetched bars, replacing existing bars with the same timestamp, and records
+        the time range as fetched. Adjacent and overlapping fetched ranges are merged.
+
+        Args:
+            symbol (str): The symbol of the stock.
+            timeframe (str): The timeframe of the bars.
+            bars (List[dict]): The bars to store.
+            start_date (datetime): The start of the fetched range.
+            end_date (datetime): The end of the fetched range, None to not record the range.
+
+        Returns:
+            bool: True if successful, False otherwise.
+        """
+
+        conn = None
+        try:
+            conn = self.connectionPool.getconn()
+            with conn.cursor() as cursor:
+                STATEMENTS.execute(
+                    cursor, SAVE_BARS, _save_bars_params(symbol, timeframe, bars)
+                )
+
+                if end_date is not None and start_date < end_date:
+                    STATEMENTS.execute(
+                        cursor,
+                        TAKE_BAR_COVERAGE,
+                        (symbol, timeframe, end_date, start_date),
+                    )
+                    start_date, end_date = _merge_coverage(
+                        start_date, end_date, cursor.fetchall()
+                    )
+                    STATEMENTS.execute(
+                        cursor,
+                        ADD_BAR_COVERAGE,
+                        (symbol, timeframe, start_date, end_date),
+                    )
+            conn.commit()
+            return True
+        except Exception as e:
+            print("Failed to save bars:", e, flush=True)
+            return False
+        finally:
+            if conn:
+                self.connectionPool.putconn(conn)
+
+
+class AsyncBarsMixin:
+    """
+    A collection of async methods for handling historical bar database operations.
+    """
+
+    connectionPool: "AsyncConnectionPool"
+
+    async def get_bars(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_date: datetime,
+        end_date: datetime,
+        offset: int = 0,
+        limit: int = None,
+    ) -> List[dict]:
+        """
+        Retrieves the stored bars of a symbol within a time range, oldest first.
+
+        See `BarsMixin.get_bars`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor,
+                        GET_BARS,
+                        (symbol, timeframe, start_date, end_date, offset, limit),
+                    )
+                    return await cursor.fetchall()
+        except Exception as e:
+            print("Failed to get bars:", e, flush=True)
+            return None
+
+    async def get_bar_coverage(
+        self, symbol: str, timeframe: str, start_date: datetime, end_date: datetime
+    ) -> List[tuple[datetime, datetime]]:
+        """
+        Retrieves the fetched time ranges of a symbol which overlap a time range.
+
+        See `BarsMixin.get_bar_coverage`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor,
+                        GET_BAR_COVERAGE,
+                        (symbol, timeframe, end_date, start_date),
+                    )
+                    return await cursor.fetchall()
+        except Exception as e:
+            print("Failed to get bar coverage:", e, flush=True)
+            return None
+
+    async def save_bars(
+        self,
+        symbol: str,
+        timeframe: str,
+        bars: List[dict],
+        start_date: datetime,
+        end_date: datetime,
+    ) -> bool:
+        """
+        Stores fetched bars and records the time range as fetched.
+
+        See `BarsMixin.save_bars`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor, SAVE_BARS, _save_bars_params(symbol, timeframe, bars)
+                    )
+
+                    if end_date is not None and start_date < end_date:
+                        await STATEMENTS.execute_async(
+                            cursor,
+                            TAKE_BAR_COVERAGE,
+                            (symbol, timeframe, end_date, start_date),
+                        )
+                        start_date, end_date = _merge_coverage(
+                            start_date, end_date, await cursor.fetchall()
+                        )
+                        await STATEMENTS.execute_async(
+                            cursor,
+                            ADD_BAR_COVERAGE,
+                            (symbol, timeframe, start_date, end_date),
+                        )
+            return True
+        except Exception as e:
+            print("Failed to save bars:", e, flush=True)
+            return False
@@ -0,0 +1,526 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Database class mixin for handling holding database operations
+
+from typing import TYPE_CHECKING, Iterable, List, Optional
+
+from psycopg.rows import dict_row
+from psycopg2.extras import RealDictCursor
+from services.database.statements import STATEMENTS, columns
+
+if TYPE_CHECKING:
+    from psycopg import AsyncCursor
+    from psycopg2.extensions import cursor as Cursor
+    from psycopg_pool import AsyncConnectionPool
+    from services.database.pool import BlockingConnectionPool
+
+# The ledger in the order it was written, replayed by `replay_ledger`
+LEDGER_QUERY = "SELECT portfolio, symbol, action, quantity, price_cents FROM transactions ORDER BY created_at, uuid"
+
+# Statements of both mixins, see `StatementRegistry`
+GET_HOLDING = STATEMENTS.register(
+    "get_holding",
+    "SELECT * FROM holdings WHERE portfolio = %s AND symbol = %s LIMIT 1",
+)
+GET_HOLDINGS = STATEMENTS.register(
+    "get_holdings", "SELECT * FROM holdings WHERE portfolio = %s ORDER BY symbol"
+)
+GET_HOLDINGS_BY_PORTFOLIOS = STATEMENTS.register(
+    "get_holdings_by_portfolios",
+    "SELECT * FROM holdings WHERE portfolio = ANY(%s::uuid[]) ORDER BY portfolio, symbol",
+)
+GET_ACTIVE_SYMBOLS = STATEMENTS.register(
+    "get_active_symbols",
+    """
+    SELECT DISTINCT holdings.symbol FROM holdings
+    JOIN portfolios ON portfolios.uuid = holdings.portfolio
+    LEFT JOIN tournaments ON tournaments.uuid = portfolios.tournament
+    WHERE tournaments.uuid IS NULL OR tournaments.status <> 'FINISHED'
+    """,
+)
+GET_TOURNAMENT_HOLDINGS = STATEMENTS.register(
+    "get_tournament_holdings",
+    """
+    SELECT portfolios.uuid AS portfolio, portfolios.owner, portfolios.name,
+        portfolios.balance_cents, holdings.symbol, holdings.quantity,
+        holdings.cost_basis_cents
+    FROM portfolios
+    LEFT JOIN holdings ON holdings.portfolio = portfolios.uuid
+    WHERE portfolios.tournament = %s
+    """,
+)
+CREATE_HOLDINGS = STATEMENTS.register(
+    "create_holdings",
+    """
+    INSERT INTO holdings (portfolio, symbol, quantity, cost_basis_cents)
+    SELECT * FROM unnest(%s::uuid[], %s::text[], %s::int[], %s::bigint[])
+    """,
+)
+BUY_HOLDING = STATEMENTS.register(
+    "buy_holding",
+    """
+    INSERT INTO holdings (portfolio, symbol, quantity, cost_basis_cents) VALUES (%s, %s, %s, %s)
+    ON CONFLICT (portfolio, symbol) DO UPDATE SET
+        quantity = holdings.quantity + EXCLUDED.quantity,
+        cost_basis_cents = holdings.cost_basis_cents + EXCLUDED.cost_basis_cents
+    RETURNING quantity, cost_basis_cents
+    """,
+)
+# Reduces the cost basis proportionally (average cost method)
+SELL_HOLDING = STATEMENTS.register(
+    "sell_holding",
+    """
+    UPDATE holdings SET
+        quantity = quantity - %s,
+        cost_basis_cents = cost_basis_cents - (cost_basis_cents * %s) / quantity
+    WHERE portfolio = %s AND symbol = %s AND quantity >= %s
+    RETURNING quantity, cost_basis_cents
+    """,
+)
+DELETE_SOLD_HOLDING = STATEMENTS.register(
+    "delete_sold_holding",
+    "DELETE FROM holdings WHERE portfolio = %s AND symbol = %s AND quantity = 0",
+)
+
+
+def replay_ledger(transactions: Iterable[tuple], holdings: dict = None) -> dict:
+    """
+    Replays the transactions ledger into positions, reducing the cost basis of sells by the
+    average cost method. An oversold ledger cannot hold less than nothing.
+
+    Args:
+        transactions (Iterable[tuple]): The (portfolio, symbol, action, quantity, price_cents)
+            rows of the ledger, in the order they were written.
+        holdings (dict, optional): The positions replayed so far, to continue from.
+
+    Returns:
+        dict: The (quantity, cost_basis_cents) of every position by (portfolio, symbol),
+        including the positions which were sold off.
+    """
+
+    holdings = {} if holdings is None else holdings
+    for portfolio, symbol, action, quantity, price_cents in transactions:
+        held, cost_basis = holdings.get((portfolio, symbol), (0, 0))
+        if action == "BUY":
+            held, cost_basis = held + quantity, cost_basis + price_cents
+        else:
+            if held > 0:
+                cost_basis -= cost_basis * min(quantity, held) // held
+            held = max(held - quantity, 0)
+        holdings[(portfolio, symbol)] = (held, cost_basis)
+    return holdings
+
+
+def held_positions(holdings: dict) -> List[tuple]:
+    """
+    Retrieves the holdings rows of the replayed positions which are still held.
+
+    Returns:
+        List[tuple]: The (portfolio, symbol, quantity, cost_basis_cents) rows.
+    """
+
+    return [
+        (portfolio, symbol, held, cost_basis)
+        for (portfolio, symbol), (held, cost_basis) in holdings.items()
+        if held > 0
+    ]
+
+
+def _position(row: dict) -> Optional[tuple[int, int]]:
+    """
+    Maps the row returned by a holding update to its (quantity, cost_basis_cents).
+    """
+
+    return None if row is None else (row["quantity"], row["cost_basis_cents"])
+
+
+def write_holdings(cursor: "Cursor") -> int:
+    """
+    Replaces the holdings table with the replayed transactions ledger, see `replay_ledger`.
+    The caller is responsible for committing or rolling back the transaction.
+
+    Args:
+        cursor (Cursor): The cursor of the transaction to rebuild the holdings in.
+
+    Returns:
+        int: The number of holdings written.
+    """
+
+    # Block new trades until the rebuild commits so none are lost
+    cursor.execute("LOCK TABLE transactions IN SHARE MODE")
+
+    # Stream the ledger with a server-side cursor to keep memory bounded
+    with cursor.connection.cursor(name="rebuild_holdings") as ledger:
+        ledger.itersize = 10000
+        ledger.execute(LEDGER_QUERY)
+        rows = held_positions(replay_ledger(ledger))
+
+    cursor.execute("DELETE FROM holdings")
+    STATEMENTS.execute(cursor, CREATE_HOLDINGS, columns(rows, 4))
+    return len(rows)
+
+
+class HoldingsMixin:
+    """
+    A collection of methods for handling holding database operations.
+
+    The holdings table is a materialized view of the transactions ledger. It is
+    kept up to date in the same database transaction as every ledger insert, so
+    it should never be written to directly outside of this mixin.
+    """
+
+    connectionPool: "BlockingConnectionPool"
+
+    def get_holding(self, uuid_portfolio: str, symbol: str) -> dict:
+        """
+        Retrieves the holding of a symbol in a portfolio.
+
+        Args:
+            uuid_portfolio (str): The UUID of the portfolio.
+            symbol (str): The symbol of the stock.
+
+        Returns:
+            dict: A dictionary representing the holding if found, None otherwise.
+        """
+
+        conn = None
+        try:
+            conn = self.connectionPool.getconn()
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(cursor, GET_HOLDING, (uuid_portfolio, symbol))
+                holding = cursor.fetchone()
+                conn.commit()
+                return holding
+        except Exception as e:
+            print("Failed to get holding:", e, flush=True)
+            return None
+        finally:
+            if conn:
+                self.connectionPool.putconn(conn)
+
+    def get_holdings(self, uuid_portfolio: str) -> List[dict]:
+        """
+        Retrieves all holdings of a portfolio.
+
+        Args:
+            uuid_portfolio (str): The UUID of the portfolio.
+
+        Returns:
+            List[dict]: A list of holdings if successful, None otherwise.
+        """
+
+        conn = None
+        try:
+            conn = self.connectionPool.getconn()
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(cursor, GET_HOLDINGS, (uuid_portfolio,))
+                holdings = cursor.fetchall()
+                conn.commit()
+                return holdings
+        except Exception as e:
+            print("Failed to get holdings:", e, flush=True)
+            return None
+        finally:
+            if conn:
+                self.connectionPool.putconn(conn)
+
+    def get_holdings_by_portfolios(self, uuids: list[str]) -> List[dict]:
+        """
+        Retrieves all holdings of several portfolios in a single query.
+
+        Args:
+            uuids (list[str]): The UUIDs of the portfolios.
+
+        Returns:
+            List[dict]: The holdings, ordered by portfolio and symbol, if successful, None otherwise.
+        """
+
+        conn = None
+        try:
+            conn = self.connectionPool.getconn()
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(cursor, GET_HOLDINGS_BY_PORTFOLIOS, (list(uuids),))
+                holdings = cursor.fetchall()
+                conn.commit()
+                return holdings
+        except Exception as e:
+            print("Failed to get holdings by portfolios:", e, flush=True)
+            return None
+        finally:
+            if conn:
+                self.connectionPool.putconn(conn)
+
+    def get_active_symbols(self) -> List[str]:
+        """
+        Retrieves the symbols held by portfolios which are not part of a finished tournament.
+
+        Returns:
+            List[str]: A list of symbols if successful, None otherwise.
+        """
+
+        conn = None
+        try:
+            conn = self.connectionPool.getconn()
+            with conn.cursor() as cursor:
+                STATEMENTS.execute(cursor, GET_ACTIVE_SYMBOLS)
+                symbols = [row[0] for row in cursor.fetchall()]
+                conn.commit()
+                return symbols
+        except Exception as e:
+            print("Failed to get active symbols:", e, flush=True)
+            return None
+        finally:
+            if conn:
+                self.connectionPool.putconn(conn)
+
+    def get_tournament_holdings(self, uuid_tournament: str) -> List[dict]:
+        """
+        Retrieves the balance and holdings of every portfolio in a tournament in a single query.
+        Portfolios without holdings are returned once with a None symbol.
+
+        Args:
+            uuid_tournament (str): The UUID of the tournament.
+
+        Returns:
+            List[dict]: One row per holding, with the portfolio, owner, name, balance_cents,
+            symbol, quantity and cost_basis_cents if successful, None otherwise.
+        """
+
+        conn = None
+        try:
+            conn = self.connectionPool.getconn()
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(cursor, GET_TOURNAMENT_HOLDINGS, (uuid_tournament,))
+                rows = cursor.fetchall()
+                conn.commit()
+                return rows
+        except Exception as e:
+            print("Failed to get tournament holdings:", e, flush=True)
+            return None
+        finally:
+            if conn:
+                self.connectionPool.putconn(conn)
+
+    def rebuild_holdings(self) -> int:
+        """
+        Rebuilds the holdings table from the transactions ledger.
+        The rebuild happens in a single database transaction, so readers never see a partial table.
+
+        Returns:
+            int: The number of holdings written if successful, None otherwise.
+        """
+
+        conn = None
+        try:
+            conn = self.connectionPool.getconn()
+            with conn.cursor() as cursor:
+                count = write_holdings(cursor)
+            conn.commit()
+            return count
+        except Exception as e:
+            print("Failed to rebuild holdings:", e, flush=True)
+            return None
+        finally:
+            if conn:
+                self.connectionPool.putconn(conn)
+
+    def _apply_holding(
+        self,
+        cursor: "Cursor",
+        uuid_portfolio: str,
+        symbol: str,
+        action: str,
+        quantity: int,
+        price_cents: int,
+    ) -> Optional[tuple[int, int]]:
+        """
+        Applies a ledger entry to the holdings table using the caller's cursor.
+        The caller is responsible for committing or rolling back the transaction.
+        The cursor must return rows as dictionaries.
+
+        Args:
+            cursor (Cursor): The cursor of the transaction to apply the holding change in.
+            uuid_portfolio (str): The UUID of the portfolio.
+            symbol (str): The symbol of the stock.
+            action (str): The action of the transaction, either 'BUY' or 'SELL'.
+            quantity (int): The quantity of stocks involved in the transaction.
+            price_cents (int): The total price of the transaction (in cents).
+
+        Returns:
+            tuple[int, int]: The updated (quantity, cost_basis_cents) of the holding, a quantity
+            of 0 if it was sold off, or None if a sell exceeds the held quantity.
+        """
+
+        if action == "BUY":
+            STATEMENTS.execute(
+                cursor, BUY_HOLDING, (uuid_portfolio, symbol, quantity, price_cents)
+            )
+            return _position(cursor.fetchone())
+
+        STATEMENTS.execute(
+            cursor,
+            SELL_HOLDING,
+            (quantity, quantity, uuid_portfolio, symbol, quantity),
+        )
+        position = _position(cursor.fetchone())
+        if position is not None and position[0] == 0:
+            STATEMENTS.execute(cursor, DELETE_SOLD_HOLDING, (uuid_portfolio, symbol))
+        return position
+
+
+class AsyncHoldingsMixin:
+    """
+    A collection of async methods for handling holding database operations.
+    """
+
+    connectionPool: "AsyncConnectionPool"
+
+    async def get_holding(self, uuid_portfolio: str, symbol: str) -> dict:
+        """
+        Retrieves the holding of a symbol in a portfolio.
+
+        See `HoldingsMixin.get_holding`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor, GET_HOLDING, (uuid_portfolio, symbol)
+                    )
+                    return await cursor.fetchone()
+        except Exception as e:
+            print("Failed to get holding:", e, flush=True)
+            return None
+
+    async def get_holdings(self, uuid_portfolio: str) -> List[dict]:
+        """
+        Retrieves all holdings of a portfolio.
+
+        See `HoldingsMixin.get_holdings`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor, GET_HOLDINGS, (uuid_portfolio,)
+                    )
+                    return await cursor.fetchall()
+        except Exception as e:
+            print("Failed to get holdings:", e, flush=True)
+            return None
+
+    async def get_holdings_by_portfolios(self, uuids: list[str]) -> List[dict]:
+        """
+        Retrieves all holdings of several portfolios in a single query.
+
+        See `HoldingsMixin.get_holdings_by_portfolios`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor, GET_HOLDINGS_BY_PORTFOLIOS, (list(uuids),)
+                    )
+                    return await cursor.fetchall()
+        except Exception as e:
+            print("Failed to get holdings by portfolios:", e, flush=True)
+            return None
+
+    async def get_active_symbols(self) -> List[str]:
+        """
+        Retrieves the symbols held by portfolios which are not part of a finished tournament.
+
+        See `HoldingsMixin.get_active_symbols`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await STATEMENTS.execute_async(cursor, GET_ACTIVE_SYMBOLS)
+                    return [row[0] for row in await cursor.fetchall()]
+        except Exception as e:
+            print("Failed to get active symbols:", e, flush=True)
+            return None
+
+    async def get_tournament_holdings(self, uuid_tournament: str) -> List[dict]:
+        """
+        Retrieves the balance and holdings of every portfolio in a tournament in a single query.
+
+        See `HoldingsMixin.get_tournament_holdings`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor, GET_TOURNAMENT_HOLDINGS, (uuid_tournament,)
+                    )
+                    return await cursor.fetchall()
+        except Exception as e:
+            print("Failed to get tournament holdings:", e, flush=True)
+            return None
+
+    async def rebuild_holdings(self) -> int:
+        """
+        Rebuilds the holdings table from the transactions ledger.
+
+        See `HoldingsMixin.rebuild_holdings`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                # Block new trades until the rebuild commits so none are lost
+                await conn.execute("LOCK TABLE transactions IN SHARE MODE")
+
+                # Stream the ledger with a server-side cursor to keep memory bounded
+                holdings = {}
+                async with conn.cursor(name="rebuild_holdings") as cursor:
+                    await cursor.execute(LEDGER_QUERY)
+                    while batch := await cursor.fetchmany(10000):
+                        replay_ledger(batch, holdings)
+                rows = held_positions(holdings)
+
+                async with conn.cursor() as cursor:
+                    await cursor.execute("DELETE FROM holdings")
+                    await STATEMENTS.execute_async(
+                        cursor, CREATE_HOLDINGS, columns(rows, 4)
+                    )
+                return len(rows)
+        except Exception as e:
+            print("Failed to rebuild holdings:", e, flush=True)
+            return None
+
+    async def _apply_holding(
+        self,
+        cursor: "AsyncCursor",
+        uuid_portfolio: str,
+        symbol: str,
+        action: str,
+        quantity: int,
+        price_cents: int,
+    ) -> Optional[tuple[int, int]]:
+        """
+        Applies a ledger entry to the holdings table using the caller's cursor.
+
+        See `HoldingsMixin._apply_holding`.
+        """
+
+        if action == "BUY":
+            await STATEMENTS.execute_async(
+                cursor, BUY_HOLDING, (uuid_portfolio, symbol, quantity, price_cents)
+            )
+            return _position(await cursor.fetchone())
+
+        await STATEMENTS.execute_async(
+            cursor,
+            SELL_HOLDING,
+            (quantity, quantity, uuid_portfolio, symbol, quantity),
+        )
+        position = _position(await cursor.fetchone())
+        if position is not None and position[0] == 0:
+            await STATEMENTS.execute_async(
+                cursor, DELETE_SOLD_HOLDING, (uuid_portfolio, symbol)
+            )
+        return position
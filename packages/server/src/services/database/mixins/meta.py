@@ -3,8 +3,17 @@
 
 from typing import TYPE_CHECKING, Any, Dict, List
 
+from services.database.statements import STATEMENTS
+
 if TYPE_CHECKING:
-    from psycopg2.pool import SimpleConnectionPool
+    from psycopg_pool import AsyncConnectionPool
+    from services.database.pool import BlockingConnectionPool
+
+# Statements of both mixins, see `StatementRegistry`
+SHOW_TABLES = STATEMENTS.register(
+    "show_tables",
+    "SELECT table_name FROM information_schema.tables WHERE table_schema = 'public'",
+)
 
 
 class MetaMixin:
@@ -12,7 +21,7 @@ class MetaMixin:
     A collection of methods for handling meta database operations.
     """
 
-    connectionPool: "SimpleConnectionPool"
+    connectionPool: "BlockingConnectionPool"
 
     def query(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
         """
@@ -61,9 +70,7 @@ class MetaMixin:
         try:
             conn = self.connectionPool.getconn()
             with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT table_name FROM information_schema.tables WHERE table_schema='public';"
-                )
+                STATEMENTS.execute(cursor, SHOW_TABLES)
                 result = cursor.fetchall()
                 conn.commit()
                 return [table[0] for table in result]
@@ -73,3 +80,95 @@ class MetaMixin:
         finally:
             if conn:
                 self.connectionPool.putconn(conn)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Retrieves usage statistics of the connection pool.
+
+        Returns:
+            Dict[str, Any]: The pool size, in use/idle/waiting connection counts, number of checkouts,
+            number of checkouts which timed out (exhausted), and the checkout wait time histogram.
+        """
+
+        return self.connectionPool.stats()
+
+    def statement_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieves usage statistics of the named statements, see `StatementRegistry.stats`.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: The number of calls, preparations, failed calls and the
+            cumulative execution time of each statement.
+        """
+
+        return STATEMENTS.stats()
+
+
+class AsyncMetaMixin:
+    """
+    A collection of async methods for handling meta database operations.
+    """
+
+    connectionPool: "AsyncConnectionPool"
+
+    async def query(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        """
+        !!! DO NOT USE THIS IN PRODUCTION CODE !!!\n
+        Executes a query on the database.
+
+        See `MetaMixin.query`.
+        """
+
+        result = []
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(query, params)
+                    if cursor.description:
+                        column_names = [desc.name for desc in cursor.description]
+                        for row in await cursor.fetchall():
+                            result.append(
+                                dict(zip(column_names, [str(value) for value in row]))
+                            )
+                    return result
+        except Exception as e:
+            print(f"Failed to execute query: ({query[:20]}) {e}", flush=True)
+
+    async def show_tables(self) -> List[str]:
+        """
+        !!! DO NOT USE THIS IN PRODUCTION CODE !!!\n
+        Retrieves a list of table names from the database.
+
+        See `MetaMixin.show_tables`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await STATEMENTS.execute_async(cursor, SHOW_TABLES)
+                    result = await cursor.fetchall()
+                    return [table[0] for table in result]
+        except Exception as e:
+            print("Failed to show tables:", e, flush=True)
+            return []
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Retrieves usage statistics of the connection pool.
+
+        Returns:
+            Dict[str, Any]: The statistics reported by `psycopg_pool`, such as pool_size,
+            pool_available, requests_waiting, requests_wait_ms and requests_errors.
+        """
+
+        return self.connectionPool.get_stats()
+
+    def statement_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieves usage statistics of the named statements.
+
+        See `MetaMixin.statement_stats`.
+        """
+
+        return STATEMENTS.stats()
@@ -3,8 +3,61 @@
 
 from typing import TYPE_CHECKING
 
+from psycopg.rows import dict_row
+from psycopg2.extras import RealDictCursor
+from services.database.statements import STATEMENTS
+
 if TYPE_CHECKING:
-    from psycopg2.pool import SimpleConnectionPool
+    from psycopg_pool import AsyncConnectionPool
+    from services.database.pool import BlockingConnectionPool
+
+# Statements of both mixins, see `StatementRegistry`
+CREATE_PORTFOLIO = STATEMENTS.register(
+    "create_portfolio",
+    "INSERT INTO portfolios (owner, name, tournament) VALUES (%s, %s, %s) RETURNING *",
+)
+GET_PORTFOLIO = STATEMENTS.register(
+    "get_portfolio", "SELECT * FROM portfolios WHERE uuid = %s LIMIT 1"
+)
+GET_PORTFOLIOS_BY_UUIDS = STATEMENTS.register(
+    "get_portfolios_by_uuids", "SELECT * FROM portfolios WHERE uuid = ANY(%s::uuid[])"
+)
+UPDATE_PORTFOLIO = STATEMENTS.register(
+    "update_portfolio", "UPDATE portfolios SET name = %s WHERE uuid = %s"
+)
+UPDATE_PORTFOLIO_BALANCE = STATEMENTS.register(
+    "update_portfolio_balance",
+    "UPDATE portfolios SET balance_cents = %s WHERE uuid = %s",
+)
+DELETE_PORTFOLIO = STATEMENTS.register(
+    "delete_portfolio", "DELETE FROM portfolios WHERE uuid = %s"
+)
+
+
+def _portfolios_query(
+    owner: str, tournament: str, name: str, offset: int, limit: int, after: tuple
+) -> tuple[str, list]:
+    """
+    Builds the query of a page of portfolios matching the given filters.
+    """
+
+    params = []
+    query = "SELECT * FROM portfolios WHERE TRUE"
+    if owner is not None:
+        query += " AND owner = %s"
+        params.append(str(owner))
+    if tournament is not None:
+        query += " AND tournament = %s"
+        params.append(str(tournament))
+    if name is not None:
+        query += " AND name = %s"
+        params.append(name)
+    if after is not None:
+        query += " AND (created_at, uuid) > (%s, %s)"
+        params.extend(after)
+    query += " ORDER BY created_at, uuid OFFSET %s LIMIT %s"
+    params.extend([offset if offset is not None else 0, limit or 10])
+    return query, params
 
 
 class PortfolioMixin:
@@ -12,7 +65,7 @@ class PortfolioMixin:
     A collection of methods for handling portfolio database operations.
     """
 
-    connectionPool: "SimpleConnectionPool"
+    connectionPool: "BlockingConnectionPool"
 
     def create_portfolio(
         self, uuid_user: str, name: str, tournament_uuid: str = None
@@ -32,19 +85,15 @@ class PortfolioMixin:
         conn = None
         try:
             conn = self.connectionPool.getconn()
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "INSERT INTO portfolios (owner, name, tournament) VALUES (%s, %s, %s) RETURNING *",
-                    (uuid_user, name, tournament_uuid),
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(
+                    cursor, CREATE_PORTFOLIO, (uuid_user, name, tournament_uuid)
                 )
                 portfolio = cursor.fetchone()
                 conn.commit()
-                if portfolio is not None:
-                    column_names = [desc[0] for desc in cursor.description]
-                    return dict(zip(column_names, portfolio))
-                else:
+                if portfolio is None:
                     print("Failed to retrieve the created portfolio.", flush=True)
-                    return None
+                return portfolio
         except Exception as e:
             print("Failed to create portfolio:", e, flush=True)
             return None
@@ -66,22 +115,16 @@ class PortfolioMixin:
         conn = None
         try:
             conn = self.connectionPool.getconn()
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT * FROM portfolios WHERE uuid = %s LIMIT 1",
-                    (uuid_portfolio,),
-                )
-                if cursor.description:
-                    portfolio = cursor.fetchone()
-                    if portfolio is not None:
-                        column_names = [desc[0] for desc in cursor.description]
-                        return dict(zip(column_names, portfolio))
-                    else:
-                        print(
-                            f"Portfolio with UUID '{uuid_portfolio}' not found.",
-                            flush=True,
-                        )
-                        return None
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(cursor, GET_PORTFOLIO, (uuid_portfolio,))
+                portfolio = cursor.fetchone()
+                conn.commit()
+                if portfolio is None:
+                    print(
+                        f"Portfolio with UUID '{uuid_portfolio}' not found.",
+                        flush=True,
+                    )
+                return portfolio
         except Exception as e:
             print("Failed to get portfolio by UUID:", e, flush=True)
             return None
@@ -89,6 +132,32 @@ class PortfolioMixin:
             if conn:
                 self.connectionPool.putconn(conn)
 
+    def get_portfolios_by_uuids(self, uuids: list[str]) -> list[dict]:
+        """
+        Retrieves several portfolios from the database by UUID in a single query.
+
+        Args:
+            uuids (list[str]): The UUIDs of the portfolios.
+
+        Returns:
+            list[dict]: The portfolios which were found, in no particular order, if successful, None otherwise.
+        """
+
+        conn = None
+        try:
+            conn = self.connectionPool.getconn()
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(cursor, GET_PORTFOLIOS_BY_UUIDS, (list(uuids),))
+                portfolios = cursor.fetchall()
+                conn.commit()
+                return portfolios
+        except Exception as e:
+            print("Failed to get portfolios by UUIDs:", e, flush=True)
+            return None
+        finally:
+            if conn:
+                self.connectionPool.putconn(conn)
+
     def get_portfolios(
         self,
         owner: str = None,
@@ -96,6 +165,7 @@ class PortfolioMixin:
         name: str = None,
         offset: int = None,
         limit: int = None,
+        after: tuple = None,
     ):
         """
         Retrieves a list of portfolios from the database.
@@ -106,44 +176,25 @@ class PortfolioMixin:
             name (str, optional): The name of the portfolios.
             offset (int, optional): The number of portfolios to skip.
             limit (int, optional): The maximum number of portfolios to retrieve.
+            after (tuple, optional): The (created_at, uuid) of the row to start after, for keyset pagination.
 
         Returns:
-            list: A list of dictionaries representing the portfolios if found, an empty list otherwise.
+            list: A list of dictionaries representing the portfolios found if successful, None otherwise.
         """
 
         conn = None
         try:
             conn = self.connectionPool.getconn()
-            with conn.cursor() as cursor:
-                params = []
-                query = "SELECT * FROM portfolios WHERE TRUE"
-                if owner is not None:
-                    query += " AND owner = %s"
-                    params.append(str(owner))
-                if tournament is not None:
-                    query += " AND tournament = %s"
-                    params.append(str(tournament))
-                if name is not None:
-                    query += " AND name = %s"
-                    params.append(name)
-                if offset is None:
-                    offset = 0
-                if limit is None:
-                    limit = 10
-                query += f" OFFSET {offset} LIMIT {limit}"
-                cursor.execute(query, params)
-                if cursor.description:
-                    portfolios = cursor.fetchall()
-                    column_names = [desc[0] for desc in cursor.description]
-                    return [
-                        dict(zip(column_names, portfolio)) for portfolio in portfolios
-                    ]
-                else:
-                    print("No portfolios found.", flush=True)
-                    return []
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(
+                    *_portfolios_query(owner, tournament, name, offset, limit, after)
+                )
+                portfolios = cursor.fetchall()
+                conn.commit()
+                return portfolios
         except Exception as e:
             print("Failed to get portfolios:", e, flush=True)
-            return []
+            return None
         finally:
             if conn:
                 self.connectionPool.putconn(conn)
@@ -164,10 +215,7 @@ class PortfolioMixin:
         try:
             conn = self.connectionPool.getconn()
             with conn.cursor() as cursor:
-                cursor.execute(
-                    "UPDATE portfolios SET name = %s WHERE uuid = %s",
-                    (name, uuid_portfolio),
-                )
+                STATEMENTS.execute(cursor, UPDATE_PORTFOLIO, (name, uuid_portfolio))
                 conn.commit()
                 return True
         except Exception as e:
@@ -179,7 +227,7 @@ class PortfolioMixin:
 
     def update_portfolio_balance(self, uuid_portfolio: str, balance_cents: int) -> bool:
         """
-        Updates the name of a portfolio in the database by UUID.
+        Updates the balance of a portfolio in the database by UUID.
 
         Args:
             uuid_portfolio (str): The UUID of the portfolio to update.
@@ -193,9 +241,8 @@ class PortfolioMixin:
         try:
             conn = self.connectionPool.getconn()
             with conn.cursor() as cursor:
-                cursor.execute(
-                    "UPDATE portfolios SET balance_cents = %s WHERE uuid = %s",
-                    (balance_cents, uuid_portfolio),
+                STATEMENTS.execute(
+                    cursor, UPDATE_PORTFOLIO_BALANCE, (balance_cents, uuid_portfolio)
                 )
                 conn.commit()
                 return True
@@ -221,9 +268,7 @@ class PortfolioMixin:
         try:
             conn = self.connectionPool.getconn()
             with conn.cursor() as cursor:
-                cursor.execute(
-                    "DELETE FROM portfolios WHERE uuid = %s", (uuid_portfolio,)
-                )
+                STATEMENTS.execute(cursor, DELETE_PORTFOLIO, (uuid_portfolio,))
                 conn.commit()
                 return True
         except Exception as e:
@@ -232,3 +277,157 @@ class PortfolioMixin:
         finally:
             if conn:
                 self.connectionPool.putconn(conn)
+
+
+class AsyncPortfolioMixin:
+    """
+    A collection of async methods for handling portfolio database operations.
+    """
+
+    connectionPool: "AsyncConnectionPool"
+
+    async def create_portfolio(
+        self, uuid_user: str, name: str, tournament_uuid: str = None
+    ) -> dict:
+        """
+        Creates a new portfolio in the database.
+
+        See `PortfolioMixin.create_portfolio`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor, CREATE_PORTFOLIO, (uuid_user, name, tournament_uuid)
+                    )
+                    portfolio = await cursor.fetchone()
+                    if portfolio is None:
+                        print("Failed to retrieve the created portfolio.", flush=True)
+                    return portfolio
+        except Exception as e:
+            print("Failed to create portfolio:", e, flush=True)
+            return None
+
+    async def get_portfolio(self, uuid_portfolio: str) -> dict:
+        """
+        Retrieves a portfolio from the database by UUID.
+
+        See `PortfolioMixin.get_portfolio`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor, GET_PORTFOLIO, (uuid_portfolio,)
+                    )
+                    portfolio = await cursor.fetchone()
+                    if portfolio is None:
+                        print(
+                            f"Portfolio with UUID '{uuid_portfolio}' not found.",
+                            flush=True,
+                        )
+                    return portfolio
+        except Exception as e:
+            print("Failed to get portfolio by UUID:", e, flush=True)
+            return None
+
+    async def get_portfolios_by_uuids(self, uuids: list[str]) -> list[dict]:
+        """
+        Retrieves several portfolios from the database by UUID in a single query.
+
+        See `PortfolioMixin.get_portfolios_by_uuids`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor, GET_PORTFOLIOS_BY_UUIDS, (list(uuids),)
+                    )
+                    return await cursor.fetchall()
+        except Exception as e:
+            print("Failed to get portfolios by UUIDs:", e, flush=True)
+            return None
+
+    async def get_portfolios(
+        self,
+        owner: str = None,
+        tournament: str = None,
+        name: str = None,
+        offset: int = None,
+        limit: int = None,
+        after: tuple = None,
+    ):
+        """
+        Retrieves a list of portfolios from the database.
+
+        See `PortfolioMixin.get_portfolios`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await cursor.execute(
+                        *_portfolios_query(
+                            owner, tournament, name, offset, limit, after
+                        )
+                    )
+                    return await cursor.fetchall()
+        except Exception as e:
+            print("Failed to get portfolios:", e, flush=True)
+            return None
+
+    async def update_portfolio(self, uuid_portfolio: str, name: str) -> bool:
+        """
+        Updates the name of a portfolio in the database by UUID.
+
+        See `PortfolioMixin.update_portfolio`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                await STATEMENTS.execute_async(
+                    conn, UPDATE_PORTFOLIO, (name, uuid_portfolio)
+                )
+                return True
+        except Exception as e:
+            print("Failed to update portfolio by UUID:", e, flush=True)
+            return False
+
+    async def update_portfolio_balance(
+        self, uuid_portfolio: str, balance_cents: int
+    ) -> bool:
+        """
+        Updates the balance of a portfolio in the database by UUID.
+
+        See `PortfolioMixin.update_portfolio_balance`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                await STATEMENTS.execute_async(
+                    conn, UPDATE_PORTFOLIO_BALANCE, (balance_cents, uuid_portfolio)
+                )
+                return True
+        except Exception as e:
+            print("Failed to update portfolio balance by UUID:", e, flush=True)
+            return False
+
+    async def delete_portfolio(self, uuid_portfolio: str) -> bool:
+        """
+        Deletes a portfolio from the database by UUID.
+
+        See `PortfolioMixin.delete_portfolio`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                await STATEMENTS.execute_async(
+                    conn, DELETE_PORTFOLIO, (uuid_portfolio,)
+                )
+                return True
+        except Exception as e:
+            print("Failed to delete portfolio by UUID:", e, flush=True)
+            return False
@@ -1,12 +1,145 @@
 # @author: adibarra (Alec Ibarra)
 # @description: Database class for handling session database operations
 
+import threading
+import time
 from typing import TYPE_CHECKING
 
+import psycopg
 import psycopg2
+from config import (
+    SESSION_CACHE_SIZE,
+    SESSION_CACHE_TTL,
+    SESSION_DENYLIST_REFRESH,
+    SESSION_NEGATIVE_TTL,
+)
+from helpers.cache import Cache
+from psycopg.rows import dict_row
+from psycopg2.extras import RealDictCursor
+from services.database.statements import STATEMENTS
 
 if TYPE_CHECKING:
-    from psycopg2.pool import SimpleConnectionPool
+    from psycopg_pool import AsyncConnectionPool
+    from services.database.pool import BlockingConnectionPool
+
+# Owners of recently used session tokens, or INVALID_TOKEN for tokens which do not exist.
+# Entries are invalidated when sessions change in this process only. Other processes keep
+# serving a logged out or replaced token until their entry expires, so SESSION_CACHE_TTL is
+# the revocation window across workers.
+SESSION_CACHE = Cache(SESSION_CACHE_SIZE, SESSION_CACHE_TTL)
+INVALID_TOKEN = ""
+
+# Latest cached token of each owner, so it can be invalidated when the session changes
+OWNER_TOKENS = Cache(SESSION_CACHE_SIZE, SESSION_CACHE_TTL)
+
+# Incremented on every invalidation, so a lookup which read the database before an
+# invalidation cannot cache the stale result after it
+session_generation = 0
+session_lock = threading.Lock()
+
+
+def cache_session(token: str, owner: str | None, generation: int) -> None:
+    """
+    Caches the owner of a session token, or that the token does not exist if owner is None.
+    Nothing is cached if sessions were invalidated since `generation` was read.
+    """
+
+    with session_lock:
+        if generation != session_generation:
+            return
+        if owner is None:
+            SESSION_CACHE.set(token, INVALID_TOKEN, SESSION_NEGATIVE_TTL)
+            return
+        SESSION_CACHE.set(token, owner)
+        OWNER_TOKENS.set(owner, token)
+
+
+# Statements of both mixins, see `StatementRegistry`
+CREATE_SESSION = STATEMENTS.register(
+    "create_session",
+    "INSERT INTO sessions (owner) VALUES (%s) ON CONFLICT (owner) DO UPDATE SET token = DEFAULT RETURNING *",
+)
+DELETE_SESSION = STATEMENTS.register(
+    "delete_session", "DELETE FROM sessions WHERE token = %s"
+)
+GET_SESSION = STATEMENTS.register(
+    "get_session", "SELECT owner FROM sessions WHERE token = %s"
+)
+REVOKE_TOKEN = STATEMENTS.register(
+    "revoke_token",
+    "INSERT INTO revoked_tokens (jti, expires_at) VALUES (%s, TO_TIMESTAMP(%s)) ON CONFLICT (jti) DO NOTHING",
+)
+PRUNE_REVOKED_TOKENS = STATEMENTS.register(
+    "prune_revoked_tokens", "DELETE FROM revoked_tokens WHERE expires_at <= NOW()"
+)
+GET_REVOKED_TOKENS = STATEMENTS.register(
+    "get_revoked_tokens",
+    "SELECT jti, EXTRACT(EPOCH FROM expires_at) FROM revoked_tokens WHERE expires_at > NOW()",
+)
+
+
+def invalidate_sessions(owner: str = None, token: str = None) -> None:
+    """
+    Removes the cached session of an owner and/or a token.
+    """
+
+    global session_generation
+    with session_lock:
+        session_generation += 1
+        if owner is not None:
+            previous = OWNER_TOKENS.get_stale(owner)
+            if previous is not None:
+                SESSION_CACHE.delete(previous)
+            OWNER_TOKENS.delete(owner)
+        if token is not None:
+            SESSION_CACHE.delete(token)
+
+
+# Expiry (seconds since the epoch) of revoked signed tokens which have not expired yet.
+# The snapshot is reloaded every SESSION_DENYLIST_REFRESH seconds, so revocations made by
+# other processes apply within that interval. Expired tokens are rejected by their signature
+# check alone, so they never need to be kept here.
+REVOKED_TOKENS: dict[str, float] = {}
+revoked_tokens_loaded_at = float("-inf")
+
+
+def denylist_stale() -> bool:
+    """
+    Checks if the revoked token snapshot is due to be reloaded, and if so claims the reload
+    so concurrent callers keep using the current snapshot in the meantime.
+    """
+
+    global revoked_tokens_loaded_at
+    now = time.monotonic()
+    if now - revoked_tokens_loaded_at < SESSION_DENYLIST_REFRESH:
+        return False
+    revoked_tokens_loaded_at = now
+    return True
+
+
+def load_denylist(rows: list) -> None:
+    """
+    Replaces the revoked token snapshot with (jti, expires_at) rows from the database.
+    The new snapshot is built first and swapped in with one assignment, so concurrent
+    checks never see a partially loaded denylist.
+    """
+
+    global REVOKED_TOKENS
+    REVOKED_TOKENS = {jti: float(expires_at) for jti, expires_at in rows}
+
+
+def is_denylisted(jti: str) -> bool:
+    """
+    Checks the revoked token snapshot for a token id.
+    """
+
+    expires_at = REVOKED_TOKENS.get(jti)
+    if expires_at is None:
+        return False
+    if expires_at <= time.time():
+        REVOKED_TOKENS.pop(jti, None)
+        return False
+    return True
 
 
 class SessionsMixin:
@@ -14,7 +147,7 @@ class SessionsMixin:
     A collection of methods for handling session database operations.
     """
 
-    connectionPool: "SimpleConnectionPool"
+    connectionPool: "BlockingConnectionPool"
 
     def create_session(self, owner: str) -> dict:
         """
@@ -30,21 +163,17 @@ class SessionsMixin:
         conn = None
         try:
             conn = self.connectionPool.getconn()
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "INSERT INTO sessions (owner) VALUES (%s) ON CONFLICT (owner) DO UPDATE SET token = DEFAULT RETURNING *",
-                    (owner,),
-                )
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(cursor, CREATE_SESSION, (owner,))
                 session_data = cursor.fetchone()
                 conn.commit()
-                if session_data is not None:
-                    column_names = [desc[0] for desc in cursor.description]
-                    return dict(zip(column_names, session_data))
-                else:
+                # The previous token of the owner is no longer valid
+                invalidate_sessions(owner=owner)
+                if session_data is None:
                     print(
                         "Failed to retrieve session data after insertion.", flush=True
                     )
-                    return None
+                return session_data
         except psycopg2.IntegrityError as e:
             # Check if it's a duplicate key error
             if "duplicate key value violates unique constraint" in str(e):
@@ -73,8 +202,9 @@ class SessionsMixin:
         try:
             conn = self.connectionPool.getconn()
             with conn.cursor() as cursor:
-                cursor.execute("DELETE FROM sessions WHERE token = %s", (token,))
+                STATEMENTS.execute(cursor, DELETE_SESSION, (token,))
                 conn.commit()
+                invalidate_sessions(token=token)
                 return True
         except Exception as e:
             print("Failed to delete session:", e, flush=True)
@@ -86,6 +216,8 @@ class SessionsMixin:
     def get_session(self, token: str) -> str:
         """
         Retrieves the uuid of the session owner.
+        Results are cached, see `SESSION_CACHE` for how long a revoked token may still be
+        accepted by other processes.
 
         Args:
             token (str): The token of the session.
@@ -94,20 +226,190 @@ class SessionsMixin:
             str: The uuid of the session owner if successful, None otherwise.
         """
 
+        cached = SESSION_CACHE.get(token)
+        if cached is not None:
+            return cached or None
+
+        generation = session_generation
         conn = None
         try:
             conn = self.connectionPool.getconn()
             with conn.cursor() as cursor:
-                cursor.execute("SELECT owner FROM sessions WHERE token = %s", (token,))
+                STATEMENTS.execute(cursor, GET_SESSION, (token,))
                 uuid_user = cursor.fetchone()
                 conn.commit()
-                if uuid_user is not None:
-                    return uuid_user[0]
-                else:
-                    return None
+                owner = str(uuid_user[0]) if uuid_user is not None else None
+                cache_session(token, owner, generation)
+                return owner
         except Exception as e:
             print("Failed to get session:", e, flush=True)
             return None
         finally:
             if conn:
                 self.connectionPool.putconn(conn)
+
+    def revoke_token(self, jti: str, expires_at: float) -> bool:
+        """
+        Adds a signed token to the denylist until it expires.
+        Expired entries are pruned at the same time.
+
+        Args:
+            jti (str): The id of the token.
+            expires_at (float): The expiry of the token in seconds since the epoch.
+
+        Returns:
+            bool: True if successful, False otherwise.
+        """
+
+        conn = None
+        try:
+            conn = self.connectionPool.getconn()
+            with conn.cursor() as cursor:
+                STATEMENTS.execute(cursor, REVOKE_TOKEN, (jti, expires_at))
+                STATEMENTS.execute(cursor, PRUNE_REVOKED_TOKENS)
+                conn.commit()
+                REVOKED_TOKENS[jti] = float(expires_at)
+                return True
+        except Exception as e:
+            print("Failed to revoke token:", e, flush=True)
+            return False
+        finally:
+            if conn:
+                self.connectionPool.putconn(conn)
+
+    def is_token_revoked(self, jti: str) -> bool:
+        """
+        Checks if a signed token is on the denylist.
+        Checks an in-process snapshot of the denylist, see `REVOKED_TOKENS`. If the snapshot
+        cannot be reloaded, the previous one is used until the next refresh.
+
+        Args:
+            jti (str): The id of the token.
+
+        Returns:
+            bool: True if the token has been revoked, False otherwise.
+        """
+
+        if denylist_stale():
+            conn = None
+            try:
+                conn = self.connectionPool.getconn()
+                with conn.cursor() as cursor:
+                    STATEMENTS.execute(cursor, GET_REVOKED_TOKENS)
+                    load_denylist(cursor.fetchall())
+                    conn.commit()
+            except Exception as e:
+                print("Failed to load revoked tokens:", e, flush=True)
+            finally:
+                if conn:
+                    self.connectionPool.putconn(conn)
+
+        return is_denylisted(jti)
+
+
+class AsyncSessionsMixin:
+    """
+    A collection of async methods for handling session database operations.
+    """
+
+    connectionPool: "AsyncConnectionPool"
+
+    async def create_session(self, owner: str) -> dict:
+        """
+        Creates a new session in the database.
+
+        See `SessionsMixin.create_session`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(cursor, CREATE_SESSION, (owner,))
+                    session_data = await cursor.fetchone()
+            # The previous token of the owner is no longer valid
+            invalidate_sessions(owner=owner)
+            if session_data is None:
+                print("Failed to retrieve session data after insertion.", flush=True)
+            return session_data
+        except psycopg.IntegrityError as e:
+            # Check if it's a duplicate key error
+            if "duplicate key value violates unique constraint" in str(e):
+                return None
+            else:
+                raise e
+        except Exception as e:
+            print("Failed to create session:", e, flush=True)
+            return None
+
+    async def delete_session(self, token: str) -> bool:
+        """
+        Deletes a session from the database.
+
+        See `SessionsMixin.delete_session`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                await STATEMENTS.execute_async(conn, DELETE_SESSION, (token,))
+            invalidate_sessions(token=token)
+            return True
+        except Exception as e:
+            print("Failed to delete session:", e, flush=True)
+            return False
+
+    async def get_session(self, token: str) -> str:
+        """
+        Retrieves the uuid of the session owner.
+
+        See `SessionsMixin.get_session`.
+        """
+
+        cached = SESSION_CACHE.get(token)
+        if cached is not None:
+            return cached or None
+
+        generation = session_generation
+        try:
+            async with self.connectionPool.connection() as conn:
+                cursor = await STATEMENTS.execute_async(conn, GET_SESSION, (token,))
+                uuid_user = await cursor.fetchone()
+                owner = str(uuid_user[0]) if uuid_user is not None else None
+                cache_session(token, owner, generation)
+                return owner
+        except Exception as e:
+            print("Failed to get session:", e, flush=True)
+            return None
+
+    async def revoke_token(self, jti: str, expires_at: float) -> bool:
+        """
+        Adds a signed token to the denylist until it expires.
+
+        See `SessionsMixin.revoke_token`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                await STATEMENTS.execute_async(conn, REVOKE_TOKEN, (jti, expires_at))
+                await STATEMENTS.execute_async(conn, PRUNE_REVOKED_TOKENS)
+            REVOKED_TOKENS[jti] = float(expires_at)
+            return True
+        except Exception as e:
+            print("Failed to revoke token:", e, flush=True)
+            return False
+
+    async def is_token_revoked(self, jti: str) -> bool:
+        """
+        Checks if a signed token is on the denylist.
+
+        See `SessionsMixin.is_token_revoked`.
+        """
+
+        if denylist_stale():
+            try:
+                async with self.connectionPool.connection() as conn:
+                    cursor = await STATEMENTS.execute_async(conn, GET_REVOKED_TOKENS)
+                    load_denylist(await cursor.fetchall())
+            except Exception as e:
+                print("Failed to load revoked tokens:", e, flush=True)
+
+        return is_denylisted(jti)
@@ -1,10 +1,178 @@
 # @author: adibarra (Alec Ibarra)
 # @description: Database class for handling tournament database operations
 
+from datetime import datetime
 from typing import TYPE_CHECKING, List
 
+from psycopg.rows import dict_row
+from psycopg2.extras import RealDictCursor
+from services.database.statements import STATEMENTS, columns
+
 if TYPE_CHECKING:
-    from psycopg2.pool import SimpleConnectionPool
+    from psycopg_pool import AsyncConnectionPool
+    from services.database.pool import BlockingConnectionPool
+
+# Statements of both mixins, see `StatementRegistry`
+CREATE_TOURNAMENT = STATEMENTS.register(
+    "create_tournament",
+    "INSERT INTO tournaments (owner, name, start_date, end_date) VALUES (%s, %s, %s, %s) RETURNING *",
+)
+DELETE_TOURNAMENT = STATEMENTS.register(
+    "delete_tournament", "DELETE FROM tournaments WHERE uuid = %s"
+)
+GET_TOURNAMENT = STATEMENTS.register(
+    "get_tournament", "SELECT * FROM tournaments WHERE uuid = %s LIMIT 1"
+)
+GET_TOURNAMENTS_BY_UUIDS = STATEMENTS.register(
+    "get_tournaments_by_uuids",
+    "SELECT * FROM tournaments WHERE uuid = ANY(%s::uuid[])",
+)
+GET_TOURNAMENT_SCHEDULE = STATEMENTS.register(
+    "get_tournament_schedule",
+    "SELECT uuid, status, start_date, end_date FROM tournaments WHERE status <> 'FINISHED'",
+)
+START_TOURNAMENTS = STATEMENTS.register(
+    "start_tournaments",
+    "UPDATE tournaments SET status = 'ONGOING' WHERE status = 'SCHEDULED' AND start_date <= %s AND end_date > %s RETURNING uuid",
+)
+GET_ENDED_TOURNAMENTS = STATEMENTS.register(
+    "get_ended_tournaments",
+    "SELECT uuid FROM tournaments WHERE status <> 'FINISHED' AND end_date <= %s",
+)
+FINISH_TOURNAMENTS = STATEMENTS.register(
+    "finish_tournaments",
+    "UPDATE tournaments SET status = 'FINISHED' WHERE uuid = ANY(%s::uuid[]) AND status <> 'FINISHED' RETURNING uuid",
+)
+CREATE_STANDINGS = STATEMENTS.register(
+    "create_standings",
+    """
+    INSERT INTO standings (tournament, rank, portfolio, owner, name, value_cents, prize_coins)
+    SELECT * FROM unnest(
+        %s::uuid[], %s::int[], %s::uuid[], %s::uuid[], %s::text[], %s::bigint[], %s::int[]
+    )
+    """,
+)
+PAY_PRIZES = STATEMENTS.register(
+    "pay_prizes",
+    "UPDATE users SET coins = coins + prizes.coins FROM unnest(%s::uuid[], %s::int[]) AS prizes(owner, coins) WHERE users.uuid = prizes.owner",
+)
+GET_TOURNAMENT_STANDINGS = STATEMENTS.register(
+    "get_tournament_standings",
+    "SELECT rank, portfolio, owner, name, value_cents, prize_coins FROM standings WHERE tournament = %s ORDER BY rank",
+)
+
+
+def _flatten_standings(standings: dict[str, List[dict]], finished: List[str]) -> tuple:
+    """
+    Flattens the standings of the finished tournaments into standings rows, and sums the prizes
+    won by each user.
+    """
+
+    rows = []
+    prizes = {}
+    for tournament in finished:
+        for entry in standings[tournament]:
+            rows.append(
+                (
+                    tournament,
+                    entry["rank"],
+                    entry["portfolio"],
+                    entry["owner"],
+                    entry["name"],
+                    entry["value_cents"],
+                    entry["prize_coins"],
+                )
+            )
+            if entry["prize_coins"]:
+                owner = str(entry["owner"])
+                prizes[owner] = prizes.get(owner, 0) + entry["prize_coins"]
+    return rows, prizes
+
+
+def _update_tournament_query(
+    uuid_tournament: str, name: str, start_date: str, end_date: str
+) -> tuple[str, list]:
+    """
+    Builds the update of the given columns of a tournament.
+    """
+
+    query = "UPDATE tournaments SET"
+    params = []
+    if name is not None:
+        query += " name = %s,"
+        params.append(name)
+    if start_date is not None:
+        query += " start_date = %s,"
+        params.append(start_date)
+    if end_date is not None:
+        query += " end_date = %s,"
+        params.append(end_date)
+
+    # Remove the trailing comma if any
+    query = query.rstrip(",")
+
+    # Add the WHERE clause for UUID
+    query += " WHERE uuid = %s"
+    params.append(uuid_tournament)
+    return query, params
+
+
+def _tournaments_query(
+    owner: str,
+    name: str,
+    status: str,
+    start_date: str,
+    start_date_before: str,
+    start_date_after: str,
+    end_date: str,
+    end_date_before: str,
+    end_date_after: str,
+    offset: int,
+    limit: int,
+    after: tuple,
+) -> tuple[str, list]:
+    """
+    Builds the query of a page of tournaments matching the given filters.
+    """
+
+    query = "SELECT * FROM tournaments WHERE TRUE"
+    params = []
+
+    if owner is not None:
+        query += " AND owner = %s"
+        params.append(owner)
+    if name is not None:
+        query += " AND name = %s"
+        params.append(name)
+    if status is not None:
+        query += " AND status = %s"
+        params.append(status)
+    if start_date is not None:
+        query += " AND start_date = %s"
+        params.append(start_date)
+    if start_date_before is not None:
+        query += " AND start_date < %s"
+        params.append(start_date_before)
+    if start_date_after is not None:
+        query += " AND start_date > %s"
+        params.append(start_date_after)
+    if end_date is not None:
+        query += " AND end_date = %s"
+        params.append(end_date)
+    if end_date_before is not None:
+        query += " AND end_date < %s"
+        params.append(end_date_before)
+    if end_date_after is not None:
+        query += " AND end_date > %s"
+        params.append(end_date_after)
+
+    if after is not None:
+        query += " AND (created_at, uuid) > (%s, %s)"
+        params.extend(after)
+
+    query += " ORDER BY created_at, uuid OFFSET %s LIMIT %s"
+    params.extend([offset, limit])
+    return query, params
 
 
 class TournamentsMixin:
@@ -12,7 +180,7 @@ class TournamentsMixin:
     A collection of methods for handling tournament database operations.
     """
 
-    connectionPool: "SimpleConnectionPool"
+    connectionPool: "BlockingConnectionPool"
 
     def create_tournament(
         self, owner: str, name: str, start_date: str, end_date: str
@@ -32,19 +200,15 @@ class TournamentsMixin:
         conn = None
         try:
             conn = self.connectionPool.getconn()
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "INSERT INTO tournaments (owner, name, start_date, end_date) VALUES (%s, %s, %s, %s) RETURNING *",
-                    (owner, name, start_date, end_date),
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(
+                    cursor, CREATE_TOURNAMENT, (owner, name, start_date, end_date)
                 )
                 tournament = cursor.fetchone()
                 conn.commit()
-                if tournament is not None:
-                    column_names = [desc[0] for desc in cursor.description]
-                    return dict(zip(column_names, tournament))
-                else:
+                if tournament is None:
                     print("Failed to retrieve the created tournament.", flush=True)
-                    return None
+                return tournament
         except Exception as e:
             print("Failed to create tournament:", e, flush=True)
             return None
@@ -76,26 +240,11 @@ class TournamentsMixin:
         try:
             conn = self.connectionPool.getconn()
             with conn.cursor() as cursor:
-                query = "UPDATE tournaments SET"
-                params = []
-                if name is not None:
-                    query += " name = %s,"
-                    params.append(name)
-                if start_date is not None:
-                    query += " start_date = %s,"
-                    params.append(start_date)
-                if end_date is not None:
-                    query += " end_date = %s,"
-                    params.append(end_date)
-
-                # Remove the trailing comma if any
-                query = query.rstrip(",")
-
-                # Add the WHERE clause for UUID
-                query += " WHERE uuid = %s"
-                params.append(uuid_tournament)
-
-                cursor.execute(query, params)
+                cursor.execute(
+                    *_update_tournament_query(
+                        uuid_tournament, name, start_date, end_date
+                    )
+                )
                 conn.commit()
                 return True
         except Exception as e:
@@ -120,9 +269,7 @@ class TournamentsMixin:
         try:
             conn = self.connectionPool.getconn()
             with conn.cursor() as cursor:
-                cursor.execute(
-                    "DELETE FROM tournaments WHERE uuid = %s", (uuid_tournament,)
-                )
+                STATEMENTS.execute(cursor, DELETE_TOURNAMENT, (uuid_tournament,))
                 conn.commit()
                 return True
         except Exception as e:
@@ -146,16 +293,11 @@ class TournamentsMixin:
         conn = None
         try:
             conn = self.connectionPool.getconn()
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT * FROM tournaments WHERE uuid = %s LIMIT 1",
-                    (uuid_tournament,),
-                )
-                if cursor.description:
-                    tournament = cursor.fetchone()
-                    if tournament is not None:
-                        column_names = [desc[0] for desc in cursor.description]
-                        return dict(zip(column_names, tournament))
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(cursor, GET_TOURNAMENT, (uuid_tournament,))
+                tournament = cursor.fetchone()
+                conn.commit()
+                return tournament
         except Exception as e:
             print("Failed to get tournament by UUID:", e, flush=True)
             return None
@@ -163,6 +305,32 @@ class TournamentsMixin:
             if conn:
                 self.connectionPool.putconn(conn)
 
+    def get_tournaments_by_uuids(self, uuids: list[str]) -> list[dict]:
+        """
+        Retrieves several tournaments from the database by UUID in a single query.
+
+        Args:
+            uuids (list[str]): The UUIDs of the tournaments.
+
+        Returns:
+            list[dict]: The tournaments which were found, in no particular order, if successful, None otherwise.
+        """
+
+        conn = None
+        try:
+            conn = self.connectionPool.getconn()
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(cursor, GET_TOURNAMENTS_BY_UUIDS, (list(uuids),))
+                tournaments = cursor.fetchall()
+                conn.commit()
+                return tournaments
+        except Exception as e:
+            print("Failed to get tournaments by UUIDs:", e, flush=True)
+            return None
+        finally:
+            if conn:
+                self.connectionPool.putconn(conn)
+
     def get_tournaments(
         self,
         owner: str = None,
@@ -176,6 +344,7 @@ class TournamentsMixin:
         end_date_after: str = None,
         offset: int = 0,
         limit: int = 10,
+        after: tuple = None,
     ) -> List[dict]:
         """
         Retrieve tournaments from the database based on the provided filters.
@@ -192,58 +361,429 @@ class TournamentsMixin:
             end_date_after (str, optional): The lower bound for the end date of the tournament. Defaults to None.
             offset (int, optional): The number of records to skip. Defaults to 0.
             limit (int, optional): The maximum number of records to retrieve. Defaults to 10.
+            after (tuple, optional): The (created_at, uuid) of the row to start after, for keyset pagination. Defaults to None.
 
         Returns:
-            List[dict]: A list of dictionaries representing the retrieved tournaments.
+            List[dict]: A list of dictionaries representing the retrieved tournaments if successful, None otherwise.
         """
 
         conn = None
         try:
             conn = self.connectionPool.getconn()
-            with conn.cursor() as cursor:
-                query = "SELECT * FROM tournaments WHERE TRUE"
-                params = []
-
-                if owner is not None:
-                    query += " AND owner = %s"
-                    params.append(owner)
-                if name is not None:
-                    query += " AND name = %s"
-                    params.append(name)
-                if status is not None:
-                    query += " AND status = %s"
-                    params.append(status)
-                if start_date is not None:
-                    query += " AND start_date = %s"
-                    params.append(start_date)
-                if start_date_before is not None:
-                    query += " AND start_date < %s"
-                    params.append(start_date_before)
-                if start_date_after is not None:
-                    query += " AND start_date > %s"
-                    params.append(start_date_after)
-                if end_date is not None:
-                    query += " AND end_date = %s"
-                    params.append(end_date)
-                if end_date_before is not None:
-                    query += " AND end_date < %s"
-                    params.append(end_date_before)
-                if end_date_after is not None:
-                    query += " AND end_date > %s"
-                    params.append(end_date_after)
-
-                query += " OFFSET %s LIMIT %s"
-                params.extend([offset, limit])
-
-                cursor.execute(query, params)
-                column_names = [desc[0] for desc in cursor.description]
-                tournaments = [
-                    dict(zip(column_names, row)) for row in cursor.fetchall()
-                ]
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(
+                    *_tournaments_query(
+                        owner,
+                        name,
+                        status,
+                        start_date,
+                        start_date_before,
+                        start_date_after,
+                        end_date,
+                        end_date_before,
+                        end_date_after,
+                        offset,
+                        limit,
+                        after,
+                    )
+                )
+                tournaments = cursor.fetchall()
+                conn.commit()
                 return tournaments
         except Exception as e:
             print("Failed to get tournaments:", e, flush=True)
-            return []
+            return None
+        finally:
+            if conn:
+                self.connectionPool.putconn(conn)
+
+    def get_tournament_schedule(self) -> List[dict]:
+        """
+        Retrieves the tournaments which have not finished yet, for scheduling their status changes.
+
+        Returns:
+            List[dict]: The uuid, status, start_date and end_date of each tournament if successful, None otherwise.
+        """
+
+        conn = None
+        try:
+            conn = self.connectionPool.getconn()
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(cursor, GET_TOURNAMENT_SCHEDULE)
+                tournaments = cursor.fetchall()
+                conn.commit()
+                return tournaments
+        except Exception as e:
+            print("Failed to get tournament schedule:", e, flush=True)
+            return None
+        finally:
+            if conn:
+                self.connectionPool.putconn(conn)
+
+    def start_tournaments(self, now: datetime) -> List[str]:
+        """
+        Marks every scheduled tournament which has started by now as ongoing, in a single update.
+
+        Args:
+            now (datetime): The current time.
+
+        Returns:
+            List[str]: The UUIDs of the tournaments which were started if successful, None otherwise.
+        """
+
+        conn = None
+        try:
+            conn = self.connectionPool.getconn()
+            with conn.cursor() as cursor:
+                STATEMENTS.execute(cursor, START_TOURNAMENTS, (now, now))
+                started = [str(row[0]) for row in cursor.fetchall()]
+                conn.commit()
+                return started
+        except Exception as e:
+            print("Failed to start tournaments:", e, flush=True)
+            return None
+        finally:
+            if conn:
+                self.connectionPool.putconn(conn)
+
+    def get_ended_tournaments(self, now: datetime) -> List[str]:
+        """
+        Retrieves the tournaments which have ended by now but are not marked as finished yet.
+
+        Args:
+            now (datetime): The current time.
+
+        Returns:
+            List[str]: The UUIDs of the tournaments if successful, None otherwise.
+        """
+
+        conn = None
+        try:
+            conn = self.connectionPool.getconn()
+            with conn.cursor() as cursor:
+                STATEMENTS.execute(cursor, GET_ENDED_TOURNAMENTS, (now,))
+                ended = [str(row[0]) for row in cursor.fetchall()]
+                conn.commit()
+                return ended
+        except Exception as e:
+            print("Failed to get ended tournaments:", e, flush=True)
+            return None
+        finally:
+            if conn:
+                self.connectionPool.putconn(conn)
+
+    def finish_tournaments(self, standings: dict[str, List[dict]]) -> List[str]:
+        """
+        Marks tournaments as finished, freezes their final standings and pays out their prizes.
+
+        Everything happens in a single database transaction, and only tournaments which were
+        not finished yet are finished, so the prizes of a tournament are paid exactly once even
+        if several servers finish it at the same time.
+
+        Args:
+            standings (dict[str, List[dict]]): The final standings of each tournament by UUID,
+                each entry with its rank, portfolio, owner, name, value_cents and prize_coins.
+
+        Returns:
+            List[str]: The UUIDs of the tournaments which were finished if successful, None otherwise.
+        """
+
+        conn = None
+        try:
+            conn = self.connectionPool.getconn()
+            with conn.cursor() as cursor:
+                STATEMENTS.execute(cursor, FINISH_TOURNAMENTS, (list(standings),))
+                finished = [str(row[0]) for row in cursor.fetchall()]
+                rows, prizes = _flatten_standings(standings, finished)
+
+                if rows:
+                    STATEMENTS.execute(cursor, CREATE_STANDINGS, columns(rows, 7))
+                if prizes:
+                    STATEMENTS.execute(
+                        cursor, PAY_PRIZES, (list(prizes), list(prizes.values()))
+                    )
+            conn.commit()
+            return finished
+        except Exception as e:
+            print("Failed to finish tournaments:", e, flush=True)
+            return None
+        finally:
+            if conn:
+                self.connectionPool.putconn(conn)
+
+    def get_tournament_standings(self, uuid_tournament: str) -> List[dict]:
+        """
+        Retrieves the final standings of a finished tournament.
+
+        Args:
+            uuid_tournament (str): The UUID of the tournament.
+
+        Returns:
+            List[dict]: The standings in rank order if successful, None otherwise.
+        """
+
+        conn = None
+        try:
+            conn = self.connectionPool.getconn()
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(cursor, GET_TOURNAMENT_STANDINGS, (uuid_tournament,))
+                standings = cursor.fetchall()
+                conn.commit()
+                return standings
+        except Exception as e:
+            print("Failed to get tournament standings:", e, flush=True)
+            return None
         finally:
             if conn:
                 self.connectionPool.putconn(conn)
+
+
+class AsyncTournamentsMixin:
+    """
+    A collection of async methods for handling tournament database operations.
+    """
+
+    connectionPool: "AsyncConnectionPool"
+
+    async def create_tournament(
+        self, owner: str, name: str, start_date: str, end_date: str
+    ) -> dict:
+        """
+        Creates a new tournament in the database.
+
+        See `TournamentsMixin.create_tournament`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor, CREATE_TOURNAMENT, (owner, name, start_date, end_date)
+                    )
+                    tournament = await cursor.fetchone()
+                    if tournament is None:
+                        print("Failed to retrieve the created tournament.", flush=True)
+                    return tournament
+        except Exception as e:
+            print("Failed to create tournament:", e, flush=True)
+            return None
+
+    async def update_tournament(
+        self,
+        uuid_tournament: str,
+        name: str = None,
+        start_date: str = None,
+        end_date: str = None,
+    ) -> bool:
+        """
+        Updates a tournament in the database by UUID.
+
+        See `TournamentsMixin.update_tournament`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                await conn.execute(
+                    *_update_tournament_query(
+                        uuid_tournament, name, start_date, end_date
+                    )
+                )
+                return True
+        except Exception as e:
+            print("Failed to update tournament by UUID:", e, flush=True)
+            return False
+
+    async def delete_tournament(self, uuid_tournament: str) -> bool:
+        """
+        Deletes a tournament from the database by UUID.
+
+        See `TournamentsMixin.delete_tournament`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                await STATEMENTS.execute_async(
+                    conn, DELETE_TOURNAMENT, (uuid_tournament,)
+                )
+                return True
+        except Exception as e:
+            print("Failed to delete tournament by UUID:", e, flush=True)
+            return False
+
+    async def get_tournament(self, uuid_tournament: str) -> dict:
+        """
+        Retrieves a tournament from the database by UUID.
+
+        See `TournamentsMixin.get_tournament`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor, GET_TOURNAMENT, (uuid_tournament,)
+                    )
+                    return await cursor.fetchone()
+        except Exception as e:
+            print("Failed to get tournament by UUID:", e, flush=True)
+            return None
+
+    async def get_tournaments_by_uuids(self, uuids: list[str]) -> list[dict]:
+        """
+        Retrieves several tournaments from the database by UUID in a single query.
+
+        See `TournamentsMixin.get_tournaments_by_uuids`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor, GET_TOURNAMENTS_BY_UUIDS, (list(uuids),)
+                    )
+                    return await cursor.fetchall()
+        except Exception as e:
+            print("Failed to get tournaments by UUIDs:", e, flush=True)
+            return None
+
+    async def get_tournaments(
+        self,
+        owner: str = None,
+        name: str = None,
+        status: str = None,
+        start_date: str = None,
+        start_date_before: str = None,
+        start_date_after: str = None,
+        end_date: str = None,
+        end_date_before: str = None,
+        end_date_after: str = None,
+        offset: int = 0,
+        limit: int = 10,
+        after: tuple = None,
+    ) -> List[dict]:
+        """
+        Retrieve tournaments from the database based on the provided filters.
+
+        See `TournamentsMixin.get_tournaments`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await cursor.execute(
+                        *_tournaments_query(
+                            owner,
+                            name,
+                            status,
+                            start_date,
+                            start_date_before,
+                            start_date_after,
+                            end_date,
+                            end_date_before,
+                            end_date_after,
+                            offset,
+                            limit,
+                            after,
+                        )
+                    )
+                    return await cursor.fetchall()
+        except Exception as e:
+            print("Failed to get tournaments:", e, flush=True)
+            return None
+
+    async def get_tournament_schedule(self) -> List[dict]:
+        """
+        Retrieves the tournaments which have not finished yet, for scheduling their status changes.
+
+        See `TournamentsMixin.get_tournament_schedule`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(cursor, GET_TOURNAMENT_SCHEDULE)
+                    return await cursor.fetchall()
+        except Exception as e:
+            print("Failed to get tournament schedule:", e, flush=True)
+            return None
+
+    async def start_tournaments(self, now: datetime) -> List[str]:
+        """
+        Marks every scheduled tournament which has started by now as ongoing, in a single update.
+
+        See `TournamentsMixin.start_tournaments`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                cursor = await STATEMENTS.execute_async(
+                    conn, START_TOURNAMENTS, (now, now)
+                )
+                return [str(row[0]) for row in await cursor.fetchall()]
+        except Exception as e:
+            print("Failed to start tournaments:", e, flush=True)
+            return None
+
+    async def get_ended_tournaments(self, now: datetime) -> List[str]:
+        """
+        Retrieves the tournaments which have ended by now but are not marked as finished yet.
+
+        See `TournamentsMixin.get_ended_tournaments`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                cursor = await STATEMENTS.execute_async(
+                    conn, GET_ENDED_TOURNAMENTS, (now,)
+                )
+                return [str(row[0]) for row in await cursor.fetchall()]
+        except Exception as e:
+            print("Failed to get ended tournaments:", e, flush=True)
+            return None
+
+    async def finish_tournaments(self, standings: dict[str, List[dict]]) -> List[str]:
+        """
+        Marks tournaments as finished, freezes their final standings and pays out their prizes.
+
+        See `TournamentsMixin.finish_tournaments`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor, FINISH_TOURNAMENTS, (list(standings),)
+                    )
+                    finished = [str(row[0]) for row in await cursor.fetchall()]
+                    rows, prizes = _flatten_standings(standings, finished)
+
+                    if rows:
+                        await STATEMENTS.execute_async(
+                            cursor, CREATE_STANDINGS, columns(rows, 7)
+                        )
+                    if prizes:
+                        await STATEMENTS.execute_async(
+                            cursor, PAY_PRIZES, (list(prizes), list(prizes.values()))
+                        )
+                return finished
+        except Exception as e:
+            print("Failed to finish tournaments:", e, flush=True)
+            return None
+
+    async def get_tournament_standings(self, uuid_tournament: str) -> List[dict]:
+        """
+        Retrieves the final standings of a finished tournament.
+
+        See `TournamentsMixin.get_tournament_standings`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor, GET_TOURNAMENT_STANDINGS, (uuid_tournament,)
+                    )
+                    return await cursor.fetchall()
+        except Exception as e:
+            print("Failed to get tournament standings:", e, flush=True)
+            return None
@@ -1,10 +1,100 @@
 # @author: adibarra (Alec Ibarra)
 # @description: Database class for handling transaction database operations
 
-from typing import TYPE_CHECKING
+from enum import Enum
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
+
+from psycopg.rows import dict_row
+from psycopg2.extras import RealDictCursor
+from services.database.statements import STATEMENTS
 
 if TYPE_CHECKING:
-    from psycopg2.pool import SimpleConnectionPool
+    from psycopg_pool import AsyncConnectionPool
+    from services.database.pool import BlockingConnectionPool
+
+# Statements of both mixins, see `StatementRegistry`
+LOCK_PORTFOLIO = STATEMENTS.register(
+    "lock_portfolio",
+    "SELECT owner, balance_cents FROM portfolios WHERE uuid = %s FOR UPDATE",
+)
+ADD_PORTFOLIO_BALANCE = STATEMENTS.register(
+    "add_portfolio_balance",
+    "UPDATE portfolios SET balance_cents = balance_cents + %s WHERE uuid = %s RETURNING *",
+)
+CREATE_TRANSACTION = STATEMENTS.register(
+    "create_transaction",
+    "INSERT INTO transactions (portfolio, symbol, action, quantity, price_cents) VALUES (%s, %s, %s, %s, %s) RETURNING *",
+)
+GET_TRANSACTIONS = STATEMENTS.register(
+    "get_transactions",
+    "SELECT * FROM transactions WHERE portfolio = %s ORDER BY created_at, uuid OFFSET %s LIMIT %s",
+)
+GET_TRANSACTIONS_AFTER = STATEMENTS.register(
+    "get_transactions_after",
+    "SELECT * FROM transactions WHERE portfolio = %s AND (created_at, uuid) > (%s, %s) ORDER BY created_at, uuid OFFSET %s LIMIT %s",
+)
+GET_TRANSACTION = STATEMENTS.register(
+    "get_transaction", "SELECT * FROM transactions WHERE uuid = %s LIMIT 1"
+)
+GET_TRANSACTIONS_BY_UUIDS = STATEMENTS.register(
+    "get_transactions_by_uuids",
+    "SELECT * FROM transactions WHERE uuid = ANY(%s::uuid[])",
+)
+
+TRADE_ERRORS = Enum(
+    "TRADE_ERRORS",
+    [
+        "PORTFOLIO_NOT_FOUND",
+        "PORTFOLIO_FORBIDDEN",
+        "INSUFFICIENT_FUNDS",
+        "INSUFFICIENT_HOLDINGS",
+    ],
+)
+
+
+def _balance_change(portfolio: dict, owner: str, action: str, price_cents: int) -> int:
+    """
+    Checks a trade against the locked portfolio and computes the change of its balance.
+
+    Raises:
+        ValueError: With one of TRADE_ERRORS if the trade is rejected.
+    """
+
+    if portfolio is None:
+        raise ValueError(TRADE_ERRORS.PORTFOLIO_NOT_FOUND)
+    if str(portfolio["owner"]) != str(owner):
+        raise ValueError(TRADE_ERRORS.PORTFOLIO_FORBIDDEN)
+
+    if action == "BUY":
+        if portfolio["balance_cents"] < price_cents:
+            raise ValueError(TRADE_ERRORS.INSUFFICIENT_FUNDS)
+        return -price_cents
+    return price_cents
+
+
+def _holding(symbol: str, position: tuple[int, int]) -> dict:
+    """
+    Maps the updated position of a traded symbol to the holding returned with the trade.
+    """
+
+    quantity, cost_basis_cents = position
+    return {
+        "symbol": symbol,
+        "quantity": quantity,
+        "cost_basis_cents": cost_basis_cents,
+    }
+
+
+def _transactions_statement(
+    uuid_portfolio: str, offset: int, limit: int, after: tuple
+) -> tuple[str, tuple]:
+    """
+    Picks the statement of a page of transactions, by offset or after a row.
+    """
+
+    if after is None:
+        return GET_TRANSACTIONS, (uuid_portfolio, offset, limit)
+    return GET_TRANSACTIONS_AFTER, (uuid_portfolio, *after, offset, limit)
 
 
 class TransactionsMixin:
@@ -12,51 +102,94 @@ class TransactionsMixin:
     A collection of methods for handling transaction database operations.
     """
 
-    connectionPool: "SimpleConnectionPool"
+    connectionPool: "BlockingConnectionPool"
+    _apply_holding: "Callable[..., Optional[tuple[int, int]]]"
+
+    TRADE_ERRORS = TRADE_ERRORS
 
-    def create_transaction(
+    def execute_trade(
         self,
+        owner: str,
         uuid_portfolio: str,
         symbol: str,
         action: str,
         quantity: int,
-        price_cents: int,
+        unit_price_cents: int,
     ) -> dict:
         """
-        Creates a new transaction in the database.
+        Executes a trade atomically on a single connection.
+
+        The portfolio row is locked for the duration of the trade, so concurrent trades
+        on the same portfolio are serialized. The funds or holdings check, the balance
+        update, the holdings update and the ledger insert all commit together or not at all.
 
         Args:
+            owner (str): The UUID of the user executing the trade.
             uuid_portfolio (str): The UUID of the portfolio.
-            symbol (str): The symbol of the stock involved in the transaction.
-            action (str): The action of the transaction, either 'buy' or 'sell'.
-            quantity (int): The quantity of stocks involved in the transaction.
-            price_cents (int): The price of the stock at the time of the transaction (in cents).
+            symbol (str): The symbol of the stock being traded.
+            action (str): The action of the trade, either 'BUY' or 'SELL'.
+            quantity (int): The quantity of stocks being traded.
+            unit_price_cents (int): The price of a single stock (in cents).
 
         Returns:
-            dict: The created transaction if successful, None otherwise.
+            dict: A dictionary with the updated 'portfolio', the created 'transaction' and the updated
+            'holding' of the symbol (its symbol, quantity and cost_basis_cents, with a quantity of 0
+            if it was sold off) if successful, None otherwise.
+
+        Raises:
+            ValueError: With one of TRADE_ERRORS if the trade is rejected.
         """
 
         conn = None
         try:
             conn = self.connectionPool.getconn()
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "INSERT INTO transactions (portfolio, symbol, action, quantity, price_cents) VALUES (%s, %s, %s, %s, %s) RETURNING *",
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(cursor, LOCK_PORTFOLIO, (uuid_portfolio,))
+                price_cents = unit_price_cents * quantity
+                balance_change = _balance_change(
+                    cursor.fetchone(), owner, action, price_cents
+                )
+
+                position = self._apply_holding(
+                    cursor, uuid_portfolio, symbol, action, quantity, price_cents
+                )
+                if position is None:
+                    raise ValueError(self.TRADE_ERRORS.INSUFFICIENT_HOLDINGS)
+
+                STATEMENTS.execute(
+                    cursor, ADD_PORTFOLIO_BALANCE, (balance_change, uuid_portfolio)
+                )
+                updated_portfolio = cursor.fetchone()
+
+                STATEMENTS.execute(
+                    cursor,
+                    CREATE_TRANSACTION,
                     (uuid_portfolio, symbol, action, quantity, price_cents),
                 )
-                column_names = [desc[0] for desc in cursor.description]
-                transaction = dict(zip(column_names, cursor.fetchone()))
+                transaction = cursor.fetchone()
+
                 conn.commit()
-                return transaction
+                return {
+                    "portfolio": updated_portfolio,
+                    "transaction": transaction,
+                    "holding": _holding(symbol, position),
+                }
+        except ValueError:
+            conn.rollback()
+            raise
         except Exception as e:
-            print("Failed to create transaction:", e, flush=True)
+            print("Failed to execute trade:", e, flush=True)
             return None
         finally:
             if conn:
                 self.connectionPool.putconn(conn)
 
     def get_transactions(
-        self, uuid_portfolio: str, offset: int = 0, limit: int = 10
+        self,
+        uuid_portfolio: str,
+        offset: int = 0,
+        limit: int = 10,
+        after: tuple = None,
     ) -> list[dict]:
         """
         Retrieves a list of transactions for a given portfolio.
@@ -65,26 +198,25 @@ class TransactionsMixin:
             uuid_portfolio (str): The UUID of the portfolio.
             offset (int): The offset for paginating the results.
             limit (int): The maximum number of transactions to retrieve.
+            after (tuple, optional): The (created_at, uuid) of the row to start after, for keyset pagination.
 
         Returns:
-            list[dict]: A list of transactions if successful, an empty list otherwise.
+            list[dict]: A list of transactions if successful, None otherwise.
         """
         conn = None
         try:
             conn = self.connectionPool.getconn()
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT * FROM transactions WHERE portfolio = %s OFFSET %s LIMIT %s",
-                    (uuid_portfolio, offset, limit),
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(
+                    cursor,
+                    *_transactions_statement(uuid_portfolio, offset, limit, after),
                 )
-                column_names = [desc[0] for desc in cursor.description]
-                transactions = [
-                    dict(zip(column_names, row)) for row in cursor.fetchall()
-                ]
+                transactions = cursor.fetchall()
+                conn.commit()
                 return transactions
         except Exception as e:
             print("Failed to get transactions:", e, flush=True)
-            return []
+            return None
         finally:
             if conn:
                 self.connectionPool.putconn(conn)
@@ -103,13 +235,10 @@ class TransactionsMixin:
         conn = None
         try:
             conn = self.connectionPool.getconn()
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT * FROM transactions WHERE uuid = %s LIMIT 1",
-                    (uuid_transaction,),
-                )
-                column_names = [desc[0] for desc in cursor.description]
-                transaction = dict(zip(column_names, cursor.fetchone()))
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(cursor, GET_TRANSACTION, (uuid_transaction,))
+                transaction = cursor.fetchone()
+                conn.commit()
                 return transaction
         except Exception as e:
             print("Failed to get transaction by UUID:", e, flush=True)
@@ -117,3 +246,156 @@ class TransactionsMixin:
         finally:
             if conn:
                 self.connectionPool.putconn(conn)
+
+    def get_transactions_by_uuids(self, uuids: list[str]) -> list[dict]:
+        """
+        Retrieves several transactions from the database by UUID in a single query.
+
+        Args:
+            uuids (list[str]): The UUIDs of the transactions.
+
+        Returns:
+            list[dict]: The transactions which were found, in no particular order, if successful, None otherwise.
+        """
+
+        conn = None
+        try:
+            conn = self.connectionPool.getconn()
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(cursor, GET_TRANSACTIONS_BY_UUIDS, (list(uuids),))
+                transactions = cursor.fetchall()
+                conn.commit()
+                return transactions
+        except Exception as e:
+            print("Failed to get transactions by UUIDs:", e, flush=True)
+            return None
+        finally:
+            if conn:
+                self.connectionPool.putconn(conn)
+
+
+class AsyncTransactionsMixin:
+    """
+    A collection of async methods for handling transaction database operations.
+    """
+
+    connectionPool: "AsyncConnectionPool"
+    _apply_holding: "Callable[..., Awaitable[Optional[tuple[int, int]]]]"
+
+    TRADE_ERRORS = TRADE_ERRORS
+
+    async def execute_trade(
+        self,
+        owner: str,
+        uuid_portfolio: str,
+        symbol: str,
+        action: str,
+        quantity: int,
+        unit_price_cents: int,
+    ) -> dict:
+        """
+        Executes a trade atomically on a single connection.
+
+        See `TransactionsMixin.execute_trade`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor, LOCK_PORTFOLIO, (uuid_portfolio,)
+                    )
+                    price_cents = unit_price_cents * quantity
+                    balance_change = _balance_change(
+                        await cursor.fetchone(), owner, action, price_cents
+                    )
+
+                    position = await self._apply_holding(
+                        cursor, uuid_portfolio, symbol, action, quantity, price_cents
+                    )
+                    if position is None:
+                        raise ValueError(self.TRADE_ERRORS.INSUFFICIENT_HOLDINGS)
+
+                    await STATEMENTS.execute_async(
+                        cursor, ADD_PORTFOLIO_BALANCE, (balance_change, uuid_portfolio)
+                    )
+                    updated_portfolio = await cursor.fetchone()
+
+                    await STATEMENTS.execute_async(
+                        cursor,
+                        CREATE_TRANSACTION,
+                        (uuid_portfolio, symbol, action, quantity, price_cents),
+                    )
+                    transaction = await cursor.fetchone()
+
+                    return {
+                        "portfolio": updated_portfolio,
+                        "transaction": transaction,
+                        "holding": _holding(symbol, position),
+                    }
+        except ValueError:
+            raise
+        except Exception as e:
+            print("Failed to execute trade:", e, flush=True)
+            return None
+
+    async def get_transactions(
+        self,
+        uuid_portfolio: str,
+        offset: int = 0,
+        limit: int = 10,
+        after: tuple = None,
+    ) -> list[dict]:
+        """
+        Retrieves a list of transactions for a given portfolio.
+
+        See `TransactionsMixin.get_transactions`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor,
+                        *_transactions_statement(uuid_portfolio, offset, limit, after),
+                    )
+                    return await cursor.fetchall()
+        except Exception as e:
+            print("Failed to get transactions:", e, flush=True)
+            return None
+
+    async def get_transaction_by_uuid(self, uuid_transaction: str) -> dict:
+        """
+        Retrieves a transaction from the database by UUID.
+
+        See `TransactionsMixin.get_transaction_by_uuid`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor, GET_TRANSACTION, (uuid_transaction,)
+                    )
+                    return await cursor.fetchone()
+        except Exception as e:
+            print("Failed to get transaction by UUID:", e, flush=True)
+            return None
+
+    async def get_transactions_by_uuids(self, uuids: list[str]) -> list[dict]:
+        """
+        Retrieves several transactions from the database by UUID in a single query.
+
+        See `TransactionsMixin.get_transactions_by_uuids`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor, GET_TRANSACTIONS_BY_UUIDS, (list(uuids),)
+                    )
+                    return await cursor.fetchall()
+        except Exception as e:
+            print("Failed to get transactions by UUIDs:", e, flush=True)
+            return None
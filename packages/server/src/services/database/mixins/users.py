@@ -3,10 +3,67 @@
 
 from typing import TYPE_CHECKING
 
+import psycopg
 import psycopg2
+from psycopg.rows import dict_row
+from psycopg2.extras import RealDictCursor
+from services.database.mixins.sessions import invalidate_sessions
+from services.database.statements import STATEMENTS
 
 if TYPE_CHECKING:
-    from psycopg2.pool import SimpleConnectionPool
+    from psycopg_pool import AsyncConnectionPool
+    from services.database.pool import BlockingConnectionPool
+
+# Statements of both mixins, see `StatementRegistry`
+CREATE_USER = STATEMENTS.register(
+    "create_user",
+    "INSERT INTO users (username, email, password_hash) VALUES (%s, %s, %s) RETURNING *",
+)
+GET_USER = STATEMENTS.register(
+    "get_user", "SELECT * FROM users WHERE uuid = %s LIMIT 1"
+)
+GET_USERS_BY_UUIDS = STATEMENTS.register(
+    "get_users_by_uuids", "SELECT * FROM users WHERE uuid = ANY(%s::uuid[])"
+)
+GET_USER_BY_USERNAME = STATEMENTS.register(
+    "get_user_by_username", "SELECT * FROM users WHERE username = %s LIMIT 1"
+)
+DELETE_USER = STATEMENTS.register("delete_user", "DELETE FROM users WHERE uuid = %s")
+
+
+def _user(row: dict) -> dict:
+    """
+    Maps a users row to the user returned by both mixins, with every value as a string.
+    """
+
+    return None if row is None else {key: str(value) for key, value in row.items()}
+
+
+def _update_user_query(
+    uuid_user: str, email: str, username: str, password_hash: str
+) -> tuple[str, list]:
+    """
+    Builds the update of the given columns of a user.
+    """
+
+    set_clause = ""
+    params = []
+
+    if email is not None:
+        set_clause += " email = %s,"
+        params.append(email)
+    if username is not None:
+        set_clause += " username = %s,"
+        params.append(username)
+    if password_hash is not None:
+        set_clause += " password_hash = %s,"
+        params.append(password_hash)
+
+    # Remove the trailing comma if any
+    set_clause = set_clause.rstrip(",")
+
+    params.append(uuid_user)
+    return f"UPDATE users SET {set_clause} WHERE uuid = %s", params
 
 
 class UsersMixin:
@@ -14,7 +71,7 @@ class UsersMixin:
     A collection of methods for handling user database operations.
     """
 
-    connectionPool: "SimpleConnectionPool"
+    connectionPool: "BlockingConnectionPool"
 
     def create_user(self, username: str, email: str, password_hash: str) -> dict:
         """
@@ -32,19 +89,15 @@ class UsersMixin:
         conn = None
         try:
             conn = self.connectionPool.getconn()
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "INSERT INTO users (username, email, password_hash) VALUES (%s, %s, %s) RETURNING *",
-                    (username, email, password_hash),
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(
+                    cursor, CREATE_USER, (username, email, password_hash)
                 )
                 user_data = cursor.fetchone()
                 conn.commit()
-                if user_data is not None:
-                    column_names = [desc[0] for desc in cursor.description]
-                    return dict(zip(column_names, user_data))
-                else:
+                if user_data is None:
                     print("Failed to retrieve user data after insertion.", flush=True)
-                    return None
+                return user_data
         except psycopg2.IntegrityError as e:
             # Check if it's a duplicate key error
             if "duplicate key value violates unique constraint" in str(e):
@@ -60,7 +113,7 @@ class UsersMixin:
 
     def get_user(self, uuid_user: str) -> dict:
         """
-        Retrieves a user from the database by email or UUID.
+        Retrieves a user from the database by UUID.
 
         Args:
             uuid_user (str): The UUID of the user.
@@ -72,18 +125,13 @@ class UsersMixin:
         conn = None
         try:
             conn = self.connectionPool.getconn()
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT * FROM users WHERE uuid = %s LIMIT 1", (uuid_user,)
-                )
-                if cursor.description:
-                    user = cursor.fetchone()
-                    if user is not None:
-                        column_names = [desc[0] for desc in cursor.description]
-                        return dict(zip(column_names, [str(value) for value in user]))
-                    else:
-                        print(f"User with uuid '{uuid_user}' not found.", flush=True)
-                        return None
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(cursor, GET_USER, (uuid_user,))
+                user = _user(cursor.fetchone())
+                conn.commit()
+                if user is None:
+                    print(f"User with uuid '{uuid_user}' not found.", flush=True)
+                return user
         except Exception as e:
             print("Failed to get user by uuid:", e, flush=True)
             return None
@@ -91,6 +139,32 @@ class UsersMixin:
             if conn:
                 self.connectionPool.putconn(conn)
 
+    def get_users_by_uuids(self, uuids: list[str]) -> list[dict]:
+        """
+        Retrieves several users from the database by UUID in a single query.
+
+        Args:
+            uuids (list[str]): The UUIDs of the users.
+
+        Returns:
+            list[dict]: The users which were found, in no particular order, if successful, None otherwise.
+        """
+
+        conn = None
+        try:
+            conn = self.connectionPool.getconn()
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(cursor, GET_USERS_BY_UUIDS, (list(uuids),))
+                users = [_user(row) for row in cursor.fetchall()]
+                conn.commit()
+                return users
+        except Exception as e:
+            print("Failed to get users by UUIDs:", e, flush=True)
+            return None
+        finally:
+            if conn:
+                self.connectionPool.putconn(conn)
+
     def get_user_by_username(self, username: str) -> dict:
         """
         Retrieves a user from the database by username.
@@ -105,18 +179,13 @@ class UsersMixin:
         conn = None
         try:
             conn = self.connectionPool.getconn()
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    "SELECT * FROM users WHERE username = %s LIMIT 1", (username,)
-                )
-                if cursor.description:
-                    user = cursor.fetchone()
-                    if user is not None:
-                        column_names = [desc[0] for desc in cursor.description]
-                        return dict(zip(column_names, [str(value) for value in user]))
-                    else:
-                        print(f"User with username '{username}' not found.", flush=True)
-                        return None
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                STATEMENTS.execute(cursor, GET_USER_BY_USERNAME, (username,))
+                user = _user(cursor.fetchone())
+                conn.commit()
+                if user is None:
+                    print(f"User with username '{username}' not found.", flush=True)
+                return user
         except Exception as e:
             print("Failed to get user by username:", e, flush=True)
             return None
@@ -148,26 +217,9 @@ class UsersMixin:
         try:
             conn = self.connectionPool.getconn()
             with conn.cursor() as cursor:
-                set_clause = ""
-                params = []
-
-                if email is not None:
-                    set_clause += " email = %s,"
-                    params.append(email)
-                if username is not None:
-                    set_clause += " username = %s,"
-                    params.append(username)
-                if password_hash is not None:
-                    set_clause += " password_hash = %s,"
-                    params.append(password_hash)
-
-                # Remove the trailing comma if any
-                set_clause = set_clause.rstrip(",")
-
-                query = f"UPDATE users SET {set_clause} WHERE uuid = %s"
-                params.append(uuid_user)
-
-                cursor.execute(query, params)
+                cursor.execute(
+                    *_update_user_query(uuid_user, email, username, password_hash)
+                )
                 conn.commit()
                 return True
         except Exception as e:
@@ -192,8 +244,10 @@ class UsersMixin:
         try:
             conn = self.connectionPool.getconn()
             with conn.cursor() as cursor:
-                cursor.execute("DELETE FROM users WHERE uuid = %s", (uuid_user,))
+                STATEMENTS.execute(cursor, DELETE_USER, (uuid_user,))
                 conn.commit()
+                # The sessions of the user are deleted with it
+                invalidate_sessions(owner=uuid_user)
                 return True
         except Exception as e:
             print("Failed to delete user:", e, flush=True)
@@ -201,3 +255,138 @@ class UsersMixin:
         finally:
             if conn:
                 self.connectionPool.putconn(conn)
+
+
+class AsyncUsersMixin:
+    """
+    A collection of async methods for handling user database operations.
+    """
+
+    connectionPool: "AsyncConnectionPool"
+
+    async def create_user(self, username: str, email: str, password_hash: str) -> dict:
+        """
+        Creates a new user in the database.
+
+        See `UsersMixin.create_user`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor, CREATE_USER, (username, email, password_hash)
+                    )
+                    user_data = await cursor.fetchone()
+                    if user_data is None:
+                        print(
+                            "Failed to retrieve user data after insertion.", flush=True
+                        )
+                    return user_data
+        except psycopg.IntegrityError as e:
+            # Check if it's a duplicate key error
+            if "duplicate key value violates unique constraint" in str(e):
+                return None
+            else:
+                raise e
+        except Exception as e:
+            print("Failed to create user:", e, flush=True)
+            return None
+
+    async def get_user(self, uuid_user: str) -> dict:
+        """
+        Retrieves a user from the database by UUID.
+
+        See `UsersMixin.get_user`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(cursor, GET_USER, (uuid_user,))
+                    user = _user(await cursor.fetchone())
+                    if user is None:
+                        print(f"User with uuid '{uuid_user}' not found.", flush=True)
+                    return user
+        except Exception as e:
+            print("Failed to get user by uuid:", e, flush=True)
+            return None
+
+    async def get_users_by_uuids(self, uuids: list[str]) -> list[dict]:
+        """
+        Retrieves several users from the database by UUID in a single query.
+
+        See `UsersMixin.get_users_by_uuids`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor, GET_USERS_BY_UUIDS, (list(uuids),)
+                    )
+                    return [_user(row) for row in await cursor.fetchall()]
+        except Exception as e:
+            print("Failed to get users by UUIDs:", e, flush=True)
+            return None
+
+    async def get_user_by_username(self, username: str) -> dict:
+        """
+        Retrieves a user from the database by username.
+
+        See `UsersMixin.get_user_by_username`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await STATEMENTS.execute_async(
+                        cursor, GET_USER_BY_USERNAME, (username,)
+                    )
+                    user = _user(await cursor.fetchone())
+                    if user is None:
+                        print(f"User with username '{username}' not found.", flush=True)
+                    return user
+        except Exception as e:
+            print("Failed to get user by username:", e, flush=True)
+            return None
+
+    async def update_user(
+        self,
+        uuid_user: str,
+        email: str = None,
+        username: str = None,
+        password_hash: str = None,
+    ) -> bool:
+        """
+        Updates a user in the database.
+
+        See `UsersMixin.update_user`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                await conn.execute(
+                    *_update_user_query(uuid_user, email, username, password_hash)
+                )
+                return True
+        except Exception as e:
+            print("Failed to update user:", e, flush=True)
+            return False
+
+    async def delete_user(self, uuid_user: str) -> bool:
+        """
+        Deletes a user from the database.
+
+        See `UsersMixin.delete_user`.
+        """
+
+        try:
+            async with self.connectionPool.connection() as conn:
+                await STATEMENTS.execute_async(conn, DELETE_USER, (uuid_user,))
+            # The sessions of the user are deleted with it
+            invalidate_sessions(owner=uuid_user)
+            return True
+        except Exception as e:
+            print("Failed to delete user:", e, flush=True)
+            return False
@@ -0,0 +1,232 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Thread-safe, blocking connection pool for the Database class
+
+import threading
+import time
+from typing import Any, Dict
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+
+class BlockingConnectionPool:
+    """
+    A thread-safe psycopg2 connection pool.
+
+    Unlike `psycopg2.pool.SimpleConnectionPool`, it can be shared between the threads FastAPI runs
+    sync route handlers on. When every connection is checked out, `getconn` waits for one to be
+    returned instead of failing outright, and only raises `PoolError` once the timeout expires.
+
+    It keeps the `getconn`/`putconn`/`closeall` interface of the psycopg2 pools, so the mixins
+    do not need to know which pool they are using.
+    """
+
+    # Upper bounds (in seconds) of the checkout wait time histogram buckets
+    WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf"))
+
+    def __init__(
+        self,
+        minconn: int,
+        maxconn: int,
+        *args,
+        timeout: float = 10,
+        max_lifetime: float = None,
+        **kwargs,
+    ):
+        """
+        Creates a new connection pool and opens `minconn` connections.
+
+        Args:
+            minconn (int): The number of connections to open up front and keep idle.
+            maxconn (int): The maximum number of connections the pool may open.
+            *args: Positional arguments passed to `psycopg2.connect`.
+            timeout (float, optional): The default number of seconds `getconn` waits for a connection.
+            max_lifetime (float, optional): The number of seconds after which a connection is replaced.
+            **kwargs: Keyword arguments passed to `psycopg2.connect`.
+        """
+
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.closed = False
+
+        self._args = args
+        self._kwargs = kwargs
+        self._condition = threading.Condition(threading.Lock())
+        self._idle = []
+        self._used = {}
+        self._created_at = {}
+        self._size = 0
+        self._waiting = 0
+
+        self._checkouts = 0
+        self._exhausted = 0
+        self._wait_total = 0.0
+        self._wait_histogram = [0] * len(self.WAIT_BUCKETS)
+
+        for _ in range(minconn):
+            self._idle.append(self._connect())
+            self._size += 1
+
+    def _connect(self) -> extensions.connection:
+        conn = psycopg2.connect(*self._args, **self._kwargs)
+        self._created_at[id(conn)] = time.monotonic()
+        return conn
+
+    def _discard(self, conn: extensions.connection) -> None:
+        self._created_at.pop(id(conn), None)
+        if not conn.closed:
+            conn.close()
+
+    def _expired(self, conn: extensions.connection) -> bool:
+        if conn.closed:
+            return True
+        if self.max_lifetime is None:
+            return False
+        created_at = self._created_at.get(id(conn), 0)
+        return time.monotonic() - created_at > self.max_lifetime
+
+    def getconn(self, timeout: float = None) -> extensions.connection:
+        """
+        Checks out a connection, waiting for one to be returned if the pool is exhausted.
+
+        Args:
+            timeout (float, optional): The number of seconds to wait. Defaults to the pool timeout.
+
+        Returns:
+            connection: A connection which must be returned with `putconn`.
+
+        Raises:
+            PoolError: If the pool is closed or no connection became available in time.
+        """
+
+        start = time.monotonic()
+        deadline = start + (self.timeout if timeout is None else timeout)
+        conn = None
+
+        with self._condition:
+            while True:
+                if self.closed:
+                    raise PoolError("connection pool is closed")
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._size < self.maxconn:
+                    # Reserve a slot, the connection is opened outside of the lock
+                    self._size += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._exhausted += 1
+                    raise PoolError("connection pool exhausted")
+
+                self._waiting += 1
+                try:
+                    self._condition.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+        try:
+            if conn is not None and self._expired(conn):
+                self._discard(conn)
+                conn = None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+        waited = time.monotonic() - start
+        with self._condition:
+            self._used[id(conn)] = conn
+            self._checkouts += 1
+            self._wait_total += waited
+            for index, bound in enumerate(self.WAIT_BUCKETS):
+                if waited <= bound:
+                    self._wait_histogram[index] += 1
+                    break
+
+        return conn
+
+    def putconn(self, conn: extensions.connection, close: bool = False) -> None:
+        """
+        Returns a connection to the pool.
+        Any open transaction is rolled back, and broken or expired connections are replaced.
+
+        Args:
+            conn (connection): The connection to return.
+            close (bool, optional): Whether to close the connection instead of keeping it.
+        """
+
+        with self._condition:
+            if self.closed:
+                self._discard(conn)
+                return
+            if self._used.pop(id(conn), None) is None:
+                raise PoolError("trying to put unkeyed connection")
+
+        if not conn.closed:
+            status = conn.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                close = True
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    close = True
+
+        with self._condition:
+            if self.closed:
+                self._discard(conn)
+                return
+            if close or self._expired(conn):
+                self._discard(conn)
+                self._size -= 1
+            else:
+                self._idle.append(conn)
+            self._condition.notify()
+
+    def closeall(self) -> None:
+        """
+        Closes the pool and all of its connections.
+        """
+
+        with self._condition:
+            self.closed = True
+            for conn in self._idle + list(self._used.values()):
+                self._discard(conn)
+            self._idle.clear()
+            self._used.clear()
+            self._size = 0
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retrieves usage statistics of the pool.
+
+        Returns:
+            Dict[str, Any]: The pool size, in use/idle/waiting counts, number of checkouts,
+            number of checkouts which timed out, and the checkout wait time histogram.
+        """
+
+        with self._condition:
+            return {
+                "min_size": self.minconn,
+                "max_size": self.maxconn,
+                "size": self._size,
+                "in_use": len(self._used),
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "exhausted": self._exhausted,
+                "wait_seconds_total": self._wait_total,
+                "wait_seconds_histogram": {
+                    str(bound): count
+                    for bound, count in zip(self.WAIT_BUCKETS, self._wait_histogram)
+                },
+            }
@@ -0,0 +1,212 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Registry of the named statements which the database mixins prepare once per connection
+
+import itertools
+import re
+import threading
+import time
+import weakref
+from typing import Any, Dict, List, Tuple
+
+import psycopg2
+from psycopg2 import extensions
+
+# Statement names are sent as bare identifiers in PREPARE and EXECUTE
+NAME = re.compile(r"[a-z_][a-z0-9_]*")
+
+# Parameter placeholders, with the cast which follows them if any (e.g. %s::uuid[])
+PLACEHOLDER = re.compile(r"%s((?:::\w+(?:\[\])*)?)")
+
+
+class StatementRegistry:
+    """
+    A registry of named SQL statements which are prepared once per connection.
+
+    Each mixin registers its hot statements at import time and executes them by name. The
+    first use of a statement on a connection prepares it, so Postgres parses and plans it
+    once per connection instead of once per call:
+
+    - On the blocking pool a `PREPARE` is sent, and every call sends `EXECUTE` with only the
+      parameters.
+    - On the async pool psycopg prepares it through the extended protocol and reuses it on
+      that connection.
+
+    Prepared statements last as long as their connection and are not undone by a rollback,
+    so the statements prepared on each connection are tracked until the connection is
+    garbage collected. The number of calls, preparations, errors and the cumulative time of
+    each statement are kept for inspection, see `stats`.
+    """
+
+    def __init__(self):
+        """
+        Creates a new, empty statement registry.
+        """
+
+        self._lock = threading.Lock()
+        self._statements = {}
+        # connection -> names of the statements prepared on it
+        self._prepared = weakref.WeakKeyDictionary()
+
+    def register(self, name: str, query: str) -> str:
+        """
+        Registers a named statement.
+
+        Args:
+            name (str): The name of the statement, a lowercase SQL identifier.
+            query (str): The statement, with %s placeholders for its parameters.
+
+        Returns:
+            str: The name of the statement, to pass to `execute` or `execute_async`.
+
+        Raises:
+            ValueError: If the name is invalid or already registered with another query.
+        """
+
+        if not NAME.fullmatch(name):
+            raise ValueError(f"Invalid statement name: {name}")
+
+        with self._lock:
+            statement = self._statements.get(name)
+            if statement is not None:
+                if statement["query"] != query:
+                    raise ValueError(f"Statement already registered: {name}")
+                return name
+
+            # The casts are repeated in EXECUTE, since psycopg2 sends the parameters as
+            # literals which are not coerced to every type, e.g. a list is sent as text[]
+            counter = itertools.count(1)
+            params = [f"%s{cast}" for cast in PLACEHOLDER.findall(query)]
+            self._statements[name] = {
+                "query": query,
+                "prepare": f"PREPARE {name} AS "
+                + PLACEHOLDER.sub(lambda m: f"${next(counter)}{m.group(1)}", query),
+                "execute": f"EXECUTE {name}"
+                + (f" ({', '.join(params)})" if params else ""),
+                "calls": 0,
+                "prepares": 0,
+                "errors": 0,
+                "seconds": 0.0,
+            }
+        return name
+
+    def execute(self, cursor: extensions.cursor, name: str, params: tuple = ()) -> None:
+        """
+        Executes a named statement on a psycopg2 cursor, preparing it on the connection first
+        if needed. The results are read from the cursor as usual.
+
+        Args:
+            cursor (cursor): The cursor to execute the statement on.
+            name (str): The name of the statement.
+            params (tuple, optional): The parameters of the statement.
+        """
+
+        statement = self._statements[name]
+        conn = cursor.connection
+        start = time.monotonic()
+        prepared = False
+        try:
+            if not self._is_prepared(conn, name):
+                cursor.execute(statement["prepare"])
+                self._set_prepared(conn, name)
+                prepared = True
+            cursor.execute(statement["execute"], params)
+        except psycopg2.errors.InvalidSqlStatementName:
+            # The statement was deallocated behind our back, prepare it again on the next call
+            self._set_prepared(conn, name, False)
+            self._record(statement, start, prepared, failed=True)
+            raise
+        except Exception:
+            self._record(statement, start, prepared, failed=True)
+            raise
+        self._record(statement, start, prepared)
+
+    async def execute_async(self, target, name: str, params: tuple = ()):
+        """
+        Executes a named statement on a psycopg connection or cursor, which prepares it on the
+        connection on first use.
+
+        Args:
+            target (AsyncConnection | AsyncCursor): The connection or cursor to execute the statement on.
+            name (str): The name of the statement.
+            params (tuple, optional): The parameters of the statement.
+
+        Returns:
+            AsyncCursor: The cursor holding the results.
+        """
+
+        statement = self._statements[name]
+        conn = getattr(target, "connection", target)
+        start = time.monotonic()
+        preparing = not self._is_prepared(conn, name)
+        try:
+            cursor = await target.execute(statement["query"], params, prepare=True)
+        except Exception:
+            self._record(statement, start, False, failed=True)
+            raise
+        if preparing:
+            self._set_prepared(conn, name)
+        self._record(statement, start, preparing)
+        return cursor
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieves usage statistics of the registered statements.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: For each statement name, the number of calls, the number
+            of times it was prepared on a connection, the number of failed calls, and the
+            cumulative time spent executing it.
+        """
+
+        with self._lock:
+            return {
+                name: {
+                    "calls": statement["calls"],
+                    "prepares": statement["prepares"],
+                    "errors": statement["errors"],
+                    "seconds_total": statement["seconds"],
+                }
+                for name, statement in self._statements.items()
+            }
+
+    def _is_prepared(self, conn, name: str) -> bool:
+        with self._lock:
+            return name in self._prepared.get(conn, ())
+
+    def _set_prepared(self, conn, name: str, prepared: bool = True) -> None:
+        with self._lock:
+            names = self._prepared.setdefault(conn, set())
+            if prepared:
+                names.add(name)
+            else:
+                names.discard(name)
+
+    def _record(
+        self, statement: dict, start: float, prepared: bool, failed: bool = False
+    ) -> None:
+        elapsed = time.monotonic() - start
+        with self._lock:
+            statement["calls"] += 1
+            statement["prepares"] += prepared
+            statement["errors"] += failed
+            statement["seconds"] += elapsed
+
+
+def columns(rows: List[tuple], count: int) -> Tuple[list, ...]:
+    """
+    Transposes rows into one list per column, for statements which insert many rows at once
+    from arrays with unnest, e.g. `INSERT INTO t (a, b) SELECT * FROM unnest(%s::int[], %s::text[])`.
+
+    Args:
+        rows (List[tuple]): The rows to insert.
+        count (int): The number of columns of each row.
+
+    Returns:
+        Tuple[list, ...]: The values of each column.
+    """
+
+    return tuple(list(column) for column in zip(*rows)) if rows else ([],) * count
+
+
+# Named statements of every mixin, shared by the Database and AsyncDatabase pools
+STATEMENTS = StatementRegistry()
@@ -0,0 +1,4 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Exports the LeaderboardService class for use in other modules
+
+from .leaderboard import LeaderboardService  # noqa: F401
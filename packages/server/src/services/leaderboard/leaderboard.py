@@ -0,0 +1,336 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Leaderboard engine which keeps tournament standings ranked as prices and trades change
+
+import threading
+import time
+
+from config import LEADERBOARD_REBUILD_INTERVAL
+from helpers.leaderboard import Leaderboard
+from services.alpaca import AlpacaService
+from services.database import Database
+
+db = Database()
+
+
+class LeaderboardService:
+    """
+    Keeps the market value of every portfolio in a tournament ranked in memory.
+
+    A tournament is loaded on first read with one query for its portfolios and holdings and
+    one batched quote lookup. From then on it is updated incrementally: a new quote for a
+    symbol revalues only the portfolios holding it, and a trade revalues only the traded
+    portfolio, each re-ranked in O(log n). Reads never revalue portfolios, so the top entries
+    and the rank of a user are served in O(log n + limit).
+
+    Trades executed by other server processes are not seen, so each tournament is reloaded
+    from the database once it is older than the rebuild interval, and dropped from memory
+    once it has not been read for ten intervals.
+
+    The value of a holding without a known price is its cost basis.
+    """
+
+    def __init__(self, rebuild_interval: float = LEADERBOARD_REBUILD_INTERVAL):
+        """
+        Creates a new leaderboard engine.
+
+        Args:
+            rebuild_interval (float, optional): The number of seconds after which a tournament is reloaded.
+        """
+
+        self.rebuild_interval = rebuild_interval
+        self.lock = threading.Lock()
+
+        # tournament -> {"board", "owners", "loaded_at", "read_at"}
+        self.tournaments = {}
+        # portfolio -> {"tournament", "owner", "name", "balance_cents", "holdings"}
+        self.portfolios = {}
+        # symbol -> portfolios holding it
+        self.holders = {}
+        # symbol -> latest price in cents
+        self.prices = {}
+
+        self.loads = 0
+        self.updates = 0
+
+    def get_standings(
+        self, tournament: str, owner: str = None, limit: int = 10, offset: int = 0
+    ) -> dict | None:
+        """
+        Retrieves a page of the leaderboard of a tournament.
+
+        Args:
+            tournament (str): The UUID of the tournament.
+            owner (str, optional): The UUID of a user whose best ranked portfolio to include.
+            limit (int, optional): The maximum number of entries.
+            offset (int, optional): The number of entries to skip.
+
+        Returns:
+            dict | None: The 'total' number of portfolios, the 'entries' of the page, and
+            the entry of the owner as 'me' (None if they have no portfolio), or None if the
+            tournament could not be loaded.
+        """
+
+        now = time.monotonic()
+        with self.lock:
+            state = self.tournaments.get(tournament)
+            stale = state is None or now - state["loaded_at"] >= self.rebuild_interval
+
+        if stale and not self._load(tournament) and state is None:
+            return None
+
+        with self.lock:
+            self._evict(now)
+            state = self.tournaments.get(tournament)
+            if state is None:
+                return None
+            state["read_at"] = now
+            board = state["board"]
+
+            entries = [
+                self._entry(rank, uuid, value)
+                for rank, uuid, value in board.top(limit, offset)
+            ]
+            owned = state["owners"].get(owner)
+            me = None
+            if owned:
+                uuid = min(owned, key=board.rank)
+                me = self._entry(board.rank(uuid), uuid, board.score(uuid))
+
+            return {"total": len(board), "entries": entries, "me": me}
+
+    def get_final_standings(self, tournament: str) -> list[dict] | None:
+        """
+        Ranks every portfolio of a tournament which has ended, and drops it from memory.
+
+        The tournament is always reloaded, so trades executed by other server processes are
+        included.
+
+        Args:
+            tournament (str): The UUID of the tournament.
+
+        Returns:
+            list[dict] | None: The entries of every portfolio in rank order, or None if the
+            tournament could not be loaded.
+        """
+
+        if not self._load(tournament):
+            return None
+
+        with self.lock:
+            state = self.tournaments.get(tournament)
+            if state is None:
+                return None
+            board = state["board"]
+            entries = [
+                self._entry(rank, uuid, value)
+                for rank, uuid, value in board.top(len(board))
+            ]
+            for uuid in list(board.scores):
+                self._drop_portfolio(uuid)
+            del self.tournaments[tournament]
+            return entries
+
+    def on_quote(self, symbol: str, quote: dict) -> None:
+        """
+        Revalues the portfolios holding a symbol after a new quote arrives.
+        """
+
+        with self.lock:
+            if symbol in self.holders:
+                self._set_price(symbol, int(quote["price_cents"]))
+
+    def on_trade(self, portfolio: dict, holding: dict) -> None:
+        """
+        Revalues a portfolio after a trade, given its updated row and the updated holding of
+        the traded symbol, without a database round trip.
+
+        A portfolio which is not in memory is left to the next reload of its tournament.
+        """
+
+        uuid = str(portfolio["uuid"])
+        with self.lock:
+            current = self.portfolios.get(uuid)
+            if current is None:
+                return
+
+            holdings = dict(current["holdings"])
+            if holding["quantity"] > 0:
+                holdings[holding["symbol"]] = (
+                    int(holding["quantity"]),
+                    int(holding["cost_basis_cents"]),
+                )
+            else:
+                holdings.pop(holding["symbol"], None)
+            self._set_portfolio(
+                uuid,
+                {
+                    **current,
+                    "balance_cents": int(portfolio["balance_cents"]),
+                    "holdings": holdings,
+                },
+            )
+
+    def on_portfolio_created(self, portfolio: dict) -> None:
+        """
+        Adds a new portfolio to the leaderboard of its tournament.
+        """
+
+        with self.lock:
+            tournament = str(portfolio["tournament"])
+            if tournament not in self.tournaments:
+                return
+            self._set_portfolio(
+                str(portfolio["uuid"]),
+                {
+                    "tournament": tournament,
+                    "owner": str(portfolio["owner"]),
+                    "name": portfolio["name"],
+                    "balance_cents": int(portfolio["balance_cents"]),
+                    "holdings": {},
+                },
+            )
+
+    def on_portfolio_deleted(self, uuid: str) -> None:
+        """
+        Removes a deleted portfolio from the leaderboard of its tournament.
+        """
+
+        with self.lock:
+            self._drop_portfolio(uuid)
+
+    def get_stats(self) -> dict:
+        """
+        Retrieves the counters of the engine.
+
+        Returns:
+            dict: The number of tournaments, portfolios and symbols held in memory, and the
+            number of tournament loads and incremental portfolio updates.
+        """
+
+        with self.lock:
+            return {
+                "tournaments": len(self.tournaments),
+                "portfolios": len(self.portfolios),
+                "symbols": len(self.holders),
+                "loads": self.loads,
+                "updates": self.updates,
+            }
+
+    def _load(self, tournament: str) -> bool:
+        rows = db.get_tournament_holdings(tournament)
+        if rows is None:
+            return False
+
+        portfolios = {}
+        for row in rows:
+            uuid = str(row["portfolio"])
+            portfolio = portfolios.setdefault(
+                uuid,
+                {
+                    "tournament": tournament,
+                    "owner": str(row["owner"]),
+                    "name": row["name"],
+                    "balance_cents": int(row["balance_cents"]),
+                    "holdings": {},
+                },
+            )
+            if row["symbol"] is not None:
+                portfolio["holdings"][row["symbol"]] = (
+                    int(row["quantity"]),
+                    int(row["cost_basis_cents"]),
+                )
+
+        symbols = {symbol for p in portfolios.values() for symbol in p["holdings"]}
+        quotes = AlpacaService.get_quotes(sorted(symbols)) if symbols else {}
+
+        with self.lock:
+            previous = self.tournaments.get(tournament)
+            if previous is not None:
+                for uuid in list(previous["board"].scores):
+                    self._drop_portfolio(uuid)
+
+            now = time.monotonic()
+            self.tournaments[tournament] = {
+                "board": Leaderboard(),
+                "owners": {},
+                "loaded_at": now,
+                "read_at": now,
+            }
+            for uuid, portfolio in portfolios.items():
+                self._set_portfolio(uuid, portfolio)
+            for symbol, quote in quotes.items():
+                self._set_price(symbol, int(quote["price_cents"]))
+            self.loads += 1
+        return True
+
+    def _evict(self, now: float) -> None:
+        for tournament, state in list(self.tournaments.items()):
+            if now - state["read_at"] >= 10 * self.rebuild_interval:
+                for uuid in list(state["board"].scores):
+                    self._drop_portfolio(uuid)
+                del self.tournaments[tournament]
+        for symbol in [symbol for symbol in self.prices if symbol not in self.holders]:
+            del self.prices[symbol]
+
+    def _value(self, portfolio: dict) -> int:
+        value = portfolio["balance_cents"]
+        for symbol, (quantity, cost_basis_cents) in portfolio["holdings"].items():
+            price = self.prices.get(symbol)
+            value += cost_basis_cents if price is None else quantity * price
+        return value
+
+    def _set_price(self, symbol: str, price_cents: int) -> None:
+        if self.prices.get(symbol) == price_cents:
+            return
+        self.prices[symbol] = price_cents
+        for uuid in self.holders.get(symbol, ()):
+            portfolio = self.portfolios[uuid]
+            board = self.tournaments[portfolio["tournament"]]["board"]
+            board.update(uuid, self._value(portfolio))
+            self.updates += 1
+
+    def _set_portfolio(self, uuid: str, portfolio: dict) -> None:
+        self._drop_portfolio(uuid)
+        state = self.tournaments[portfolio["tournament"]]
+        self.portfolios[uuid] = portfolio
+        state["owners"].setdefault(portfolio["owner"], set()).add(uuid)
+        for symbol in portfolio["holdings"]:
+            self.holders.setdefault(symbol, set()).add(uuid)
+        state["board"].update(uuid, self._value(portfolio))
+        self.updates += 1
+
+    def _drop_portfolio(self, uuid: str) -> None:
+        portfolio = self.portfolios.pop(uuid, None)
+        if portfolio is None:
+            return
+
+        for symbol in portfolio["holdings"]:
+            holders = self.holders.get(symbol)
+            if holders is not None:
+                holders.discard(uuid)
+                if not holders:
+                    del self.holders[symbol]
+
+        state = self.tournaments.get(portfolio["tournament"])
+        if state is not None:
+            state["board"].remove(uuid)
+            owned = state["owners"].get(portfolio["owner"])
+            if owned is not None:
+                owned.discard(uuid)
+                if not owned:
+                    del state["owners"][portfolio["owner"]]
+
+    def _entry(self, rank: int, uuid: str, value: int) -> dict:
+        portfolio = self.portfolios[uuid]
+        return {
+            "rank": rank,
+            "portfolio": uuid,
+            "owner": portfolio["owner"],
+            "name": portfolio["name"],
+            "value_cents": value,
+        }
+
+
+# Standings of the tournaments read recently, updated by every new quote
+LEADERBOARDS = LeaderboardService()
+AlpacaService.add_quote_listener(LEADERBOARDS.on_quote)
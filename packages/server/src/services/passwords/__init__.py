@@ -0,0 +1,4 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Exports the PasswordService class for use in other modules
+
+from .passwords import PasswordService  # noqa: F401
@@ -0,0 +1,103 @@
+# @author: adibarra (Alec Ibarra)
+# @description: PasswordService class for hashing passwords off of the request threads
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from config import (
+    PASSWORD_HASH_MEMORY_COST,
+    PASSWORD_HASH_PARALLELISM,
+    PASSWORD_HASH_QUEUE_SIZE,
+    PASSWORD_HASH_TIME_COST,
+    PASSWORD_HASH_TIMEOUT,
+    PASSWORD_HASH_WORKERS,
+)
+from helpers.user import User
+
+User.configure_hasher(
+    PASSWORD_HASH_TIME_COST, PASSWORD_HASH_MEMORY_COST, PASSWORD_HASH_PARALLELISM
+)
+
+# Argon2 releases the GIL while hashing, so a thread pool runs hashes in parallel without
+# the overhead of worker processes
+EXECUTOR = ThreadPoolExecutor(PASSWORD_HASH_WORKERS, thread_name_prefix="password")
+LOCK = threading.Lock()
+STATS = {"pending": 0, "completed": 0, "rejected": 0, "timeouts": 0}
+
+
+class PasswordServiceBusy(Exception):
+    """
+    Raised when a password cannot be hashed or verified because the pool is overloaded.
+    """
+
+
+class PasswordService:
+    """
+    Hashes and verifies passwords on a dedicated, size-limited thread pool.
+
+    Argon2 is deliberately slow, so a burst of logins or signups would otherwise tie up the
+    threads every other request runs on. At most PASSWORD_HASH_WORKERS hashes run at once
+    and at most PASSWORD_HASH_QUEUE_SIZE more wait for a worker. Beyond that, or once a
+    caller has waited PASSWORD_HASH_TIMEOUT seconds, `PasswordServiceBusy` is raised.
+    """
+
+    async def hash_password(password: str) -> str:
+        """
+        Hashes a password with the configured cost parameters.
+
+        See `User.hash_password`.
+
+        Raises:
+            PasswordServiceBusy: If the pool is overloaded.
+        """
+
+        return await PasswordService._run(User.hash_password, password)
+
+    async def verify_password(password: str, password_hash: str) -> bool:
+        """
+        Verifies a password against a password hash.
+
+        See `User.verify_password`.
+
+        Raises:
+            PasswordServiceBusy: If the pool is overloaded.
+        """
+
+        return await PasswordService._run(User.verify_password, password, password_hash)
+
+    def get_stats() -> dict:
+        """
+        Retrieves the counters of the pool.
+
+        Returns:
+            dict: The pending, completed, rejected and timed out operation counts.
+        """
+
+        with LOCK:
+            return dict(STATS)
+
+    async def _run(function, *args):
+        with LOCK:
+            if STATS["pending"] >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_SIZE:
+                STATS["rejected"] += 1
+                raise PasswordServiceBusy("Password queue is full.")
+            STATS["pending"] += 1
+
+        future = EXECUTOR.submit(function, *args)
+        future.add_done_callback(PasswordService._done)
+        try:
+            # Cancels the work if it is still queued when the timeout expires
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future), PASSWORD_HASH_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            with LOCK:
+                STATS["timeouts"] += 1
+            raise PasswordServiceBusy("Timed out waiting for the password queue.")
+
+    def _done(future: Future) -> None:
+        with LOCK:
+            STATS["pending"] -= 1
+            if not future.cancelled():
+                STATS["completed"] += 1
@@ -0,0 +1,4 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Exports the TournamentScheduler class for use in other modules
+
+from .scheduler import TournamentScheduler  # noqa: F401
@@ -0,0 +1,194 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Scheduler which starts and finishes tournaments as their dates pass
+
+import asyncio
+import heapq
+from datetime import datetime, timezone
+
+from config import TOURNAMENT_FIRST_PRIZE, TOURNAMENT_RESYNC_INTERVAL
+from helpers.tournament import Tournament
+from services.database import AsyncDatabase
+from services.leaderboard.leaderboard import LEADERBOARDS
+
+adb = AsyncDatabase()
+
+
+class TournamentScheduler:
+    """
+    Advances the status of tournaments from scheduled to ongoing to finished.
+
+    The start and end dates of every unfinished tournament are kept in a min-heap, and a single
+    asyncio task sleeps until the earliest one. When it wakes, every tournament which has
+    started is marked as ongoing with one bulk update, and every tournament which has ended is
+    finished: its final standings are frozen from the leaderboard engine and its prizes are
+    paid out, in one transaction for all of them.
+
+    The schedule is reloaded from the database on start, so tournaments which started or ended
+    while the server was down are caught up immediately, and again every resync interval to
+    pick up tournaments changed by other server processes. A tournament is only ever finished
+    once, so several processes can run a scheduler at the same time.
+    """
+
+    def __init__(
+        self,
+        resync_interval: float = TOURNAMENT_RESYNC_INTERVAL,
+        first_prize: int = TOURNAMENT_FIRST_PRIZE,
+    ):
+        """
+        Creates a new scheduler.
+
+        Args:
+            resync_interval (float, optional): The number of seconds between schedule reloads.
+            first_prize (int, optional): The coins paid to the winner of a tournament.
+        """
+
+        self.resync_interval = resync_interval
+        self.first_prize = first_prize
+        self.heap = []
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+        self.runs = 0
+        self.started = 0
+        self.finished = 0
+
+    def start(self) -> None:
+        """
+        Starts scheduling in a background task on the running event loop.
+        """
+
+        if self.task is not None:
+            return
+
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops scheduling, cancelling the current run.
+        """
+
+        if self.task is None:
+            return
+
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    def schedule(self, start_date: datetime, end_date: datetime) -> None:
+        """
+        Adds the dates of a created or updated tournament to the schedule.
+
+        Outdated dates left in the schedule only cause a run with nothing to do.
+        """
+
+        heapq.heappush(self.heap, self._instant(start_date))
+        heapq.heappush(self.heap, self._instant(end_date))
+        self.wakeup.set()
+
+    async def resync(self) -> bool:
+        """
+        Reloads the schedule from the unfinished tournaments in the database.
+
+        Returns:
+            bool: True if the schedule was reloaded, False otherwise.
+        """
+
+        tournaments = await adb.get_tournament_schedule()
+        if tournaments is None:
+            return False
+
+        heap = []
+        for tournament in tournaments:
+            if tournament["status"] == "SCHEDULED":
+                heap.append(self._instant(tournament["start_date"]))
+            heap.append(self._instant(tournament["end_date"]))
+        heapq.heapify(heap)
+        self.heap = heap
+        return True
+
+    async def advance(self) -> None:
+        """
+        Starts every tournament which has started, and finishes every tournament which has ended.
+        """
+
+        now = datetime.now(timezone.utc)
+        while self.heap and self.heap[0] <= now:
+            heapq.heappop(self.heap)
+
+        started = await adb.start_tournaments(now)
+        self.started += len(started or [])
+
+        ended = await adb.get_ended_tournaments(now)
+        if ended:
+            standings = {}
+            for tournament in ended:
+                # Tournaments which cannot be ranked now are retried on the next resync
+                entries = await asyncio.to_thread(
+                    LEADERBOARDS.get_final_standings, tournament
+                )
+                if entries is None:
+                    continue
+                # Coins are whole, so fractional prizes are rounded down when paid out
+                for entry in entries:
+                    entry["prize_coins"] = int(
+                        Tournament.get_prize(entry["rank"], self.first_prize)
+                    )
+                standings[tournament] = entries
+
+            if standings:
+                finished = await adb.finish_tournaments(standings)
+                self.finished += len(finished or [])
+
+        self.runs += 1
+
+    def get_stats(self) -> dict:
+        """
+        Retrieves the counters of the scheduler.
+
+        Returns:
+            dict: The number of runs, the number of tournaments started and finished, and the
+            number of dates in the schedule.
+        """
+
+        return {
+            "runs": self.runs,
+            "started": self.started,
+            "finished": self.finished,
+            "scheduled": len(self.heap),
+        }
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        resync_at = loop.time()
+        while True:
+            # Cleared before the run, so a tournament scheduled during it wakes the next one
+            self.wakeup.clear()
+            try:
+                if loop.time() >= resync_at:
+                    resync_at = loop.time() + self.resync_interval
+                    await self.resync()
+                await self.advance()
+            except Exception as e:
+                print("Failed to advance tournaments:", e, flush=True)
+
+            timeout = resync_at - loop.time()
+            if self.heap:
+                until = self.heap[0] - datetime.now(timezone.utc)
+                timeout = min(timeout, until.total_seconds())
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), max(timeout, 0))
+            except asyncio.TimeoutError:
+                pass
+
+    def _instant(self, date: datetime) -> datetime:
+        # Dates without a timezone are stored as UTC
+        if date.tzinfo is None:
+            return date.replace(tzinfo=timezone.utc)
+        return date
+
+
+# Starts and finishes the tournaments of the whole server
+SCHEDULER = TournamentScheduler()
@@ -0,0 +1,4 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Exports the ValuationService class for use in other modules
+
+from .valuation import ValuationService  # noqa: F401
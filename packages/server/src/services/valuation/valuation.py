@@ -0,0 +1,110 @@
+# @author: adibarra (Alec Ibarra)
+# @description: ValuationService class for valuing portfolios at the latest prices
+
+import time
+
+from config import VALUATION_CACHE_TTL
+from helpers.cache import Cache
+from helpers.valuation import Valuation
+from services.alpaca import AlpacaService
+from services.database import Database
+
+db = Database()
+
+# Valuations by (portfolio, updated_at, quote epoch)
+VALUATIONS = Cache(1000, VALUATION_CACHE_TTL)
+
+
+class ValuationService:
+    """
+    Values portfolios at the latest prices, with daily and total profit and loss.
+
+    The positions of any number of portfolios are read with one query, and the symbols held
+    across all of them are priced together, with one batched quote lookup and one batched
+    previous close lookup, so the number of upstream requests grows with the number of unique
+    symbols rather than with the number of portfolios.
+
+    Valuations are cached for VALUATION_CACHE_TTL seconds. The cache key holds the time the
+    portfolio was last updated, which every trade changes, so a trade is reflected at once,
+    and the quote epoch, which advances every VALUATION_CACHE_TTL seconds, so valuations
+    follow the market.
+    """
+
+    def get_valuation(portfolio: dict) -> dict | None:
+        """
+        Values a portfolio.
+
+        See `ValuationService.get_valuations`.
+
+        Args:
+            portfolio (dict): The portfolio row.
+
+        Returns:
+            dict | None: The valuation, or None if the positions could not be read.
+        """
+
+        valuations = ValuationService.get_valuations([portfolio])
+        if valuations is None:
+            return None
+        return valuations[str(portfolio["uuid"])]
+
+    def get_valuations(portfolios: list[dict]) -> dict[str, dict] | None:
+        """
+        Values several portfolios together.
+
+        See `Valuation.value`.
+
+        Args:
+            portfolios (list[dict]): The portfolio rows.
+
+        Returns:
+            dict[str, dict] | None: The valuations keyed by portfolio UUID, or None if the
+            positions could not be read.
+        """
+
+        valuations = {}
+        misses = {}
+        for portfolio in portfolios:
+            uuid = str(portfolio["uuid"])
+            key = ValuationService._key(portfolio)
+            valuation = VALUATIONS.get(key)
+            if valuation is not None:
+                valuations[uuid] = valuation
+            else:
+                misses[uuid] = (key, portfolio)
+
+        if not misses:
+            return valuations
+
+        rows = db.get_holdings_by_portfolios(list(misses))
+        if rows is None:
+            return None
+
+        holdings = {}
+        for row in rows:
+            holdings.setdefault(str(row["portfolio"]), []).append(row)
+
+        # Each symbol is priced once, however many portfolios hold it
+        symbols = sorted({row["symbol"] for row in rows})
+        quotes = AlpacaService.get_quotes(symbols) if symbols else {}
+        closes = AlpacaService.get_previous_closes(symbols) if symbols else {}
+        prices = {symbol: quote["price_cents"] for symbol, quote in quotes.items()}
+
+        for uuid, (key, portfolio) in misses.items():
+            valuation = Valuation.value(
+                portfolio["balance_cents"], holdings.get(uuid, []), prices, closes
+            )
+            VALUATIONS.set(key, valuation)
+            valuations[uuid] = valuation
+        return valuations
+
+    def get_stats() -> dict:
+        """
+        Retrieves the counters of the valuation cache.
+        """
+
+        return VALUATIONS.stats()
+
+    def _key(portfolio: dict) -> tuple:
+        epoch = int(time.time() // VALUATION_CACHE_TTL)
+        return str(portfolio["uuid"]), portfolio["updated_at"], epoch
@@ -0,0 +1,292 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Testcases for the async database mixins
+
+import asyncio
+import os
+import sys
+import unittest
+from contextlib import asynccontextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from routes.api.v1.loaders import batch
+from services.database.mixins.portfolios import AsyncPortfolioMixin, PortfolioMixin
+from services.database.mixins.tournaments import AsyncTournamentsMixin
+from services.database.mixins.transactions import (
+    TRADE_ERRORS,
+    AsyncTransactionsMixin,
+)
+from services.database.mixins.users import AsyncUsersMixin, UsersMixin
+from services.database.statements import columns
+
+
+class FakeAsyncCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rows = []
+        self.rowcount = -1
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def execute(self, query, params=None, prepare=None):
+        conn = self.connection
+        conn.executed.append((" ".join(query.split()), params, prepare))
+        if conn.fail is not None:
+            raise conn.fail
+        self.rows = conn.results.pop(0) if conn.results else []
+        self.rowcount = len(self.rows)
+        return self
+
+    async def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    async def fetchall(self):
+        return self.rows
+
+
+class FakeAsyncConnection:
+    def __init__(self, results=None, fail=None):
+        # The rows returned by each statement, in order
+        self.results = list(results or [])
+        self.fail = fail
+        self.executed = []
+
+    def cursor(self, row_factory=None, name=None):
+        return FakeAsyncCursor(self)
+
+    async def execute(self, query, params=None, prepare=None):
+        return await FakeAsyncCursor(self).execute(query, params, prepare)
+
+
+class FakeAsyncPool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def connection(self):
+        yield self.conn
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, query, params=None):
+        conn = self.connection
+        if conn.fail is not None:
+            raise conn.fail
+        if not query.startswith("PREPARE"):
+            conn.executed.append((" ".join(query.split()), params))
+
+    def fetchall(self):
+        return []
+
+
+class FakeConnection:
+    def __init__(self, fail=None):
+        self.fail = fail
+        self.executed = []
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def getconn(self):
+        return self.conn
+
+    def putconn(self, conn):
+        pass
+
+
+def mixin(cls, pool):
+    instance = cls()
+    instance.connectionPool = pool
+    return instance
+
+
+class TestAsyncMixins(unittest.TestCase):
+    def test_statements_are_prepared(self):
+        """Test the async twins run the registered statements with prepare"""
+
+        conn = FakeAsyncConnection([[{"uuid": 1, "username": "alice"}]])
+        users = mixin(AsyncUsersMixin, FakeAsyncPool(conn))
+        self.assertEqual(
+            asyncio.run(users.get_user("1")), {"uuid": "1", "username": "alice"}
+        )
+        query, params, prepare = conn.executed[0]
+        self.assertEqual(query, "SELECT * FROM users WHERE uuid = %s LIMIT 1")
+        self.assertEqual(params, ("1",))
+        self.assertTrue(prepare)
+
+    def test_failures_match_sync(self):
+        """Test list getters return None on failure in both twins"""
+
+        error = RuntimeError("down")
+        async_users = mixin(
+            AsyncUsersMixin, FakeAsyncPool(FakeAsyncConnection(fail=error))
+        )
+        users = mixin(UsersMixin, FakePool(FakeConnection(fail=error)))
+        self.assertIsNone(asyncio.run(async_users.get_users_by_uuids(["1"])))
+        self.assertIsNone(users.get_users_by_uuids(["1"]))
+
+    def test_queries_match_sync(self):
+        """Test the twins send the same query and parameters"""
+
+        async_conn = FakeAsyncConnection()
+        sync_conn = FakeConnection()
+        kwargs = {"owner": "u1", "offset": 5, "limit": 20, "after": ("t", "p1")}
+        asyncio.run(
+            mixin(AsyncPortfolioMixin, FakeAsyncPool(async_conn)).get_portfolios(
+                **kwargs
+            )
+        )
+        mixin(PortfolioMixin, FakePool(sync_conn)).get_portfolios(**kwargs)
+        self.assertEqual(async_conn.executed[0][:2], sync_conn.executed[0])
+        self.assertTrue(
+            sync_conn.executed[0][0].endswith(
+                "ORDER BY created_at, uuid OFFSET %s LIMIT %s"
+            )
+        )
+        self.assertEqual(sync_conn.executed[0][1][-2:], [5, 20])
+
+    def test_paging_after_row(self):
+        """Test transactions are paged after a row with their own statement"""
+
+        conn = FakeAsyncConnection()
+        transactions = mixin(AsyncTransactionsMixin, FakeAsyncPool(conn))
+        self.assertEqual(
+            asyncio.run(transactions.get_transactions("p1", 0, 10, ("t", "x"))), []
+        )
+        query, params, _ = conn.executed[0]
+        self.assertIn("(created_at, uuid) > (%s, %s)", query)
+        self.assertEqual(params, ("p1", "t", "x", 0, 10))
+
+    def test_finish_tournaments(self):
+        """Test standings are inserted from one array per column"""
+
+        standings = {
+            "t1": [
+                {
+                    "rank": rank,
+                    "portfolio": f"p{rank}",
+                    "owner": "u1",
+                    "name": f"n{rank}",
+                    "value_cents": 100 - rank,
+                    "prize_coins": 10 * rank,
+                }
+                for rank in (1, 2)
+            ]
+        }
+        conn = FakeAsyncConnection([[("t1",)]])
+        tournaments = mixin(AsyncTournamentsMixin, FakeAsyncPool(conn))
+        self.assertEqual(asyncio.run(tournaments.finish_tournaments(standings)), ["t1"])
+        self.assertEqual(len(conn.executed), 3)
+        self.assertEqual(
+            conn.executed[1][1],
+            (
+                ["t1", "t1"],
+                [1, 2],
+                ["p1", "p2"],
+                ["u1", "u1"],
+                ["n1", "n2"],
+                [99, 98],
+                [10, 20],
+            ),
+        )
+        self.assertEqual(conn.executed[2][1], (["u1"], [30]))
+
+
+class FakeHoldings:
+    async def _apply_holding(self, cursor, *args):
+        return self.holding_applied
+
+
+class AsyncTrades(FakeHoldings, AsyncTransactionsMixin):
+    holding_applied = (2, 100)
+
+
+class TestAsyncExecuteTrade(unittest.TestCase):
+    def trade(self, portfolio, action="BUY"):
+        conn = FakeAsyncConnection(
+            [[portfolio], [{"uuid": "p1", "balance_cents": 0}], [{"uuid": "tx"}]]
+        )
+        trades = mixin(AsyncTrades, FakeAsyncPool(conn))
+        return asyncio.run(trades.execute_trade("u1", "p1", "AAPL", action, 2, 50))
+
+    def test_trade(self):
+        """Test a trade returns the updated portfolio, holding and the transaction"""
+
+        trade = self.trade({"owner": "u1", "balance_cents": 100})
+        self.assertEqual(trade["transaction"], {"uuid": "tx"})
+        self.assertEqual(trade["portfolio"]["balance_cents"], 0)
+        self.assertEqual(
+            trade["holding"],
+            {"symbol": "AAPL", "quantity": 2, "cost_basis_cents": 100},
+        )
+
+    def test_rejected(self):
+        """Test rejected trades raise the same errors as the sync twin"""
+
+        for portfolio, error in [
+            (None, TRADE_ERRORS.PORTFOLIO_NOT_FOUND),
+            ({"owner": "u2", "balance_cents": 100}, TRADE_ERRORS.PORTFOLIO_FORBIDDEN),
+            ({"owner": "u1", "balance_cents": 99}, TRADE_ERRORS.INSUFFICIENT_FUNDS),
+        ]:
+            with self.assertRaises(ValueError) as raised:
+                self.trade(portfolio)
+            self.assertEqual(raised.exception.args[0], error)
+
+    def test_insufficient_holdings(self):
+        """Test a sell of more than is held is rejected"""
+
+        AsyncTrades.holding_applied = None
+        self.addCleanup(setattr, AsyncTrades, "holding_applied", (2, 100))
+        with self.assertRaises(ValueError) as raised:
+            self.trade({"owner": "u1", "balance_cents": 0}, action="SELL")
+        self.assertEqual(raised.exception.args[0], TRADE_ERRORS.INSUFFICIENT_HOLDINGS)
+
+
+class TestLoaderBatch(unittest.TestCase):
+    def test_batch(self):
+        """Test rows are keyed by uuid and a failed fetch raises instead of loading as missing"""
+
+        async def fetch(uuids):
+            return [{"uuid": uuid} for uuid in uuids if uuid != "missing"]
+
+        async def fail(uuids):
+            return None
+
+        self.assertEqual(
+            asyncio.run(batch(fetch)(["a", "missing"])), {"a": {"uuid": "a"}}
+        )
+        with self.assertRaises(RuntimeError):
+            asyncio.run(batch(fail)(["a"]))
+
+
+class TestColumns(unittest.TestCase):
+    def test_columns(self):
+        """Test rows are transposed into one list per column"""
+
+        self.assertEqual(columns([(1, "a"), (2, "b")], 2), ([1, 2], ["a", "b"]))
+        self.assertEqual(columns([], 3), ([], [], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
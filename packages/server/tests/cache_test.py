@@ -0,0 +1,96 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Test for the Cache class
+
+import time
+import unittest
+
+from src.helpers.cache import Cache
+
+
+class TestCacheMethods(unittest.TestCase):
+    def test_get_set(self):
+        cache = Cache(2)
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertTrue(cache.has("a"))
+        self.assertFalse(cache.has("b"))
+
+    def test_set_replaces_value(self):
+        cache = Cache(2)
+        cache.set("a", 1)
+        cache.set("a", 2)
+        self.assertEqual(cache.get("a"), 2)
+        self.assertEqual(cache.stats()["size"], 1)
+
+    def test_lru_eviction(self):
+        cache = Cache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_expiry(self):
+        cache = Cache(2, 0.01)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=60)
+        time.sleep(0.02)
+        self.assertFalse(cache.has("a"))
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_get_stale(self):
+        cache = Cache(2, 0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get_stale("a"), 1)
+        self.assertIsNone(cache.get_stale("b"))
+
+    def test_ttl_and_keys(self):
+        cache = Cache(3, 0.01)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=60)
+        self.assertEqual(cache.ttl("c"), 0)
+        self.assertGreater(cache.ttl("b"), 59)
+        time.sleep(0.02)
+        self.assertEqual(cache.ttl("a"), 0)
+        self.assertEqual(cache.keys(), ["b"])
+        cache = Cache(1)
+        cache.set("a", 1)
+        self.assertIsNone(cache.ttl("a"))
+
+    def test_reset_expiry_on_set(self):
+        cache = Cache(2, 0.05)
+        cache.set("a", 1)
+        time.sleep(0.03)
+        cache.set("a", 2)
+        time.sleep(0.03)
+        self.assertEqual(cache.get("a"), 2)
+
+    def test_delete_and_clear(self):
+        cache = Cache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.delete("a")
+        self.assertIsNone(cache.get("a"))
+        cache.clear()
+        self.assertIsNone(cache.get("b"))
+
+    def test_stats(self):
+        cache = Cache(2)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("b")
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
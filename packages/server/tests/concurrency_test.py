@@ -0,0 +1,37 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Test for the ConcurrencyLimiter class
+
+import unittest
+
+from src.helpers.concurrency import ConcurrencyLimiter
+
+
+class TestConcurrencyLimiterMethods(unittest.TestCase):
+    def test_limit(self):
+        limiter = ConcurrencyLimiter()
+        self.assertTrue(limiter.acquire({"a": 2}))
+        self.assertTrue(limiter.acquire({"a": 2}))
+        self.assertFalse(limiter.acquire({"a": 2}))
+        limiter.release(["a"])
+        self.assertTrue(limiter.acquire({"a": 2}))
+
+    def test_all_or_nothing(self):
+        limiter = ConcurrencyLimiter()
+        self.assertTrue(limiter.acquire({"user": 1, "ip": 2}))
+        self.assertFalse(limiter.acquire({"user": 1, "ip": 2}))
+        self.assertTrue(limiter.acquire({"other": 1, "ip": 2}))
+        self.assertFalse(limiter.acquire({"third": 1, "ip": 2}))
+        self.assertEqual(limiter.active, {"user": 1, "other": 1, "ip": 2})
+
+    def test_release(self):
+        limiter = ConcurrencyLimiter()
+        limiter.acquire({"a": 1, "b": 1})
+        limiter.release(["a", "b"])
+        self.assertEqual(limiter.active, {})
+        stats = limiter.stats()
+        self.assertEqual(stats["acquired"], 1)
+        self.assertEqual(stats["rejected"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
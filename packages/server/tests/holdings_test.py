@@ -0,0 +1,259 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Testcases for the holdings table maintenance
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.database import migrations
+from services.database.mixins.holdings import (
+    HoldingsMixin,
+    held_positions,
+    replay_ledger,
+    write_holdings,
+)
+from services.database.statements import columns
+
+
+class PreparingCursor:
+    """A cursor which runs named statements as the queries they were prepared from"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.executed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, query, params=None):
+        query = " ".join(query.split())
+        if query.startswith("PREPARE "):
+            name, _, prepared = query[len("PREPARE ") :].partition(" AS ")
+            self.connection.prepared[name] = prepared
+            return
+        if query.startswith("EXECUTE "):
+            query = self.connection.prepared[query.split()[1]]
+        self.executed.append((query, params))
+        self.run(query, params)
+
+    def run(self, query, params):
+        pass
+
+
+class FakeHoldingsCursor(PreparingCursor):
+    """A cursor which runs the holdings statements against an in-memory table"""
+
+    def __init__(self):
+        super().__init__(FakeConnection([]))
+        self.table = {}
+        self.row = None
+
+    def returning(self, key, position):
+        self.table[key] = position
+        self.row = {"quantity": position[0], "cost_basis_cents": position[1]}
+
+    def fetchone(self):
+        return self.row
+
+    def run(self, query, params):
+        self.row = None
+        if query.startswith("INSERT INTO holdings"):
+            portfolio, symbol, quantity, price_cents = params
+            held, cost_basis = self.table.get((portfolio, symbol), (0, 0))
+            self.returning(
+                (portfolio, symbol), (held + quantity, cost_basis + price_cents)
+            )
+        elif query.startswith("UPDATE holdings"):
+            quantity, _, portfolio, symbol, _ = params
+            held, cost_basis = self.table.get((portfolio, symbol), (0, 0))
+            if (portfolio, symbol) not in self.table or held < quantity:
+                return
+            cost_basis -= cost_basis * quantity // held
+            self.returning((portfolio, symbol), (held - quantity, cost_basis))
+        elif query.startswith("DELETE FROM holdings WHERE"):
+            key = tuple(params)
+            if self.table.get(key, (None,))[0] == 0:
+                del self.table[key]
+
+
+class FakeLedgerCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.itersize = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, query, params=None):
+        self.query = query
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class FakeConnection:
+    def __init__(self, ledger):
+        self.ledger = ledger
+        self.prepared = {}
+        self.commits = 0
+
+    def cursor(self, name=None):
+        if name is not None:
+            return FakeLedgerCursor(self.ledger)
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+
+class FakeCursor(PreparingCursor):
+    pass
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+        self.returned = []
+
+    def getconn(self):
+        return self.conn
+
+    def putconn(self, conn):
+        self.returned.append(conn)
+
+
+LEDGER = [
+    ("p1", "AAPL", "BUY", 10, 1000),
+    ("p1", "AAPL", "BUY", 10, 3000),
+    ("p1", "AAPL", "SELL", 5, 1200),
+    ("p1", "MSFT", "BUY", 2, 600),
+    ("p1", "MSFT", "SELL", 2, 700),
+    ("p2", "AAPL", "BUY", 1, 150),
+]
+
+
+class TestReplayLedger(unittest.TestCase):
+    def test_replay(self):
+        """Test the ledger is replayed with the average cost method"""
+
+        self.assertEqual(
+            held_positions(replay_ledger(LEDGER)),
+            [("p1", "AAPL", 15, 3000), ("p2", "AAPL", 1, 150)],
+        )
+
+    def test_sold_off_positions_are_dropped(self):
+        """Test a position sold down to zero is not written"""
+
+        positions = replay_ledger(LEDGER)
+        self.assertEqual(positions[("p1", "MSFT")], (0, 0))
+        self.assertNotIn("MSFT", [row[1] for row in held_positions(positions)])
+
+    def test_oversold_clamps_at_zero(self):
+        """Test a sell of more than is held leaves nothing instead of a negative position"""
+
+        positions = replay_ledger(
+            [
+                ("p1", "AAPL", "BUY", 2, 200),
+                ("p1", "AAPL", "SELL", 5, 600),
+                ("p1", "AAPL", "BUY", 1, 120),
+            ]
+        )
+        self.assertEqual(positions[("p1", "AAPL")], (1, 120))
+
+    def test_continues_replay(self):
+        """Test a replay can continue from the positions of a previous batch"""
+
+        positions = replay_ledger(LEDGER[:2])
+        replay_ledger(LEDGER[2:], positions)
+        self.assertEqual(positions, replay_ledger(LEDGER))
+
+
+class TestApplyHolding(unittest.TestCase):
+    def setUp(self):
+        self.cursor = FakeHoldingsCursor()
+        self.mixin = HoldingsMixin()
+
+    def apply(self, action, quantity, price_cents):
+        return self.mixin._apply_holding(
+            self.cursor, "p1", "AAPL", action, quantity, price_cents
+        )
+
+    def test_buy(self):
+        """Test buys add to the quantity and cost basis and return the updated position"""
+
+        self.assertEqual(self.apply("BUY", 10, 1000), (10, 1000))
+        self.assertEqual(self.apply("BUY", 10, 3000), (20, 4000))
+        self.assertEqual(self.cursor.table[("p1", "AAPL")], (20, 4000))
+
+    def test_partial_sell(self):
+        """Test a sell reduces the cost basis proportionally"""
+
+        self.apply("BUY", 20, 4000)
+        self.assertEqual(self.apply("SELL", 5, 1200), (15, 3000))
+        self.assertEqual(self.cursor.table[("p1", "AAPL")], (15, 3000))
+
+    def test_sell_to_zero_deletes(self):
+        """Test selling the whole position deletes the holding"""
+
+        self.apply("BUY", 10, 1000)
+        self.assertEqual(self.apply("SELL", 10, 1100), (0, 0))
+        self.assertEqual(self.cursor.table, {})
+
+    def test_oversell_rejected(self):
+        """Test a sell of more than is held, or of nothing, is rejected"""
+
+        self.assertIsNone(self.apply("SELL", 1, 100))
+        self.apply("BUY", 2, 200)
+        self.assertIsNone(self.apply("SELL", 3, 300))
+        self.assertEqual(self.cursor.table[("p1", "AAPL")], (2, 200))
+
+
+class TestRebuildHoldings(unittest.TestCase):
+    def test_write_holdings(self):
+        """Test the table is locked, cleared and refilled from the ledger in one insert"""
+
+        cursor = FakeCursor(FakeConnection(LEDGER))
+        self.assertEqual(write_holdings(cursor), 2)
+        queries = [query for query, _ in cursor.executed]
+        self.assertEqual(
+            queries[:2],
+            ["LOCK TABLE transactions IN SHARE MODE", "DELETE FROM holdings"],
+        )
+        self.assertEqual(len(queries), 3)
+        self.assertTrue(queries[2].startswith("INSERT INTO holdings"))
+        self.assertEqual(
+            cursor.executed[2][1],
+            columns(held_positions(replay_ledger(LEDGER)), 4),
+        )
+
+    def test_rebuild_holdings(self):
+        """Test a rebuild commits and returns the connection"""
+
+        conn = FakeConnection(LEDGER)
+        mixin = HoldingsMixin()
+        mixin.connectionPool = FakePool(conn)
+        self.assertEqual(mixin.rebuild_holdings(), 2)
+        self.assertEqual(conn.commits, 1)
+        self.assertEqual(mixin.connectionPool.returned, [conn])
+
+    def test_migration_backfills(self):
+        """Test the migration which creates the table fills it from an existing ledger"""
+
+        cursor = FakeCursor(FakeConnection(LEDGER))
+        migrations.holdings_table(cursor)
+        queries = [query for query, _ in cursor.executed]
+        self.assertTrue(queries[0].startswith("CREATE TABLE"))
+        self.assertIn("DELETE FROM holdings", queries)
+        self.assertEqual(cursor.executed[-1][1][1], ["AAPL", "AAPL"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Test for the Leaderboard class
+
+import random
+import unittest
+
+from src.helpers.leaderboard import Leaderboard
+
+
+class TestLeaderboardMethods(unittest.TestCase):
+    def test_rank(self):
+        board = Leaderboard()
+        board.update("a", 100)
+        board.update("b", 300)
+        board.update("c", 200)
+        self.assertEqual(board.rank("b"), 1)
+        self.assertEqual(board.rank("c"), 2)
+        self.assertEqual(board.rank("a"), 3)
+        self.assertIsNone(board.rank("d"))
+        self.assertEqual(len(board), 3)
+
+    def test_update(self):
+        board = Leaderboard()
+        board.update("a", 100)
+        board.update("b", 200)
+        board.update("a", 300)
+        self.assertEqual(board.rank("a"), 1)
+        self.assertEqual(board.score("a"), 300)
+        self.assertEqual(len(board), 2)
+
+    def test_ties(self):
+        board = Leaderboard()
+        board.update("b", 100)
+        board.update("a", 100)
+        self.assertEqual(board.top(2), [(1, "a", 100), (2, "b", 100)])
+
+    def test_remove(self):
+        board = Leaderboard()
+        for key, score in [("a", 1), ("b", 2), ("c", 3)]:
+            board.update(key, score)
+        board.remove("b")
+        board.remove("missing")
+        self.assertNotIn("b", board)
+        self.assertEqual(board.top(10), [(1, "c", 3), (2, "a", 1)])
+
+    def test_top(self):
+        board = Leaderboard()
+        for i in range(10):
+            board.update(i, i * 10)
+        self.assertEqual(board.top(3), [(1, 9, 90), (2, 8, 80), (3, 7, 70)])
+        self.assertEqual(board.top(2, offset=8), [(9, 1, 10), (10, 0, 0)])
+        self.assertEqual(board.top(5, offset=20), [])
+
+    def test_random(self):
+        board = Leaderboard()
+        scores = {}
+        rng = random.Random(42)
+        for _ in range(2000):
+            key = rng.randrange(200)
+            if rng.random() < 0.2:
+                board.remove(key)
+                scores.pop(key, None)
+            else:
+                score = rng.randrange(50)
+                board.update(key, score)
+                scores[key] = score
+
+        expected = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        self.assertEqual(
+            board.top(len(scores)),
+            [(rank, key, score) for rank, (key, score) in enumerate(expected, 1)],
+        )
+        for rank, (key, _) in enumerate(expected, 1):
+            self.assertEqual(board.rank(key), rank)
+        self.assertEqual(board.top(7, offset=13), board.top(len(scores))[13:20])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Test for the Loader class
+
+import asyncio
+import unittest
+
+from src.helpers.loader import Loader
+
+
+class TestLoaderMethods(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.calls = []
+
+        async def batch_load(keys):
+            self.calls.append(list(keys))
+            return {key: key * 10 for key in keys if key > 0}
+
+        self.loader = Loader(batch_load, max_batch_size=3)
+
+    async def test_memoize(self):
+        self.assertEqual(await self.loader.load(1), 10)
+        self.assertEqual(await self.loader.load(1), 10)
+        self.assertEqual(self.calls, [[1]])
+
+    async def test_batch(self):
+        values = await asyncio.gather(
+            self.loader.load(1), self.loader.load(2), self.loader.load(1)
+        )
+        self.assertEqual(values, [10, 20, 10])
+        self.assertEqual(self.calls, [[1, 2]])
+
+    async def test_load_many(self):
+        values = await self.loader.load_many([1, 2, 3, 4, -1])
+        self.assertEqual(values, [10, 20, 30, 40, None])
+        self.assertEqual(self.calls, [[1, 2, 3], [4, -1]])
+
+    async def test_prime_and_clear(self):
+        self.loader.prime(1, "primed")
+        self.assertEqual(await self.loader.load(1), "primed")
+        self.loader.clear(1)
+        self.assertEqual(await self.loader.load(1), 10)
+        self.assertEqual(self.calls, [[1]])
+
+    async def test_failure(self):
+        async def batch_load(keys):
+            self.calls.append(list(keys))
+            if len(self.calls) == 1:
+                raise RuntimeError("down")
+            return {key: key for key in keys}
+
+        loader = Loader(batch_load)
+        with self.assertRaises(RuntimeError):
+            await loader.load(1)
+        self.assertEqual(await loader.load(1), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,213 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Testcases for the Migrator class
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.database import migrations
+from services.database.migrations import Migration, MigrationError, Migrator
+
+
+class FakeServer:
+    def __init__(self, versions=None, lock_busy_for=0):
+        # None until the schema_version table exists
+        self.versions = versions
+        self.lock_busy_for = lock_busy_for
+        self.lock_attempts = 0
+        self.locked = False
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.server = conn.server
+        self.result = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, query, params=None):
+        server = self.server
+        query = " ".join(query.split())
+        self.conn.executed.append(query)
+        if query.startswith("SELECT to_regclass('schema_version')"):
+            self.result = (server.versions is not None,)
+        elif query.startswith("SELECT COALESCE(MAX(version), 0)"):
+            pending = self.conn.pending
+            self.result = (max(server.versions + pending, default=0),)
+        elif query.startswith("CREATE TABLE IF NOT EXISTS schema_version"):
+            if server.versions is None:
+                server.versions = []
+        elif query.startswith("SELECT pg_try_advisory_lock"):
+            server.lock_attempts += 1
+            acquired = server.lock_attempts > server.lock_busy_for
+            server.locked = server.locked or acquired
+            self.result = (acquired,)
+        elif query.startswith("SELECT pg_advisory_unlock"):
+            server.locked = False
+            self.result = (True,)
+        elif query.startswith("INSERT INTO schema_version"):
+            if self.conn.autocommit:
+                server.versions.append(params[0])
+            else:
+                self.conn.pending.append(params[0])
+
+    def fetchone(self):
+        return self.result
+
+
+class FakeConnection:
+    def __init__(self, server):
+        self.server = server
+        self.autocommit = False
+        self.closed = 0
+        self.executed = []
+        self.pending = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.server.versions.extend(self.pending)
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+    def close(self):
+        self.closed = 1
+
+
+class TestMigrator(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.fail_at = None
+        self.server = FakeServer()
+        self.connections = []
+
+        def connect(*args, **kwargs):
+            conn = FakeConnection(self.server)
+            self.connections.append(conn)
+            return conn
+
+        def step(name):
+            def apply(cursor):
+                self.calls.append(name)
+                if self.fail_at == name:
+                    raise RuntimeError(f"{name} failed")
+
+            return apply
+
+        def build_indexes(cursor):
+            step("index a")(cursor)
+            step("index b")(cursor)
+
+        for patcher in [
+            mock.patch("psycopg2.connect", side_effect=connect),
+            mock.patch.object(
+                migrations,
+                "MIGRATIONS",
+                [
+                    Migration(1, "Initial schema", step("schema")),
+                    Migration(2, "Indexes", build_indexes, transactional=False),
+                    Migration(3, "Table", step("table")),
+                ],
+            ),
+            mock.patch("time.sleep"),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_fresh_database(self):
+        """Test every migration is applied in order on a new database"""
+
+        self.assertEqual(Migrator.migrate("uri"), 3)
+        self.assertEqual(self.calls, ["schema", "index a", "index b", "table"])
+        self.assertEqual(self.server.versions, [1, 2, 3])
+        self.assertFalse(self.server.locked)
+        self.assertTrue(self.connections[0].closed)
+
+    def test_current_database(self):
+        """Test a current schema is left alone without taking the lock"""
+
+        self.server.versions = [1, 2, 3]
+        self.assertEqual(Migrator.migrate("uri"), 0)
+        self.assertEqual(self.calls, [])
+        self.assertEqual(self.server.lock_attempts, 0)
+        self.assertFalse(
+            any(query.startswith("CREATE") for query in self.connections[0].executed)
+        )
+
+    def test_applies_pending_only(self):
+        """Test only the migrations newer than the schema are applied"""
+
+        self.server.versions = [1]
+        self.assertEqual(Migrator.migrate("uri"), 2)
+        self.assertEqual(self.calls, ["index a", "index b", "table"])
+        self.assertEqual(self.server.versions, [1, 2, 3])
+
+    def test_polls_for_lock(self):
+        """Test a worker polls for the lock instead of blocking on it"""
+
+        self.server.lock_busy_for = 3
+        self.assertEqual(Migrator.migrate("uri"), 3)
+        self.assertEqual(self.server.lock_attempts, 4)
+        executed = self.connections[0].executed
+        self.assertFalse(any("pg_advisory_lock(" in query for query in executed))
+
+    def test_rechecks_version_after_lock(self):
+        """Test a worker which waited finds the migrations applied by another one"""
+
+        self.server.lock_busy_for = 1
+        original = FakeCursor.execute
+
+        def execute(cursor, query, params=None):
+            # Another worker migrates while this one waits for the lock
+            if (
+                query.startswith("SELECT pg_try_advisory_lock")
+                and not cursor.server.locked
+            ):
+                cursor.server.versions = [1, 2, 3]
+            return original(cursor, query, params)
+
+        with mock.patch.object(FakeCursor, "execute", execute):
+            self.assertEqual(Migrator.migrate("uri"), 0)
+        self.assertEqual(self.calls, [])
+
+    def test_failed_non_transactional_step(self):
+        """Test a step which fails halfway is not recorded and is re-run in full"""
+
+        self.fail_at = "index b"
+        with self.assertRaises(MigrationError):
+            Migrator.migrate("uri")
+        self.assertEqual(self.calls, ["schema", "index a", "index b"])
+        self.assertEqual(self.server.versions, [1])
+        self.assertFalse(self.server.locked)
+        self.assertTrue(self.connections[0].closed)
+
+        self.fail_at = None
+        self.calls.clear()
+        self.assertEqual(Migrator.migrate("uri"), 2)
+        self.assertEqual(self.calls, ["index a", "index b", "table"])
+        self.assertEqual(self.server.versions, [1, 2, 3])
+
+    def test_failed_transactional_step(self):
+        """Test a failed transactional migration is rolled back with its version"""
+
+        self.fail_at = "table"
+        with self.assertRaises(MigrationError):
+            Migrator.migrate("uri")
+        self.assertEqual(self.server.versions, [1, 2])
+        self.assertTrue(self.connections[0].autocommit)
+        self.assertFalse(self.server.locked)
+
+
+if __name__ == "__main__":
+    unittest.main()
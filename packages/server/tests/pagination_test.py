@@ -0,0 +1,50 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Test for the Pagination class
+
+import unittest
+from datetime import datetime, timezone
+
+from src.helpers.pagination import Pagination
+
+
+class TestPaginationMethods(unittest.TestCase):
+    def test_round_trip(self):
+        created_at = datetime(2024, 4, 1, 14, 0, 5, 123456, tzinfo=timezone.utc)
+        uuid = "7b4a6ee5-73fe-4de5-9944-c49009057911"
+        cursor = Pagination.encode_cursor(created_at, uuid)
+        self.assertNotIn("=", cursor)
+        self.assertEqual(Pagination.decode_cursor(cursor), (created_at, uuid))
+
+    def test_decode_invalid(self):
+        self.assertIsNone(Pagination.decode_cursor(""))
+        self.assertIsNone(Pagination.decode_cursor("not a cursor"))
+        self.assertIsNone(Pagination.decode_cursor("e30"))
+        cursor = Pagination.encode_cursor(datetime(2024, 4, 1), "not a uuid")
+        self.assertIsNone(Pagination.decode_cursor(cursor))
+
+    def test_page(self):
+        rows = [
+            {
+                "created_at": datetime(2024, 4, 1, hour),
+                "uuid": f"{hour:08d}-0000-4000-8000-000000000000",
+            }
+            for hour in range(3)
+        ]
+        page, cursor = Pagination.page(rows, 2)
+        self.assertEqual(page, rows[:2])
+        self.assertEqual(
+            Pagination.decode_cursor(cursor),
+            (rows[1]["created_at"], rows[1]["uuid"]),
+        )
+
+        page, cursor = Pagination.page(rows[:2], 2)
+        self.assertEqual(page, rows[:2])
+        self.assertIsNone(cursor)
+
+        page, cursor = Pagination.page(rows[:1], 0)
+        self.assertEqual(page, [])
+        self.assertIsNone(cursor)
+
+
+if __name__ == "__main__":
+    unittest.main()
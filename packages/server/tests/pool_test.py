@@ -0,0 +1,270 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Testcases for the BlockingConnectionPool class
+
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.database.pool import BlockingConnectionPool
+
+
+class FakeInfo:
+    def __init__(self):
+        self.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.info = FakeInfo()
+        self.rollbacks = 0
+        self.fail_rollback = False
+
+    def close(self):
+        self.closed = 1
+
+    def rollback(self):
+        if self.fail_rollback:
+            raise psycopg2.OperationalError("connection lost")
+        self.rollbacks += 1
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class TestBlockingConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.connections = []
+        self.fail_connect = False
+        patcher = mock.patch("psycopg2.connect", side_effect=self.connect)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def connect(self, *args, **kwargs):
+        if self.fail_connect:
+            raise psycopg2.OperationalError("could not connect")
+        conn = FakeConnection()
+        self.connections.append(conn)
+        return conn
+
+    def test_opens_min_connections(self):
+        """Test the minimum number of connections is opened up front and reused"""
+
+        pool = BlockingConnectionPool(2, 4)
+        self.assertEqual(len(self.connections), 2)
+
+        conn = pool.getconn()
+        self.assertIn(conn, self.connections)
+        pool.putconn(conn)
+        self.assertIs(pool.getconn(), conn)
+        self.assertEqual(len(self.connections), 2)
+
+        stats = pool.stats()
+        self.assertEqual(stats["size"], 2)
+        self.assertEqual(stats["in_use"], 1)
+        self.assertEqual(stats["checkouts"], 2)
+
+    def test_grows_up_to_max(self):
+        """Test connections are opened on demand up to the maximum"""
+
+        pool = BlockingConnectionPool(0, 2)
+        first, second = pool.getconn(), pool.getconn()
+        self.assertIsNot(first, second)
+        self.assertEqual(pool.stats()["size"], 2)
+
+    def test_timeout(self):
+        """Test checking out from an exhausted pool times out and is counted"""
+
+        pool = BlockingConnectionPool(0, 1)
+        pool.getconn()
+
+        start = time.monotonic()
+        with self.assertRaises(PoolError):
+            pool.getconn(timeout=0.05)
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        self.assertEqual(pool.stats()["exhausted"], 1)
+        self.assertEqual(pool.stats()["waiting"], 0)
+
+    def test_wakes_waiter(self):
+        """Test a waiting thread receives a connection as soon as one is returned"""
+
+        pool = BlockingConnectionPool(0, 1)
+        conn = pool.getconn()
+        result = {}
+
+        def wait():
+            result["conn"] = pool.getconn(timeout=5)
+
+        thread = threading.Thread(target=wait)
+        thread.start()
+        deadline = time.monotonic() + 1
+        while pool.stats()["waiting"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        self.assertEqual(pool.stats()["waiting"], 1)
+
+        pool.putconn(conn)
+        thread.join(1)
+        self.assertFalse(thread.is_alive())
+        self.assertIs(result["conn"], conn)
+        self.assertEqual(pool.stats()["exhausted"], 0)
+
+    def test_contention(self):
+        """Test many threads never check out more than the maximum number of connections"""
+
+        pool = BlockingConnectionPool(0, 3)
+        lock = threading.Lock()
+        in_use = set()
+        peak = [0]
+        errors = []
+
+        def work():
+            for _ in range(50):
+                try:
+                    conn = pool.getconn(timeout=5)
+                except PoolError as e:
+                    errors.append(e)
+                    return
+                with lock:
+                    self.assertNotIn(id(conn), in_use)
+                    in_use.add(id(conn))
+                    peak[0] = max(peak[0], len(in_use))
+                time.sleep(0.0005)
+                with lock:
+                    in_use.discard(id(conn))
+                pool.putconn(conn)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+
+        self.assertEqual(errors, [])
+        self.assertLessEqual(peak[0], 3)
+        self.assertLessEqual(len(self.connections), 3)
+        stats = pool.stats()
+        self.assertEqual(stats["checkouts"], 400)
+        self.assertEqual(stats["in_use"], 0)
+        self.assertEqual(stats["idle"], stats["size"])
+
+    def test_failed_connect_releases_slot(self):
+        """Test a connection which fails to open does not use up a slot"""
+
+        pool = BlockingConnectionPool(0, 1)
+        self.fail_connect = True
+        with self.assertRaises(psycopg2.OperationalError):
+            pool.getconn()
+        self.assertEqual(pool.stats()["size"], 0)
+
+        self.fail_connect = False
+        self.assertIsNotNone(pool.getconn(timeout=0.05))
+
+    def test_replaces_expired(self):
+        """Test a connection older than the maximum lifetime is replaced on checkout"""
+
+        pool = BlockingConnectionPool(1, 1, max_lifetime=0.01)
+        old = self.connections[0]
+        time.sleep(0.02)
+
+        conn = pool.getconn()
+        self.assertIsNot(conn, old)
+        self.assertTrue(old.closed)
+        self.assertEqual(pool.stats()["size"], 1)
+
+    def test_replaces_broken(self):
+        """Test closed connections and connections in an unknown state are not kept"""
+
+        pool = BlockingConnectionPool(0, 2)
+        closed, unknown = pool.getconn(), pool.getconn()
+        closed.close()
+        unknown.info.transaction_status = extensions.TRANSACTION_STATUS_UNKNOWN
+        pool.putconn(closed)
+        pool.putconn(unknown)
+
+        self.assertTrue(unknown.closed)
+        self.assertEqual(pool.stats()["size"], 0)
+        conn = pool.getconn()
+        self.assertNotIn(conn, (closed, unknown))
+
+    def test_rollback_on_putconn(self):
+        """Test an open transaction is rolled back when a connection is returned"""
+
+        pool = BlockingConnectionPool(0, 1)
+        conn = pool.getconn()
+        conn.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+        pool.putconn(conn)
+        self.assertEqual(conn.rollbacks, 1)
+        self.assertFalse(conn.closed)
+        self.assertIs(pool.getconn(), conn)
+
+    def test_failed_rollback_closes(self):
+        """Test a connection which cannot be rolled back is closed"""
+
+        pool = BlockingConnectionPool(0, 1)
+        conn = pool.getconn()
+        conn.info.transaction_status = extensions.TRANSACTION_STATUS_INERROR
+        conn.fail_rollback = True
+        pool.putconn(conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()["size"], 0)
+
+    def test_putconn_unknown(self):
+        """Test returning a connection which was not checked out fails"""
+
+        pool = BlockingConnectionPool(0, 1)
+        with self.assertRaises(PoolError):
+            pool.putconn(FakeConnection())
+
+    def test_closeall(self):
+        """Test closing the pool closes every connection, including checked out ones"""
+
+        pool = BlockingConnectionPool(1, 2)
+        idle = self.connections[0]
+        used = pool.getconn()
+        other = pool.getconn()
+        pool.putconn(other)
+
+        pool.closeall()
+        self.assertTrue(idle.closed)
+        self.assertTrue(used.closed)
+        self.assertEqual(pool.stats()["size"], 0)
+
+        # Returning a connection after the pool is closed is harmless
+        pool.putconn(used)
+        with self.assertRaises(PoolError):
+            pool.getconn()
+
+    def test_closeall_wakes_waiters(self):
+        """Test threads waiting for a connection fail once the pool is closed"""
+
+        pool = BlockingConnectionPool(0, 1)
+        pool.getconn()
+        errors = []
+
+        def wait():
+            try:
+                pool.getconn(timeout=5)
+            except PoolError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=wait)
+        thread.start()
+        deadline = time.monotonic() + 1
+        while pool.stats()["waiting"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+        pool.closeall()
+        thread.join(1)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -49,6 +49,41 @@ class TestQuoteMethods(unittest.TestCase):
         with self.assertRaises(ValueError):
             Quote.get_historical_quotes(symbol, start_time, end_time, invalid_interval)
 
+    def test_get_missing_ranges(self):
+        """Test get_missing_ranges with partially covered ranges"""
+        d = [datetime(2024, 3, day) for day in range(1, 11)]
+        self.assertEqual(Quote.get_missing_ranges([], d[0], d[5]), [(d[0], d[5])])
+        self.assertEqual(
+            Quote.get_missing_ranges([(d[6], d[8]), (d[1], d[3])], d[0], d[9]),
+            [(d[0], d[1]), (d[3], d[6]), (d[8], d[9])],
+        )
+        self.assertEqual(
+            Quote.get_missing_ranges([(d[0], d[4]), (d[2], d[9])], d[1], d[8]), []
+        )
+        self.assertEqual(
+            Quote.get_missing_ranges([(d[0], d[2])], d[2], d[4]), [(d[2], d[4])]
+        )
+
+    def test_valid_symbols(self):
+        """Test well-formed tickers are accepted"""
+        for symbol in ["A", "AAPL", "BRK.B", "GOOGL"]:
+            self.assertTrue(Quote.is_valid_symbol(symbol))
+
+    def test_invalid_symbols(self):
+        """Test malformed tickers which could rewrite upstream queries are rejected"""
+        for symbol in [
+            "",
+            "aapl",
+            "AAPL&feed=sip",
+            "X#",
+            ".A",
+            "A B",
+            "ABCDEFGHIJK",
+            "AAPL\n",
+            "É",
+        ]:
+            self.assertFalse(Quote.is_valid_symbol(symbol))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,63 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Test for the RateLimiter class
+
+import threading
+import time
+import unittest
+
+from src.helpers.ratelimiter import RateLimiter
+
+
+class TestRateLimiterMethods(unittest.TestCase):
+    def test_burst(self):
+        limiter = RateLimiter(2, 60)
+        self.assertTrue(limiter.acquire(timeout=0))
+        self.assertTrue(limiter.acquire(timeout=0))
+        self.assertFalse(limiter.acquire(timeout=0))
+
+    def test_refill(self):
+        limiter = RateLimiter(1, 0.05)
+        self.assertTrue(limiter.acquire(timeout=0))
+        self.assertFalse(limiter.acquire(timeout=0))
+        self.assertTrue(limiter.acquire(timeout=1))
+
+    def test_deadline(self):
+        limiter = RateLimiter(1, 60)
+        limiter.acquire()
+        start = time.monotonic()
+        self.assertFalse(limiter.acquire(timeout=0.05))
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        stats = limiter.stats()
+        self.assertEqual(stats["acquired"], 1)
+        self.assertEqual(stats["rejected"], 1)
+        self.assertEqual(stats["waiting"], 0)
+
+    def test_priority(self):
+        limiter = RateLimiter(1, 0.1)
+        limiter.acquire()
+        order = []
+
+        def acquire(name, priority):
+            limiter.acquire(priority, timeout=5)
+            order.append(name)
+
+        low = threading.Thread(target=acquire, args=("low", RateLimiter.PRIORITY_LOW))
+        low.start()
+        time.sleep(0.01)
+        high = threading.Thread(
+            target=acquire, args=("high", RateLimiter.PRIORITY_HIGH)
+        )
+        high.start()
+        low.join()
+        high.join()
+        self.assertEqual(order, ["high", "low"])
+
+    def test_penalize(self):
+        limiter = RateLimiter(100, 1)
+        limiter.penalize(0.1)
+        self.assertFalse(limiter.acquire(timeout=0.05))
+        self.assertTrue(limiter.acquire(timeout=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Test for the Resampler class
+
+import unittest
+from datetime import datetime, timezone
+
+import numpy as np
+
+from src.helpers.resample import Resampler
+
+
+def utc(*args) -> np.datetime64:
+    return np.datetime64(datetime(*args), "ns")
+
+
+class TestResamplerMethods(unittest.TestCase):
+    def test_resample_trades_minute(self):
+        timestamps = np.array(
+            [
+                utc(2024, 4, 1, 14, 0, 5),
+                utc(2024, 4, 1, 14, 0, 50),
+                utc(2024, 4, 1, 14, 2),
+            ]
+        )
+        bars = Resampler.resample_trades(
+            timestamps, np.array([10, 12, 11]), np.array([1, 2, 3]), "MINUTE"
+        )
+        self.assertEqual(
+            list(bars["timestamp"]), [utc(2024, 4, 1, 14, 0), utc(2024, 4, 1, 14, 2)]
+        )
+        self.assertEqual(list(bars["open"]), [10, 11])
+        self.assertEqual(list(bars["high"]), [12, 11])
+        self.assertEqual(list(bars["low"]), [10, 11])
+        self.assertEqual(list(bars["close"]), [12, 11])
+        self.assertEqual(list(bars["volume"]), [3, 3])
+
+    def test_resample_trades_unsorted(self):
+        timestamps = np.array([utc(2024, 4, 1, 14, 0, 50), utc(2024, 4, 1, 14, 0, 5)])
+        bars = Resampler.resample_trades(
+            timestamps, np.array([12, 10]), np.array([1, 1]), "MINUTE"
+        )
+        self.assertEqual(list(bars["open"]), [10])
+        self.assertEqual(list(bars["close"]), [12])
+
+    def test_regular_hours(self):
+        # 13:00 UTC is 09:00 in New York (before the open), 13:45 UTC is 09:45
+        timestamps = np.array(
+            [utc(2024, 4, 1, 13, 0), utc(2024, 4, 1, 13, 45), utc(2024, 4, 1, 14, 40)]
+        )
+        bars = Resampler.resample_trades(
+            timestamps, np.array([1, 2, 3]), np.array([1, 1, 1]), "HOUR", True
+        )
+        self.assertEqual(
+            list(bars["timestamp"]), [utc(2024, 4, 1, 13, 30), utc(2024, 4, 1, 14, 30)]
+        )
+        self.assertEqual(list(bars["open"]), [2, 3])
+
+    def test_day_follows_exchange_timezone(self):
+        # 02:00 UTC on April 2nd is still April 1st in New York
+        timestamps = np.array([utc(2024, 4, 1, 14), utc(2024, 4, 2, 2)])
+        bars = Resampler.resample_trades(
+            timestamps, np.array([1, 2]), np.array([1, 1]), "DAY"
+        )
+        self.assertEqual(list(bars["timestamp"]), [utc(2024, 4, 1, 4)])
+        self.assertEqual(list(bars["close"]), [2])
+
+    def test_resample_bars(self):
+        # Daily bars from Friday to the next Monday, across the end of a month
+        timestamps = np.array(
+            [utc(2024, 3, 29, 4), utc(2024, 4, 1, 4), utc(2024, 4, 2, 4)]
+        )
+        columns = [
+            np.array(values)
+            for values in ([1, 5, 7], [4, 9, 8], [1, 3, 2], [3, 6, 7], [10, 20, 30])
+        ]
+        weeks = Resampler.resample_bars(timestamps, *columns, "WEEK")
+        self.assertEqual(
+            list(weeks["timestamp"]), [utc(2024, 3, 25, 4), utc(2024, 4, 1, 4)]
+        )
+        self.assertEqual(list(weeks["high"]), [4, 9])
+        self.assertEqual(list(weeks["low"]), [1, 2])
+        self.assertEqual(list(weeks["volume"]), [10, 50])
+
+        years = Resampler.resample_bars(timestamps, *columns, "YEAR")
+        self.assertEqual(list(years["timestamp"]), [utc(2024, 1, 1, 5)])
+        self.assertEqual(list(years["open"]), [1])
+        self.assertEqual(list(years["close"]), [7])
+
+    def test_empty_and_invalid(self):
+        bars = Resampler.resample_trades(np.array([], "datetime64[ns]"), [], [], "DAY")
+        self.assertEqual(len(bars["timestamp"]), 0)
+        with self.assertRaises(ValueError):
+            Resampler.resample_trades(np.array([], "datetime64[ns]"), [], [], "INVALID")
+
+    def test_align(self):
+        self.assertEqual(
+            Resampler.align(datetime(2024, 4, 3, 15, tzinfo=timezone.utc), "MONTH"),
+            datetime(2024, 4, 1, 4, tzinfo=timezone.utc),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
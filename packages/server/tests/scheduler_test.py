@@ -0,0 +1,169 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Testcases for the TournamentScheduler class
+
+import asyncio
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.tournaments import scheduler
+from services.tournaments.scheduler import TournamentScheduler
+
+NOW = datetime.now(timezone.utc)
+
+
+class FakeDatabase:
+    def __init__(self, schedule=None, ended=None):
+        self.schedule = schedule if schedule is not None else []
+        self.ended = ended or []
+        self.finished = []
+
+    async def get_tournament_schedule(self):
+        return self.schedule
+
+    async def start_tournaments(self, now):
+        return []
+
+    async def get_ended_tournaments(self, now):
+        return [t for t in self.ended if t not in self.finished]
+
+    async def finish_tournaments(self, standings):
+        self.finished.extend(standings)
+        self.last_standings = standings
+        return list(standings)
+
+
+class FakeLeaderboards:
+    def __init__(self, standings):
+        self.standings = standings
+
+    def get_final_standings(self, tournament):
+        entries = self.standings.get(tournament)
+        return None if entries is None else [dict(entry) for entry in entries]
+
+
+def entries(count: int) -> list[dict]:
+    return [{"rank": rank, "portfolio": f"p{rank}"} for rank in range(1, count + 1)]
+
+
+class TestTournamentScheduler(unittest.TestCase):
+    def patch(self, db, leaderboards=None):
+        patchers = [mock.patch.object(scheduler, "adb", db)]
+        patchers.append(
+            mock.patch.object(
+                scheduler, "LEADERBOARDS", leaderboards or FakeLeaderboards({})
+            )
+        )
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_prunes_passed_dates(self):
+        """Test dates which have passed are dropped from the schedule"""
+
+        self.patch(FakeDatabase())
+        tournaments = TournamentScheduler(first_prize=100)
+        future = NOW + timedelta(hours=1)
+        tournaments.heap = [NOW - timedelta(hours=2), NOW - timedelta(hours=1), future]
+
+        asyncio.run(tournaments.advance())
+        self.assertEqual(tournaments.heap, [future])
+        self.assertEqual(tournaments.get_stats()["runs"], 1)
+
+    def test_pays_prizes_by_rank(self):
+        """Test ended tournaments are finished with prizes assigned by rank"""
+
+        db = FakeDatabase(ended=["t1"])
+        self.patch(db, FakeLeaderboards({"t1": entries(5)}))
+        tournaments = TournamentScheduler(first_prize=100)
+
+        asyncio.run(tournaments.advance())
+        self.assertEqual(db.finished, ["t1"])
+        self.assertEqual(
+            [entry["prize_coins"] for entry in db.last_standings["t1"]],
+            [100, 50, 25, 12, 0],
+        )
+        self.assertEqual(tournaments.get_stats()["finished"], 1)
+
+    def test_retries_unranked(self):
+        """Test tournaments without standings are retried instead of finished"""
+
+        db = FakeDatabase(ended=["t1", "t2"])
+        leaderboards = FakeLeaderboards({"t2": entries(1)})
+        self.patch(db, leaderboards)
+        tournaments = TournamentScheduler(first_prize=100)
+
+        asyncio.run(tournaments.advance())
+        self.assertEqual(db.finished, ["t2"])
+
+        # Nothing is finished while no standings are available
+        asyncio.run(tournaments.advance())
+        self.assertEqual(db.finished, ["t2"])
+        self.assertEqual(tournaments.get_stats()["finished"], 1)
+
+        leaderboards.standings["t1"] = entries(2)
+        asyncio.run(tournaments.advance())
+        self.assertEqual(db.finished, ["t2", "t1"])
+        self.assertEqual(tournaments.get_stats()["finished"], 2)
+
+    def test_resync(self):
+        """Test the schedule is rebuilt from the unfinished tournaments"""
+
+        start, end = NOW + timedelta(hours=1), NOW + timedelta(hours=2)
+        naive = datetime(2030, 1, 1)
+        db = FakeDatabase(
+            schedule=[
+                {"status": "SCHEDULED", "start_date": start, "end_date": end},
+                {"status": "ONGOING", "start_date": NOW, "end_date": naive},
+            ]
+        )
+        self.patch(db)
+        tournaments = TournamentScheduler()
+
+        self.assertTrue(asyncio.run(tournaments.resync()))
+        self.assertEqual(
+            sorted(tournaments.heap),
+            [start, end, naive.replace(tzinfo=timezone.utc)],
+        )
+
+        # A failed reload keeps the current schedule
+        db.schedule = None
+        self.assertFalse(asyncio.run(tournaments.resync()))
+        self.assertEqual(len(tournaments.heap), 3)
+
+    def test_schedule_wakes_loop(self):
+        """Test scheduling a tournament wakes the loop before the next resync"""
+
+        db = FakeDatabase()
+        self.patch(db)
+
+        async def run():
+            tournaments = TournamentScheduler(resync_interval=3600)
+            tournaments.start()
+            try:
+                # Let the first run finish and go to sleep until the next resync
+                for _ in range(100):
+                    await asyncio.sleep(0.001)
+                    if tournaments.runs:
+                        break
+                self.assertEqual(tournaments.runs, 1)
+
+                tournaments.schedule(NOW - timedelta(minutes=1), NOW)
+                for _ in range(100):
+                    await asyncio.sleep(0.001)
+                    if tournaments.runs > 1:
+                        break
+                self.assertEqual(tournaments.runs, 2)
+                self.assertEqual(tournaments.heap, [])
+            finally:
+                await tournaments.stop()
+
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Testcases for the session token cache
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+from contextlib import asynccontextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.database.mixins import sessions
+from services.database.mixins.sessions import (
+    OWNER_TOKENS,
+    SESSION_CACHE,
+    AsyncSessionsMixin,
+    invalidate_sessions,
+    is_denylisted,
+    load_denylist,
+)
+
+
+class FakeCursor:
+    def __init__(self, row):
+        self.row = row
+
+    async def fetchone(self):
+        return self.row
+
+
+class FakeConnection:
+    def __init__(self, sessions, during_read=None):
+        self.sessions = sessions
+        self.during_read = during_read
+        self.reads = 0
+
+    async def execute(self, query, params=None, prepare=None):
+        if query.startswith("DELETE"):
+            self.sessions.pop(params[0], None)
+            return FakeCursor(None)
+
+        self.reads += 1
+        owner = self.sessions.get(params[0])
+        if self.during_read is not None:
+            # Runs after the row was read, before it is cached
+            self.during_read()
+        return FakeCursor(None if owner is None else (owner,))
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def connection(self):
+        yield self.conn
+
+
+class TestSessionCache(unittest.TestCase):
+    def setUp(self):
+        SESSION_CACHE.clear()
+        OWNER_TOKENS.clear()
+        self.conn = FakeConnection({"t1": "u1"})
+        self.sessions = AsyncSessionsMixin()
+        self.sessions.connectionPool = FakePool(self.conn)
+
+    def get(self, token):
+        return asyncio.run(self.sessions.get_session(token))
+
+    def test_hit(self):
+        """Test a token is read from the database once and then from the cache"""
+
+        self.assertEqual(self.get("t1"), "u1")
+        self.assertEqual(self.get("t1"), "u1")
+        self.assertEqual(self.conn.reads, 1)
+
+    def test_negative_caching(self):
+        """Test a token which does not exist is cached as invalid"""
+
+        self.assertIsNone(self.get("t2"))
+        self.assertIsNone(self.get("t2"))
+        self.assertEqual(self.conn.reads, 1)
+
+    def test_logout_invalidates(self):
+        """Test a deleted session is no longer served from the cache"""
+
+        self.assertEqual(self.get("t1"), "u1")
+        self.assertTrue(asyncio.run(self.sessions.delete_session("t1")))
+        self.assertIsNone(self.get("t1"))
+        self.assertEqual(self.conn.reads, 2)
+
+    def test_stale_read_not_cached(self):
+        """Test a lookup racing a logout does not cache the deleted session"""
+
+        self.conn.during_read = lambda: invalidate_sessions(token="t1")
+        self.assertEqual(self.get("t1"), "u1")
+        self.assertFalse(SESSION_CACHE.has("t1"))
+
+        self.conn.during_read = None
+        self.assertEqual(self.get("t1"), "u1")
+        self.assertTrue(SESSION_CACHE.has("t1"))
+
+
+class TestDenylist(unittest.TestCase):
+    def test_load_swaps_snapshot(self):
+        """Test a reload replaces the snapshot instead of mutating the one in use"""
+
+        later = time.time() + 60
+        load_denylist([("a", later)])
+        previous = sessions.REVOKED_TOKENS
+        load_denylist([("b", later)])
+        self.assertEqual(previous, {"a": later})
+        self.assertFalse(is_denylisted("a"))
+        self.assertTrue(is_denylisted("b"))
+
+
+if __name__ == "__main__":
+    unittest.main()
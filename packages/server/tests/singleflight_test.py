@@ -0,0 +1,90 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Testcases for the SingleFlight class
+
+import os
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import Future
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.alpaca.alpaca import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_first_claim_owns(self):
+        """Test the first caller owns every unclaimed key"""
+
+        flight = SingleFlight()
+        owned, waiting = flight.claim(["AAPL", "MSFT"])
+        self.assertEqual(owned, ["AAPL", "MSFT"])
+        self.assertEqual(waiting, {})
+        self.assertEqual(flight.coalesced, 0)
+
+    def test_second_claim_waits(self):
+        """Test a second caller receives the in-flight future instead of ownership"""
+
+        flight = SingleFlight()
+        flight.claim(["AAPL"])
+        owned, waiting = flight.claim(["AAPL", "MSFT"])
+        self.assertEqual(owned, ["MSFT"])
+        self.assertEqual(list(waiting), ["AAPL"])
+        self.assertIsInstance(waiting["AAPL"], Future)
+        self.assertEqual(flight.coalesced, 1)
+
+        _, again = flight.claim(["AAPL"])
+        self.assertIs(again["AAPL"], waiting["AAPL"])
+        self.assertEqual(flight.coalesced, 2)
+
+    def test_resolve_wakes_waiters(self):
+        """Test resolving a key wakes every waiter with its value"""
+
+        flight = SingleFlight()
+        flight.claim(["AAPL"])
+        results = []
+
+        def wait():
+            _, waiting = flight.claim(["AAPL"])
+            results.append(flight.wait(waiting["AAPL"]))
+
+        threads = [threading.Thread(target=wait) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 1
+        while flight.coalesced < 3 and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+        flight.resolve("AAPL", {"price_cents": 100})
+        for thread in threads:
+            thread.join(1)
+            self.assertFalse(thread.is_alive())
+        self.assertEqual(results, [{"price_cents": 100}] * 3)
+
+    def test_resolve_releases_key(self):
+        """Test a resolved key can be claimed again"""
+
+        flight = SingleFlight()
+        flight.claim(["AAPL"])
+        flight.resolve("AAPL", None)
+        owned, waiting = flight.claim(["AAPL"])
+        self.assertEqual(owned, ["AAPL"])
+        self.assertEqual(waiting, {})
+
+        # Resolving a key which is not in flight is a no-op
+        flight.resolve("MSFT", None)
+
+    def test_wait_timeout(self):
+        """Test a waiter gives up once the wait timeout expires"""
+
+        flight = SingleFlight()
+        flight.claim(["AAPL"])
+        _, waiting = flight.claim(["AAPL"])
+        with mock.patch.object(SingleFlight, "WAIT_TIMEOUT", 0.01):
+            self.assertIsNone(flight.wait(waiting["AAPL"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Testcases for the StatementRegistry class
+
+import asyncio
+import os
+import sys
+import unittest
+
+import psycopg2
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.database.statements import StatementRegistry
+
+
+class FakeConnection:
+    pass
+
+
+class FakeCursor:
+    def __init__(self, connection: FakeConnection = None):
+        self.connection = connection or FakeConnection()
+        self.executed = []
+        self.fail = None
+
+    def execute(self, query: str, params=None):
+        if self.fail is not None and query.startswith("EXECUTE"):
+            error, self.fail = self.fail, None
+            raise error
+        self.executed.append((query, params))
+
+
+class FakeAsyncCursor:
+    def __init__(self):
+        self.connection = FakeConnection()
+        self.executed = []
+
+    async def execute(self, query: str, params=None, prepare=None):
+        self.executed.append((query, params, prepare))
+        return self
+
+
+class TestStatementRegistry(unittest.TestCase):
+    def test_register_validates_names(self):
+        """Test statement names must be lowercase SQL identifiers"""
+
+        registry = StatementRegistry()
+        self.assertEqual(registry.register("get_user_2", "SELECT 1"), "get_user_2")
+        for name in ["", "2fast", "GetUser", "drop table", "a;b", "name\n"]:
+            with self.assertRaises(ValueError):
+                registry.register(name, "SELECT 1")
+
+    def test_register_duplicates(self):
+        """Test a name can only be registered again with the same query"""
+
+        registry = StatementRegistry()
+        registry.register("get_one", "SELECT 1")
+        self.assertEqual(registry.register("get_one", "SELECT 1"), "get_one")
+        with self.assertRaises(ValueError):
+            registry.register("get_one", "SELECT 2")
+
+    def test_renders_placeholders(self):
+        """Test placeholders are numbered in PREPARE and keep their casts in EXECUTE"""
+
+        registry = StatementRegistry()
+        registry.register(
+            "find",
+            "SELECT * FROM t WHERE a = %s AND b = ANY(%s::uuid[]) LIMIT %s",
+        )
+        registry.register("count_all", "SELECT COUNT(*) FROM t")
+
+        cursor = FakeCursor()
+        registry.execute(cursor, "find", (1, ["x"], 10))
+        registry.execute(cursor, "count_all")
+        self.assertEqual(
+            [query for query, _ in cursor.executed],
+            [
+                "PREPARE find AS SELECT * FROM t WHERE a = $1 AND b = ANY($2::uuid[]) LIMIT $3",
+                "EXECUTE find (%s, %s::uuid[], %s)",
+                "PREPARE count_all AS SELECT COUNT(*) FROM t",
+                "EXECUTE count_all",
+            ],
+        )
+        self.assertEqual(cursor.executed[1][1], (1, ["x"], 10))
+
+    def test_prepares_once_per_connection(self):
+        """Test a statement is prepared on the first call on each connection only"""
+
+        registry = StatementRegistry()
+        registry.register("get_one", "SELECT %s")
+
+        cursor = FakeCursor()
+        for value in range(3):
+            registry.execute(cursor, "get_one", (value,))
+        self.assertEqual(
+            [query for query, _ in cursor.executed],
+            ["PREPARE get_one AS SELECT $1"] + ["EXECUTE get_one (%s)"] * 3,
+        )
+
+        # A cursor of the same connection reuses the prepared statement
+        same = FakeCursor(cursor.connection)
+        registry.execute(same, "get_one", (3,))
+        self.assertEqual(same.executed, [("EXECUTE get_one (%s)", (3,))])
+
+        other = FakeCursor()
+        registry.execute(other, "get_one", (4,))
+        self.assertEqual(other.executed[0][0], "PREPARE get_one AS SELECT $1")
+
+        stats = registry.stats()["get_one"]
+        self.assertEqual(stats["calls"], 5)
+        self.assertEqual(stats["prepares"], 2)
+        self.assertEqual(stats["errors"], 0)
+        self.assertGreaterEqual(stats["seconds_total"], 0)
+
+    def test_reprepares_after_deallocation(self):
+        """Test a statement which no longer exists is prepared again on the next call"""
+
+        registry = StatementRegistry()
+        registry.register("get_one", "SELECT %s")
+        cursor = FakeCursor()
+        registry.execute(cursor, "get_one", (1,))
+
+        cursor.fail = psycopg2.errors.InvalidSqlStatementName("gone")
+        with self.assertRaises(psycopg2.errors.InvalidSqlStatementName):
+            registry.execute(cursor, "get_one", (2,))
+
+        cursor.executed.clear()
+        registry.execute(cursor, "get_one", (3,))
+        self.assertEqual(
+            [query for query, _ in cursor.executed],
+            ["PREPARE get_one AS SELECT $1", "EXECUTE get_one (%s)"],
+        )
+
+        stats = registry.stats()["get_one"]
+        self.assertEqual(stats["calls"], 3)
+        self.assertEqual(stats["prepares"], 2)
+        self.assertEqual(stats["errors"], 1)
+
+    def test_other_errors_keep_prepared(self):
+        """Test a failed call which is not about the statement does not prepare it again"""
+
+        registry = StatementRegistry()
+        registry.register("get_one", "SELECT %s")
+        cursor = FakeCursor()
+        registry.execute(cursor, "get_one", (1,))
+
+        cursor.fail = psycopg2.errors.QueryCanceled("timeout")
+        with self.assertRaises(psycopg2.errors.QueryCanceled):
+            registry.execute(cursor, "get_one", (2,))
+
+        cursor.executed.clear()
+        registry.execute(cursor, "get_one", (3,))
+        self.assertEqual(cursor.executed, [("EXECUTE get_one (%s)", (3,))])
+
+    def test_execute_async(self):
+        """Test async statements are sent as is and prepared by psycopg"""
+
+        registry = StatementRegistry()
+        registry.register("get_one", "SELECT %s")
+        cursor = FakeAsyncCursor()
+
+        async def run():
+            for value in range(2):
+                self.assertIs(
+                    await registry.execute_async(cursor, "get_one", (value,)), cursor
+                )
+
+        asyncio.run(run())
+        self.assertEqual(
+            cursor.executed,
+            [("SELECT %s", (0,), True), ("SELECT %s", (1,), True)],
+        )
+        stats = registry.stats()["get_one"]
+        self.assertEqual(stats["calls"], 2)
+        self.assertEqual(stats["prepares"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Testcases for the TradeStream class
+
+import asyncio
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.alpaca.stream import TradeStream
+
+TRADE = {"T": "t", "S": "AAPL", "p": 189.5, "s": 10, "t": "2024-03-04T15:00:00Z"}
+
+
+class FakeWebsocket:
+    def __init__(self, messages: list[str]):
+        self.messages = messages
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.messages:
+            raise StopAsyncIteration
+        return self.messages.pop(0)
+
+
+class TestTradeStream(unittest.TestCase):
+    def test_handle_trade(self):
+        """Test a trade message updates the table and notifies listeners"""
+
+        stream = TradeStream("ws://localhost")
+        received = []
+        stream.add_listener(lambda symbol, trade: received.append(symbol))
+        stream._handle(json.dumps([TRADE]))
+        self.assertEqual(stream.trades["AAPL"], TRADE)
+        self.assertEqual(received, ["AAPL"])
+        self.assertEqual(stream.messages, 1)
+
+    def test_handle_malformed(self):
+        """Test malformed messages are skipped without raising"""
+
+        stream = TradeStream("ws://localhost")
+        for message in [
+            "not json",
+            json.dumps(TRADE),
+            json.dumps([1, "t", None]),
+            json.dumps([{"T": "t", "p": 1.0}]),
+            json.dumps([{"T": "t", "S": 5}]),
+        ]:
+            stream._handle(message)
+
+        self.assertEqual(stream.trades, {})
+        self.assertEqual(stream.messages, 0)
+        self.assertEqual(stream.get_stats()["malformed"], 7)
+
+    def test_handle_skips_only_bad_records(self):
+        """Test the valid records of a message are kept when others are malformed"""
+
+        stream = TradeStream("ws://localhost")
+        stream._handle(json.dumps([{"T": "t"}, TRADE, "junk"]))
+        self.assertIn("AAPL", stream.trades)
+        self.assertEqual(stream.malformed, 2)
+
+    def test_run_survives_unexpected_errors(self):
+        """Test an unexpected error reconnects instead of ending the stream"""
+
+        stream = TradeStream("ws://localhost")
+
+        async def authenticate(websocket):
+            pass
+
+        async def sleep(delay):
+            # Stop the loop once it tries to reconnect
+            raise asyncio.CancelledError()
+
+        with (
+            mock.patch(
+                "websockets.connect",
+                side_effect=lambda url: FakeWebsocket([json.dumps([TRADE])]),
+            ),
+            mock.patch.object(stream, "_authenticate", authenticate),
+            mock.patch.object(stream, "_handle", side_effect=AttributeError("boom")),
+            mock.patch("asyncio.sleep", sleep),
+        ):
+            with self.assertRaises(asyncio.CancelledError):
+                asyncio.run(stream._run())
+
+        self.assertEqual(stream.reconnects, 1)
+        self.assertFalse(stream.connected)
+
+
+if __name__ == "__main__":
+    unittest.main()
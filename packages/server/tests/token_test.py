@@ -0,0 +1,78 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Testcases for the Token class
+
+import unittest
+
+from src.helpers.token import Token
+
+KEY = "test-key"
+OWNER = "d383865a-df45-4c4c-bc47-b06253b126a6"
+
+
+class TestToken(unittest.TestCase):
+    def test_sign_and_verify(self):
+        """Test a signed token verifies and carries its claims"""
+
+        token = Token.sign(OWNER, KEY, 60, now=1000)
+        claims = Token.verify(token, KEY, now=1030)
+        self.assertIsNotNone(claims)
+        self.assertEqual(claims["sub"], OWNER)
+        self.assertEqual(claims["exp"], 1060)
+        self.assertTrue(claims["jti"])
+
+    def test_unique_ids(self):
+        """Test tokens issued at the same time have different ids"""
+
+        first = Token.verify(Token.sign(OWNER, KEY, 60, now=1000), KEY, now=1000)
+        second = Token.verify(Token.sign(OWNER, KEY, 60, now=1000), KEY, now=1000)
+        self.assertNotEqual(first["jti"], second["jti"])
+
+    def test_expired(self):
+        """Test an expired token is rejected"""
+
+        token = Token.sign(OWNER, KEY, 60, now=1000)
+        self.assertIsNone(Token.verify(token, KEY, now=1060))
+
+    def test_wrong_key(self):
+        """Test a token signed with another key is rejected"""
+
+        token = Token.sign(OWNER, KEY, 60, now=1000)
+        self.assertIsNone(Token.verify(token, "other-key", now=1000))
+        self.assertIsNone(Token.verify(token, "", now=1000))
+
+    def test_tampered(self):
+        """Test a token with modified claims is rejected"""
+
+        token = Token.sign(OWNER, KEY, 60, now=1000)
+        forged = Token.sign("00000000-0000-0000-0000-000000000000", KEY, 60, now=1000)
+        payload = forged.split(".")[0]
+        signature = token.split(".")[1]
+        self.assertIsNone(Token.verify(f"{payload}.{signature}", KEY, now=1000))
+
+    def test_malformed(self):
+        """Test malformed tokens are rejected"""
+
+        for token in ["", "abc", "a.b.c", "not-base64!.sig", OWNER]:
+            self.assertIsNone(Token.verify(token, KEY, now=1000))
+
+    def test_non_ascii(self):
+        """Test tokens with non-ASCII characters are rejected instead of raising"""
+
+        token = Token.sign(OWNER, KEY, 60, now=1000)
+        payload, signature = token.split(".")
+        for forged in [
+            f"{payload}.{'é' * 43}",
+            f"{payload}é.{signature}",
+            f"{payload}.{signature[:-1]}\u00ff",
+        ]:
+            self.assertIsNone(Token.verify(forged, KEY, now=1000))
+
+    def test_missing_key(self):
+        """Test signing without a key fails"""
+
+        with self.assertRaises(ValueError):
+            Token.sign(OWNER, "", 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,14 @@
 # @authors: soltadd (Solomon Bedane)
 # @description: Testcases for the Tournament class
 
+import os
+import sys
 import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from helpers.tournament import Tournament
 
 
 # Function to simulate user joining tournament
@@ -46,5 +53,21 @@ class TestJoinTournament(unittest.TestCase):
         self.assertEqual(str(context.exception), "Insufficient FinBucks")
 
 
+class TestTournamentPrizes(unittest.TestCase):
+    def test_get_prize(self):
+        """Test prizes halve with each place down to fourth"""
+
+        prizes = [Tournament.get_prize(place, 100) for place in range(1, 6)]
+        self.assertEqual(prizes, [100, 50, 25, 12.5, 0])
+
+    def test_distribute_prizes(self):
+        """Test the prize for a placement is added to the balance of the user"""
+
+        tournament = Tournament("name", None, None, 100)
+        participant = SimpleNamespace(place=4, user=SimpleNamespace(balance=10))
+        tournament.distribute_prizes(participant)
+        self.assertEqual(participant.user.balance, 22.5)
+
+
 if __name__ == "__main__":
     unittest.main()
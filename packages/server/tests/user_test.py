@@ -3,6 +3,7 @@
 
 import unittest
 
+from src.helpers import user
 from src.helpers.user import User
 
 
@@ -90,6 +91,20 @@ class TestUserMethods(unittest.TestCase):
         self.assertTrue(User.verify_password(test_password, password_hash))
         self.assertFalse(User.verify_password(test_password + "123", password_hash))
 
+    def test_password_rehash(self):
+        default_hasher = user.ph
+        try:
+            User.configure_hasher(time_cost=1, memory_cost=1024, parallelism=1)
+            password_hash = User.hash_password("password")
+            self.assertFalse(User.needs_rehash(password_hash))
+
+            User.configure_hasher(time_cost=2, memory_cost=1024, parallelism=1)
+            self.assertTrue(User.needs_rehash(password_hash))
+            self.assertTrue(User.verify_password("password", password_hash))
+            self.assertFalse(User.needs_rehash("not a hash"))
+        finally:
+            user.ph = default_hasher
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,167 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Testcases for the portfolio valuation routes
+
+import os
+import sys
+import unittest
+import uuid
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from helpers.loader import Loader
+from helpers.valuation import Valuation
+from routes.api.v1 import portfolios
+from routes.api.v1.auth import authenticateToken
+from routes.api.v1.loaders import batch, getLoaders
+
+OWNER = str(uuid.uuid4())
+OTHER = str(uuid.uuid4())
+
+
+class FakeLoaders:
+    def __init__(self, rows):
+        self.fetched = []
+
+        async def get_portfolios_by_uuids(uuids):
+            self.fetched.append(list(uuids))
+            return [rows[uuid] for uuid in uuids if uuid in rows]
+
+        self.portfolios = Loader(batch(get_portfolios_by_uuids))
+
+
+def portfolio(owner=OWNER):
+    return {"uuid": str(uuid.uuid4()), "owner": owner, "balance_cents": 100}
+
+
+def valuations(rows):
+    return {
+        row["uuid"]: Valuation.value(row["balance_cents"], [], {}, {}) for row in rows
+    }
+
+
+class TestValuationRoutes(unittest.TestCase):
+    def setUp(self):
+        self.mine = portfolio()
+        self.foreign = portfolio(OTHER)
+        self.loaders = FakeLoaders(
+            {row["uuid"]: row for row in (self.mine, self.foreign)}
+        )
+
+        app = FastAPI()
+        app.include_router(portfolios.router)
+        app.dependency_overrides[authenticateToken] = lambda: (OWNER, "token")
+        app.dependency_overrides[getLoaders] = lambda: self.loaders
+        self.client = TestClient(app)
+
+        # The portfolio dependency authenticates the header itself
+        patcher = mock.patch.object(
+            portfolios,
+            "authenticateToken",
+            mock.AsyncMock(return_value=(OWNER, "token")),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = mock.patch.object(
+            portfolios.ValuationService,
+            "get_valuations",
+            side_effect=valuations,
+        )
+        self.get_valuations = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = mock.patch.object(
+            portfolios.ValuationService,
+            "get_valuation",
+            side_effect=lambda row: valuations([row])[row["uuid"]],
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def value(self, *uuids):
+        return self.client.post(
+            "/api/v1/portfolios/valuations",
+            json={"portfolios": list(uuids)},
+            headers={"Authorization": "token"},
+        )
+
+    def test_valuation(self):
+        """Test a portfolio of the token owner is valued"""
+
+        response = self.client.get(
+            f"/api/v1/portfolios/{self.mine['uuid']}/valuation",
+            headers={"Authorization": "token"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["portfolio"], self.mine["uuid"])
+
+    def test_valuation_foreign(self):
+        """Test a portfolio of another user cannot be valued"""
+
+        response = self.client.get(
+            f"/api/v1/portfolios/{self.foreign['uuid']}/valuation",
+            headers={"Authorization": "token"},
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_valuation_missing(self):
+        """Test a portfolio which does not exist is not found"""
+
+        response = self.client.get(
+            f"/api/v1/portfolios/{uuid.uuid4()}/valuation",
+            headers={"Authorization": "token"},
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_valuations_foreign(self):
+        """Test a bulk request including a portfolio of another user is forbidden"""
+
+        response = self.value(self.mine["uuid"], self.foreign["uuid"])
+        self.assertEqual(response.status_code, 403)
+        self.get_valuations.assert_not_called()
+
+    def test_valuations_missing(self):
+        """Test a bulk request including a missing portfolio is not found"""
+
+        response = self.value(self.mine["uuid"], str(uuid.uuid4()))
+        self.assertEqual(response.status_code, 404)
+        self.get_valuations.assert_not_called()
+
+    def test_valuations_dedup(self):
+        """Test duplicate portfolios are loaded and returned once"""
+
+        response = self.value(self.mine["uuid"], self.mine["uuid"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [entry["portfolio"] for entry in response.json()["data"]],
+            [self.mine["uuid"]],
+        )
+        self.assertEqual(self.loaders.fetched, [[self.mine["uuid"]]])
+
+    def test_valuations_bound(self):
+        """Test a bulk request is limited to MAX_VALUATION_PORTFOLIOS distinct portfolios"""
+
+        limit = portfolios.MAX_VALUATION_PORTFOLIOS
+        rows = [self.mine] + [portfolio() for _ in range(limit)]
+        self.loaders = FakeLoaders({row["uuid"]: row for row in rows})
+
+        response = self.value(*[row["uuid"] for row in rows[:limit]])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["data"]), limit)
+
+        response = self.value(*[row["uuid"] for row in rows])
+        self.assertEqual(response.status_code, 400)
+
+        # Duplicates do not count towards the bound
+        response = self.value(*[row["uuid"] for row in rows[:limit]] * 2)
+        self.assertEqual(response.status_code, 200)
+
+        response = self.value()
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
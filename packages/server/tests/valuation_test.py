@@ -0,0 +1,64 @@
+# @author: adibarra (Alec Ibarra)
+# @description: Test for the Valuation class
+
+import unittest
+
+from src.helpers.valuation import Valuation
+
+
+class TestValuationMethods(unittest.TestCase):
+    def test_value(self):
+        valuation = Valuation.value(
+            10000,
+            [
+                {"symbol": "AAPL", "quantity": 2, "cost_basis_cents": 30000},
+                {"symbol": "MSFT", "quantity": 1, "cost_basis_cents": 40000},
+            ],
+            {"AAPL": 17000, "MSFT": 41000},
+            {"AAPL": 16500, "MSFT": 41500},
+        )
+        self.assertEqual(valuation["market_value_cents"], 75000)
+        self.assertEqual(valuation["total_value_cents"], 85000)
+        self.assertEqual(valuation["cost_basis_cents"], 70000)
+        self.assertEqual(valuation["daily_pl_cents"], 500)
+        self.assertEqual(valuation["total_pl_cents"], 5000)
+        self.assertEqual(
+            valuation["positions"][0],
+            {
+                "symbol": "AAPL",
+                "quantity": 2,
+                "price_cents": 17000,
+                "market_value_cents": 34000,
+                "cost_basis_cents": 30000,
+                "daily_pl_cents": 1000,
+                "total_pl_cents": 4000,
+            },
+        )
+
+    def test_value_missing_prices(self):
+        valuation = Valuation.value(
+            0,
+            [
+                {"symbol": "AAPL", "quantity": 2, "cost_basis_cents": 30000},
+                {"symbol": "MSFT", "quantity": 1, "cost_basis_cents": 40000},
+            ],
+            {"AAPL": 17000},
+            {"MSFT": 41500},
+        )
+        aapl, msft = valuation["positions"]
+        self.assertEqual(aapl["daily_pl_cents"], 0)
+        self.assertEqual(aapl["total_pl_cents"], 4000)
+        self.assertIsNone(msft["price_cents"])
+        self.assertEqual(msft["market_value_cents"], 40000)
+        self.assertEqual(msft["daily_pl_cents"], 0)
+        self.assertEqual(msft["total_pl_cents"], 0)
+
+    def test_value_empty(self):
+        valuation = Valuation.value(5000, [], {}, {})
+        self.assertEqual(valuation["total_value_cents"], 5000)
+        self.assertEqual(valuation["total_pl_cents"], 0)
+        self.assertEqual(valuation["positions"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()